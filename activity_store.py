@@ -0,0 +1,304 @@
+import os
+import json
+import sqlite3
+import hashlib
+import threading
+from datetime import datetime
+
+from cache_dir import cache_path
+from dedup import block_key
+from geo import GeoIndex, extract_coordinates
+from normalize import age_bounds, normalize_records, parse_price
+
+ACTIVITY_DB = cache_path("activities.sqlite3")
+
+MAX_PAGE_SIZE = 200
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS activities (
+    id INTEGER PRIMARY KEY,
+    key TEXT UNIQUE NOT NULL,
+    source TEXT,
+    name TEXT,
+    start_date TEXT,
+    end_date TEXT,
+    age_min REAL,
+    age_max REAL,
+    price REAL,
+    lat REAL,
+    lon REAL,
+    block TEXT,
+    record TEXT NOT NULL,
+    updated_at TEXT
+);
+CREATE TABLE IF NOT EXISTS activity_tags (
+    activity_id INTEGER NOT NULL,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (tag, activity_id)
+);
+CREATE TABLE IF NOT EXISTS store_meta (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    version INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO store_meta (id, version) VALUES (1, 0);
+CREATE INDEX IF NOT EXISTS idx_activities_dates ON activities (start_date, end_date);
+CREATE INDEX IF NOT EXISTS idx_activities_ages ON activities (age_min, age_max);
+CREATE INDEX IF NOT EXISTS idx_activities_price ON activities (price);
+CREATE INDEX IF NOT EXISTS idx_activities_geo ON activities (lat, lon);
+CREATE INDEX IF NOT EXISTS idx_activity_tags_activity ON activity_tags (activity_id);
+"""
+
+
+def activity_key(record):
+    """Natural key of a scraped record: its URL, or name + organization."""
+    return record.get("event_url") or f"{record.get('name')}|{record.get('organization')}"
+
+
+def _tags(tags):
+    return sorted({t for t in tags if isinstance(t, str) and t != "No Tags"}) if isinstance(tags, list) else []
+
+
+class ActivityStore:
+    """Local SQLite copy of scraped activities with indexes for listing queries."""
+
+    def __init__(self, path=ACTIVITY_DB):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(_SCHEMA)
+        # Stores created before the duplicate block column was added
+        if "block" not in {row["name"] for row in self.conn.execute("PRAGMA table_info(activities)")}:
+            self.conn.execute("ALTER TABLE activities ADD COLUMN block TEXT")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_activities_block ON activities (block, source)")
+        self.conn.commit()
+        self._geo_index = None
+        # Store version the index reflects; other processes write the same file
+        self._geo_version = None
+
+    def upsert(self, records, geocoder=None, source=None):
+        """Inserts or replaces records by natural key and bumps the store version.
+
+        Coordinates come from geo.extract_coordinates; pass `geocoder` to look
+        up records whose location carries no coordinates. `source` is the
+        scraper the records come from.
+        """
+        if not records:
+            return 0
+        now = datetime.utcnow().isoformat()
+        records = normalize_records(records)
+        # Geocoding goes over the network, so it happens before readers are locked out
+        coordinates = [extract_coordinates(record, geocoder) or (None, None) for record in records]
+        located = []
+        with self.lock, self.conn:
+            for record, (lat, lon) in zip(records, coordinates):
+                age_min, age_max = age_bounds(record.get("ages"))
+                row = (
+                    activity_key(record),
+                    source,
+                    record.get("name"),
+                    record.get("start_date"),
+                    record.get("end_date") or record.get("start_date"),
+                    age_min,
+                    age_max,
+                    parse_price(record.get("price")),
+                    lat,
+                    lon,
+                    block_key(record),
+                    json.dumps(record, default=str),
+                    now,
+                )
+                activity_id = self.conn.execute(
+                    "INSERT INTO activities (key, source, name, start_date, end_date, age_min,"
+                    " age_max, price, lat, lon, block, record, updated_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+                    " ON CONFLICT(key) DO UPDATE SET source=excluded.source, name=excluded.name,"
+                    " start_date=excluded.start_date, end_date=excluded.end_date,"
+                    " age_min=excluded.age_min, age_max=excluded.age_max, price=excluded.price,"
+                    " lat=excluded.lat, lon=excluded.lon, block=excluded.block, record=excluded.record,"
+                    " updated_at=excluded.updated_at"
+                    " RETURNING id",
+                    row,
+                ).fetchone()[0]
+                located.append((activity_id, lat, lon))
+                self.conn.execute("DELETE FROM activity_tags WHERE activity_id = ?", (activity_id,))
+                self.conn.executemany(
+                    "INSERT INTO activity_tags (activity_id, tag) VALUES (?, ?)",
+                    [(activity_id, tag) for tag in _tags(record.get("tags"))],
+                )
+            version = self._bump_version()
+
+        if self._geo_index is not None:
+            for activity_id, lat, lon in located:
+                if lat is None:
+                    self._geo_index.remove(activity_id)
+                else:
+                    self._geo_index.add(activity_id, lat, lon)
+            self._advance_geo_version(version)
+        return len(records)
+
+    def _bump_version(self):
+        """Increments the store version inside the caller's transaction; returns the new one."""
+        return self.conn.execute(
+            "UPDATE store_meta SET version = version + 1 WHERE id = 1 RETURNING version"
+        ).fetchone()[0]
+
+    def _advance_geo_version(self, version):
+        # Only when no other process wrote in between; otherwise the next query rebuilds
+        if self._geo_version == version - 1:
+            self._geo_version = version
+
+    def geo_index(self):
+        """Geohash index over every located activity.
+
+        Built on first use and rebuilt when the store version moved on
+        without it, e.g. after the cron job or another worker wrote rows.
+        """
+        version = self.version()
+        if self._geo_index is None or self._geo_version != version:
+            index = GeoIndex()
+            with self.lock:
+                version = self.conn.execute("SELECT version FROM store_meta WHERE id = 1").fetchone()[0]
+                rows = self.conn.execute(
+                    "SELECT id, lat, lon FROM activities WHERE lat IS NOT NULL AND lon IS NOT NULL"
+                ).fetchall()
+            for row in rows:
+                index.add(row["id"], row["lat"], row["lon"])
+            self._geo_index, self._geo_version = index, version
+        return self._geo_index
+
+    def near(self, lat, lon, radius_km, limit=50):
+        """Activities within `radius_km` of a point, nearest first."""
+        hits = self.geo_index().within_radius(lat, lon, radius_km, limit=min(int(limit), MAX_PAGE_SIZE))
+        items = []
+        for activity_id, distance in hits:
+            activity = self.get(activity_id)
+            if activity:
+                activity["distance_km"] = round(distance, 3)
+                items.append(activity)
+        return {"items": items, "count": len(items)}
+
+    def within_bbox(self, min_lat, min_lon, max_lat, max_lon, limit=50):
+        """Activities inside a bounding box, answered from the geohash index."""
+        ids = self.geo_index().within_bbox(min_lat, min_lon, max_lat, max_lon)
+        ids = sorted(ids)[: min(int(limit), MAX_PAGE_SIZE)]
+        items = [activity for activity in map(self.get, ids) if activity]
+        return {"items": items, "count": len(items)}
+
+    def delete(self, keys):
+        """Removes records by natural key and bumps the store version."""
+        keys = list(keys)
+        if not keys:
+            return 0
+        with self.lock, self.conn:
+            ids = []
+            for start in range(0, len(keys), 500):
+                chunk = keys[start : start + 500]
+                ids += [
+                    row[0]
+                    for row in self.conn.execute(
+                        f"SELECT id FROM activities WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                    )
+                ]
+            self.conn.executemany("DELETE FROM activity_tags WHERE activity_id = ?", [(i,) for i in ids])
+            self.conn.executemany("DELETE FROM activities WHERE id = ?", [(i,) for i in ids])
+            version = self._bump_version()
+        if self._geo_index is not None:
+            for activity_id in ids:
+                self._geo_index.remove(activity_id)
+            self._advance_geo_version(version)
+        return len(ids)
+
+    def in_blocks(self, blocks, exclude_source=None):
+        """Stored records in any of `blocks` (see dedup.block_key), except `exclude_source`'s."""
+        blocks = sorted({block for block in blocks if block})
+        records = []
+        with self.lock:
+            for start in range(0, len(blocks), 500):
+                chunk = blocks[start : start + 500]
+                rows = self.conn.execute(
+                    f"SELECT record FROM activities WHERE block IN ({','.join('?' * len(chunk))})"
+                    " AND source IS NOT ?",
+                    chunk + [exclude_source],
+                ).fetchall()
+                records += [json.loads(row["record"]) for row in rows]
+        return records
+
+    def version(self):
+        with self.lock:
+            return self.conn.execute("SELECT version FROM store_meta WHERE id = 1").fetchone()[0]
+
+    def etag(self, *parts):
+        """Weak ETag that changes whenever the store is written or the query differs."""
+        digest = hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()[:16]
+        return f'W/"{self.version()}-{digest}"'
+
+    def query(
+        self,
+        date_from=None,
+        date_to=None,
+        age=None,
+        min_price=None,
+        max_price=None,
+        tags=None,
+        bbox=None,
+        limit=50,
+        offset=0,
+    ):
+        """Lists activities matching every given filter, ordered by start date.
+
+        `bbox` is `(min_lat, min_lon, max_lat, max_lon)`. Activities overlapping
+        `[date_from, date_to]` match, and `age` must fall inside the age range.
+        """
+        clauses, params = [], []
+        if date_from:
+            clauses.append("end_date >= ?")
+            params.append(date_from)
+        if date_to:
+            clauses.append("start_date <= ?")
+            params.append(date_to)
+        if age is not None:
+            clauses.append("age_min <= ? AND age_max >= ?")
+            params += [age, age]
+        if min_price is not None:
+            clauses.append("price >= ?")
+            params.append(min_price)
+        if max_price is not None:
+            clauses.append("price <= ?")
+            params.append(max_price)
+        if tags:
+            clauses.append(
+                f"id IN (SELECT activity_id FROM activity_tags WHERE tag IN ({','.join('?' * len(tags))}))"
+            )
+            params += list(tags)
+        if bbox:
+            min_lat, min_lon, max_lat, max_lon = bbox
+            clauses.append("lat BETWEEN ? AND ? AND lon BETWEEN ? AND ?")
+            params += [min_lat, max_lat, min_lon, max_lon]
+
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        offset = max(0, int(offset))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql = (
+            f"SELECT id, record FROM activities {where}"
+            " ORDER BY start_date IS NULL, start_date, id LIMIT ? OFFSET ?"
+        )
+        with self.lock:
+            # Fetch one extra row to know whether another page exists
+            rows = self.conn.execute(sql, params + [limit + 1, offset]).fetchall()
+
+        items = [dict(json.loads(row["record"]), id=row["id"]) for row in rows[:limit]]
+        return {
+            "items": items,
+            "limit": limit,
+            "offset": offset,
+            "next_offset": offset + limit if len(rows) > limit else None,
+        }
+
+    def get(self, activity_id):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT id, record FROM activities WHERE id = ?", (activity_id,)
+            ).fetchone()
+        return dict(json.loads(row["record"]), id=row["id"]) if row else None
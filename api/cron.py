@@ -1,13 +1,27 @@
-import json
-from main import scrape_full_month
+import os
 
+# Only the kidsoutandabout path: no FastAPI, Selenium or Supabase client at import
+from cache_dir import restore_state, save_state
+from kidsoutandabout import scrape_full_month
+from profiling import profiled
 
-def handler():
+# CRON_PROFILE=true profiles each scheduled run; artifacts go to PROFILE_DIR
+CRON_PROFILE = os.getenv("CRON_PROFILE", "false").lower() == "true"
+
+
+def handler(profile=CRON_PROFILE):
     try:
-        scrape_full_month()
+        # Snapshots, fingerprints and the scrape log from the previous run (see cache_dir.py)
+        restore_state()
+        with profiled("cron", profile) as profile_report:
+            scrape_full_month()
+        return profile_report or None
 
     except Exception as e:
         print(e)
 
+    finally:
+        save_state()
+
 result = handler()
-print(result)
\ No newline at end of file
+print(result)
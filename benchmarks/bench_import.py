@@ -0,0 +1,76 @@
+"""Import-time budget for the scraper entry points.
+
+Run from the repository root:
+
+    python benchmarks/bench_import.py [--budget-ms 250] [--runs 5]
+
+Each entry point is imported in a fresh interpreter several times and the
+fastest run is compared with its budget. Entry points must also not load
+the heavy modules listed in `forbidden`. Exits non-zero when either check
+fails, so it can gate CI or a deploy.
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY = ["selenium", "webdriver_manager", "supabase", "fastapi", "dateutil", "pyarrow", "PIL"]
+
+# module imported by each entry point -> (budget multiplier, modules it must not load)
+ENTRY_POINTS = {
+    # api/cron.py imports this and nothing else
+    "kidsoutandabout": (1.0, HEAVY),
+    # the FastAPI app needs FastAPI but should still not start Selenium or Supabase
+    "main": (3.0, ["selenium", "webdriver_manager", "supabase", "pyarrow", "PIL"]),
+}
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"ms": elapsed * 1000, "modules": sorted({{m.split('.')[0] for m in sys.modules}})}}))
+"""
+
+
+def measure(module, runs):
+    best, loaded = None, set()
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module)],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip().splitlines()[-1]
+        result = json.loads(output)
+        best = result["ms"] if best is None else min(best, result["ms"])
+        loaded = set(result["modules"])
+    return best, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("IMPORT_BUDGET_MS", 250)))
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    failed = False
+    for module, (multiplier, forbidden) in ENTRY_POINTS.items():
+        budget = args.budget_ms * multiplier
+        elapsed, loaded = measure(module, args.runs)
+        leaked = sorted(set(forbidden) & loaded)
+        ok = elapsed <= budget and not leaked
+        failed = failed or not ok
+        print(
+            f"{'PASS' if ok else 'FAIL'} import {module:<16} {elapsed:7.1f} ms"
+            f" (budget {budget:.0f} ms)" + (f" loads {', '.join(leaked)}" if leaked else "")
+        )
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
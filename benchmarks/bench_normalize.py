@@ -0,0 +1,156 @@
+"""Compares batch date/time normalization with the old per-record helpers.
+
+Run from the repository root:
+
+    python benchmarks/bench_normalize.py [records]
+"""
+import os
+import random
+import re
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dateutil import parser  # noqa: E402
+
+import normalize  # noqa: E402
+
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+UNTIMED = ["Varies", "See website", "All day"]
+
+
+def sample_date(rng):
+    """A date string in one of the shapes the scrapers see, with realistic spread."""
+    year = rng.choice((2025, 2026))
+    start = datetime(year, rng.randint(1, 12), rng.randint(1, 28))
+    kind = rng.random()
+    if kind < 0.4:
+        end = datetime(year, min(start.month + rng.randint(0, 1), 12), rng.randint(1, 28))
+        end = max(start, end)
+        text = f"{start:%b} {start.day} - {end:%b} {end.day}, {year}"
+        if rng.random() < 0.3:
+            text += f" (Started {rng.choice(MONTHS)} {rng.randint(1, 28)})"
+        return text
+    if kind < 0.7:
+        return f"{start:%a}, {start:%b} {start.day}, {year}"
+    return f"{start:%b} {start.day}"
+
+
+def _clock(rng, upper):
+    hour = rng.randint(1, 12)
+    minute = rng.choice((0, 15, 30, 45))
+    meridiem = rng.choice(("AM", "PM") if upper else ("am", "pm"))
+    return f"{hour}:{minute:02d}{' ' if upper else ''}{meridiem}"
+
+
+def sample_time(rng):
+    kind = rng.random()
+    if kind < 0.1:
+        return rng.choice(UNTIMED)
+    upper = rng.random() < 0.3
+    if kind < 0.25:
+        return _clock(rng, upper)
+    return f"{_clock(rng, upper)} - {_clock(rng, upper)}"
+
+
+# Per-record implementations as they were before normalize.py existed
+def legacy_convert_date_format(date_text):
+    range_match = re.search(r"([A-Za-z]+ \d{1,2}) - ([A-Za-z]+ \d{1,2}), (\d{4})", date_text)
+    if range_match:
+        start_date = parser.parse(f"{range_match.group(1)} {range_match.group(3)}").strftime("%d/%m/%Y")
+        end_date = parser.parse(f"{range_match.group(2)} {range_match.group(3)}").strftime("%d/%m/%Y")
+        return f"{start_date} - {end_date}"
+    try:
+        return parser.parse(date_text).strftime("%d/%m/%Y")
+    except Exception:
+        return "No Dates"
+
+
+def legacy_convert_date(date_str):
+    try:
+        date = datetime.strptime(f"{date_str} {2025}", "%b %d %Y")
+        return date.strftime("%d/%m/%Y")
+    except ValueError:
+        return None
+
+
+def legacy_extract_start_end_time(time_text):
+    if not time_text or time_text.lower() in ["varies", "see website", "all day"]:
+        return time_text, time_text
+    time_text = time_text.lower().strip()
+    time_pattern = re.search(
+        r"(\d{1,2}:\d{2}\s*[apmAPM]*)\s*-\s*(\d{1,2}:\d{2}\s*[apmAPM]*)", time_text
+    )
+    if time_pattern:
+        return time_pattern.group(1).strip(), time_pattern.group(2).strip()
+    single_time_pattern = re.search(r"(\d{1,2}:\d{2}\s*[apmAPM]*)", time_text)
+    if single_time_pattern:
+        return single_time_pattern.group(1), "No End Time"
+    return "Unparsed Time", "Unparsed Time"
+
+
+def is_month_day(text):
+    return text[:3].isalpha() and "," not in text
+
+
+def legacy(dates, times):
+    for text in dates:
+        if is_month_day(text):
+            legacy_convert_date(text)
+        else:
+            legacy_convert_date_format(text)
+    for text in times:
+        legacy_extract_start_end_time(text)
+
+
+def check_equivalence(dates, times):
+    """Fails unless the normalize helpers format every input like the legacy ones."""
+    mismatches = []
+    for text in set(dates):
+        if is_month_day(text):
+            got, want = normalize.convert_date(text, 2025), legacy_convert_date(text)
+        else:
+            got, want = normalize.convert_date_format(text), legacy_convert_date_format(text)
+        if got != want:
+            mismatches.append((text, got, want))
+    for text in set(times):
+        got, want = normalize.extract_start_end_time(text), legacy_extract_start_end_time(text)
+        if got != want:
+            mismatches.append((text, got, want))
+    assert not mismatches, f"{len(mismatches)} inputs differ from legacy, e.g. {mismatches[:5]}"
+
+
+def batch(dates, times):
+    normalize.normalize_dates(dates)
+    normalize.normalize_times(times)
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - started
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    rng = random.Random(7)
+    dates = [sample_date(rng) for _ in range(count)]
+    times = [sample_time(rng) for _ in range(count)]
+    check_equivalence(dates, times)
+    for fn in (normalize.parse_date_range, normalize.parse_time_range, normalize.extract_start_end_time):
+        fn.cache_clear()
+
+    legacy_seconds = timed(legacy, dates, times)
+    cold_seconds = timed(batch, dates, times)
+    warm_seconds = timed(batch, dates, times)
+
+    print(f"records:           {count} ({len(set(dates))} distinct dates, {len(set(times))} distinct times)")
+    print(f"per-record legacy: {legacy_seconds * 1000:8.1f} ms")
+    print(f"batch (cold memo): {cold_seconds * 1000:8.1f} ms  {legacy_seconds / cold_seconds:6.1f}x")
+    print(f"batch (warm memo): {warm_seconds * 1000:8.1f} ms  {legacy_seconds / warm_seconds:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
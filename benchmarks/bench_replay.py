@@ -0,0 +1,57 @@
+"""Times a scraper function offline against a recorded archive.
+
+Record once against the live sites:
+
+    REPLAY_MODE=record python benchmarks/bench_replay.py main:scrape_galileo_camp_details2 <url> US
+
+then replay as often as needed, without network or Chrome:
+
+    python benchmarks/bench_replay.py main:scrape_galileo_camp_details2 <url> US --runs 5
+
+Replay uses a fresh SCRAPER_CACHE_DIR, so the first run is cold; later
+runs hit the fingerprint cache and show the cost of an unchanged re-crawl.
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import importlib
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("target", help="module:function, e.g. main:steveandkatescamp")
+    parser.add_argument("args", nargs="*")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--archive", default=os.getenv("REPLAY_ARCHIVE", os.path.join(ROOT, ".cache", "replay", "archive.zip")))
+    options = parser.parse_args()
+
+    os.environ.setdefault("REPLAY_MODE", "replay")
+    os.environ["REPLAY_ARCHIVE"] = options.archive
+    if os.environ["REPLAY_MODE"] == "replay":
+        os.environ["SCRAPER_CACHE_DIR"] = tempfile.mkdtemp(prefix="replay-cache-")
+    sys.path.insert(0, ROOT)
+
+    import replay
+
+    module_name, function_name = options.target.split(":")
+    function = getattr(importlib.import_module(module_name), function_name)
+
+    runs = options.runs if replay.REPLAY_MODE == "replay" else 1
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        function(*options.args)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    if replay.REPLAY_MODE == "record":
+        replay.get_archive().save()
+    print(f"{options.target} ({replay.REPLAY_MODE}): " + ", ".join(f"{ms:.1f} ms" for ms in timings))
+    print(replay.archive_summary(options.archive))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Times the write path per storage backend with synthetic activities.
+
+Run from the repository root:
+
+    python benchmarks/bench_storage.py [--records 5000] [--batch 500] [--backends memory,sqlite]
+
+For each backend, `insert` is the backend call alone and `store` is
+store_activities end to end (dedup, backend insert, local read store).
+Add "supabase" to --backends to measure a live project (needs
+SUPABASE_URL / SUPABASE_KEY and writes real rows).
+"""
+import os
+import sys
+import time
+import hashlib
+import argparse
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _words(i, count):
+    digest = hashlib.sha1(str(i).encode()).hexdigest()
+    return " ".join(digest[j * 5 : j * 5 + 5] for j in range(count))
+
+
+def synthetic_activities(count):
+    # Distinct names and streets, so deduplication keeps every record
+    return [
+        {
+            "name": f"{_words(i, 3)} camp",
+            "organization": f"Org {i % 97}",
+            "location": {"street": f"{i} {_words(-i, 1)} St", "city": "Austin", "state": "TX"},
+            "dates": [f"{(i % 28) + 1:02d}/06/2025"],
+            "start_time": "9:00am",
+            "end_time": "3:00pm",
+            "phone": "512-555-0100",
+            "image_url": "No Image",
+            "description": f"Synthetic activity number {i}",
+            "event_url": f"https://example.com/activity/{i}",
+            "email": "No Email",
+            "price": float(i % 200),
+            "ages": ["5 - 12"],
+            "tags": ["No Tags"],
+        }
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=5000)
+    parser.add_argument("--batch", type=int, default=500)
+    parser.add_argument("--backends", default="memory,sqlite")
+    options = parser.parse_args()
+
+    os.environ["SCRAPER_CACHE_DIR"] = tempfile.mkdtemp(prefix="bench-storage-")
+    sys.path.insert(0, ROOT)
+    from db import storage_backend, using_storage
+    from pipeline import store_activities
+
+    records = synthetic_activities(options.records)
+    batches = [records[i : i + options.batch] for i in range(0, len(records), options.batch)]
+    for name in options.backends.split(","):
+        backend = storage_backend(name)
+        started = time.perf_counter()
+        for batch in batches:
+            backend.insert("bench_activities", batch)
+        insert_seconds = time.perf_counter() - started
+
+        with using_storage(name):
+            started = time.perf_counter()
+            for batch in batches:
+                store_activities(batch)
+            store_seconds = time.perf_counter() - started
+        print(
+            f"{name:<9} insert {options.records / insert_seconds:>10.0f} rows/s"
+            f"   store {options.records / store_seconds:>8.0f} rows/s   {backend.summary()}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Measures streaming ingestion of a synthetic Campity dump.
+
+Run from the repository root:
+
+    python benchmarks/bench_stream_json.py [size_mb] [--mmap] [--compare]
+
+`--compare` also times the old whole-file `json.loads` path. Peak RSS is
+read from the OS, so run each mode in its own process for clean numbers.
+"""
+import os
+import sys
+import json
+import time
+import random
+import resource
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stream_json import batched, iter_json_array  # noqa: E402
+
+
+def synthetic_camp(i, rng):
+    return {
+        "name": f"Campity Camp {i}",
+        "lat": round(rng.uniform(37.0, 38.0), 6),
+        "lon": round(rng.uniform(-122.5, -121.5), 6),
+        "availableWeeks": [f"2025-06-{d:02d}" for d in range(2, 30, 7)],
+        "dropoff": "9:00am",
+        "pickup": "3:00pm",
+        "img": f"/images/camp-{i}.jpg",
+        "description": "Outdoor adventures, crafts and games. " * rng.randint(2, 12),
+        "booking_url": f"https://www.campitycamp.com/book/{i}",
+        "cost": rng.randint(150, 600),
+        "ageFrom": rng.randint(4, 8),
+        "ageTo": rng.randint(9, 14),
+    }
+
+
+def write_dump(path, size_mb):
+    rng = random.Random(42)
+    target = size_mb * 1024 * 1024
+    written = 0
+    count = 0
+    with open(path, "w", encoding="utf-8") as file:
+        file.write("const camps = [\n")
+        while written < target:
+            line = json.dumps(synthetic_camp(count, rng))
+            file.write(("," if count else "") + line + "\n")
+            written += len(line) + 2
+            count += 1
+        file.write("];\n")
+    return count
+
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    size_mb = int(args[0]) if args else 300
+    use_mmap = "--mmap" in sys.argv
+    compare = "--compare" in sys.argv
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "data.js")
+        print(f"writing {size_mb} MB synthetic dump...")
+        expected = write_dump(path, size_mb)
+        baseline_rss = peak_rss_mb()
+
+        started = time.perf_counter()
+        count = 0
+        for batch in batched(iter_json_array(path, use_mmap=use_mmap), 500):
+            count += len(batch)
+        seconds = time.perf_counter() - started
+        assert count == expected, (count, expected)
+
+        print(f"mode:        {'mmap' if use_mmap else 'buffered'} streaming")
+        print(f"records:     {count}")
+        print(f"throughput:  {count / seconds:,.0f} records/s, {size_mb / seconds:,.1f} MB/s")
+        print(f"peak RSS:    {peak_rss_mb():,.1f} MB (before parsing {baseline_rss:,.1f} MB)")
+
+        if compare:
+            started = time.perf_counter()
+            with open(path, "r") as file:
+                text = file.read()
+            events = json.loads(text[text.index("[") : text.rindex("]") + 1])
+            seconds = time.perf_counter() - started
+            print(f"json.loads:  {len(events) / seconds:,.0f} records/s, peak RSS {peak_rss_mb():,.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+"""Load test of the FastAPI app against local stand-in sites and a local storage backend.
+
+Run from the repository root:
+
+    python benchmarks/load_test.py [--concurrency 1,2,4,8] [--requests 8]
+                                   [--routes /scrape-month,/scrape-activityhero2]
+                                   [--events-per-day 20] [--sleep-scale 0.05]
+                                   [--browser-start 0.5] [--backend memory] [--json]
+
+A local HTTP server stands in for kidsoutandabout (event lists, event
+pages and the monthly calendar feed read by `/scrape-month?mode=ics`)
+and ActivityHero. A
+stand-in driver replaces Chrome: it fetches pages from that server over
+HTTP and waits `--browser-start` seconds per launch. The fixed JavaScript
+waits in main.py are scaled by `--sleep-scale`. Writes go to the
+`--backend` storage backend (memory or sqlite; see db.py) instead of
+Supabase. The app runs under uvicorn in
+this process. For each route and concurrency level the harness reports
+throughput, p50/p99 latency and the peak RSS, process and thread counts.
+Caches start empty, so the first level measures cold crawls and later
+levels the fingerprint/record-cache path. Nothing leaves the machine.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import calendar
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# ---- stand-in sites -------------------------------------------------------
+
+def kidsoutandabout_list(day, events):
+    items = "".join(
+        f"""<div class="node-activity">
+          <h2><a href="/event/{day}-{i}">Event {i} on {day}</a></h2>
+          <div class="address-org-name"><span class="fn">Org {i % 7}</span></div>
+          <div class="adr"><div class="street-address">{100 + i} Main St</div>
+            <span class="locality">Austin</span><span class="region">TX</span>
+            <span class="postal-code">78701</span><div class="country-name">US</div>
+            <a href="https://maps.google.com/?q=30.{2600 + i},-97.{7400 + i}">map</a></div>
+          <div class="field-type-datetime"><span class="date-display-single">{day}</span></div>
+          <div class="field-name-field-time">Time: 9:00am - 3:00pm</div>
+          <div class="field-name-field-short-description"><div class="field-items">Fun {i}</div></div>
+        </div>"""
+        for i in range(events)
+    )
+    return f"<html><body>{items}</body></html>"
+
+
+def kidsoutandabout_detail(path):
+    return f"""<html><body>
+      <div class="field-name-field-email-address"><a href="mailto:x@example.com">x@example.com</a></div>
+      <div class="field-name-field-price"><div class="field-item">$25.00</div></div>
+      <div class="field-name-field-ages field-type-entityreference field-label-above">Ages 5-10</div>
+      <div class="field-name-field-activity-type field-type-entityreference field-label-hidden"><a>Camp</a></div>
+      <p>{path}</p></body></html>"""
+
+
+def kidsoutandabout_ics(month, events):
+    year, number = map(int, month.split("-"))
+    days = calendar.monthrange(year, number)[1]
+    vevents = "".join(
+        f"BEGIN:VEVENT\r\nUID:{month}-{day}-{i}\r\nSUMMARY:Event {i} on {month}-{day:02d}\r\n"
+        f"DTSTART:{year}{number:02d}{day:02d}T090000\r\nDTEND:{year}{number:02d}{day:02d}T150000\r\n"
+        f"URL:/event/{month}-{day:02d}-{i}\r\nLOCATION:{100 + i} Main St\\, Austin\\, TX\r\n"
+        f"ORGANIZER;CN=Org {i % 7}:mailto:x@example.com\r\nEND:VEVENT\r\n"
+        for day in range(1, days + 1)
+        for i in range(events)
+    )
+    return f"BEGIN:VCALENDAR\r\nVERSION:2.0\r\n{vevents}END:VCALENDAR\r\n"
+
+
+def activityhero_list(events):
+    tiles = "".join(
+        f'<div class="tile-title new-version"><a href="/activity/{i}">Activity {i}</a></div>' for i in range(events)
+    )
+    return f"<html><body>{tiles}</body></html>"
+
+
+def activityhero_detail(path):
+    return f"""<html><body>
+      <div class="header-title">Activity {path}</div>
+      <div class="schedule-location-container">Place<a>1 Congress Ave, Austin, TX</a></div>
+      <span class="phone-number">512-555-0100</span>
+      <div class="carousel-image-wrapper"><img src="/img/{path}.png"></div>
+      <div class="overview"><p>Description of {path}</p></div>
+      <div id="check-sessions"></div></body></html>"""
+
+
+ACTIVITYHERO_MODAL = """<div class="modal-content">
+  <div class="alt-price-wrapper">$120.00 / $95.00</div>
+  <div class="popover-container-class"><div class="section"><strong>Jun 9, 2025</strong></div></div>
+  <div class="time-str">9:00am - 3:00pm</div><div class="age-str">Ages 6-12</div></div>"""
+
+
+def stand_in_handler(events_per_day):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = self.path.split("?")[0]
+            if path.startswith("/event-list/"):
+                body = kidsoutandabout_list(path.rsplit("/", 1)[1], events_per_day)
+            elif path.startswith("/calendar/ical/"):
+                body = kidsoutandabout_ics(path.rsplit("/", 1)[1], events_per_day)
+            elif path.startswith("/event/"):
+                body = kidsoutandabout_detail(path)
+            elif path.startswith("/activityhero"):
+                body = activityhero_list(events_per_day)
+            elif path.endswith("/modal"):
+                body = ACTIVITYHERO_MODAL
+            elif path.startswith("/activity/"):
+                body = activityhero_detail(path)
+            else:
+                self.send_error(404)
+                return
+            payload = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+# ---- stand-in browser ----------------------------------------------------
+
+class StandInElement:
+    def __init__(self, driver, selector):
+        self.driver = driver
+        self.selector = selector
+
+    def click(self):
+        pass
+
+    def get_attribute(self, name):
+        import requests
+
+        return requests.get(self.driver.current_url + "/modal", timeout=10).text
+
+
+class StandInDriver:
+    """Fetches pages over HTTP like a browser would, with a launch cost."""
+
+    def __init__(self, start_seconds):
+        time.sleep(start_seconds)
+        self.current_url = None
+        self.page_source = ""
+
+    def get(self, url):
+        import requests
+
+        self.current_url = url
+        self.page_source = requests.get(url, timeout=10).text
+
+    def find_element(self, by, value):
+        return StandInElement(self, value)
+
+    def execute_script(self, script, *args):
+        return None
+
+    def quit(self):
+        pass
+
+
+# ---- measurement ----------------------------------------------------------
+
+class ResourceSampler(threading.Thread):
+    """Samples this process's RSS, process tree and thread count."""
+
+    def __init__(self, interval=0.05):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.stop_event = threading.Event()
+        self.reset()
+
+    def reset(self):
+        self.peak = {"rss_mb": 0.0, "processes": 0, "threads": 0}
+
+    def run(self):
+        from browser import process_tree, rss_mb
+
+        while not self.stop_event.wait(self.interval):
+            pids = process_tree(os.getpid())
+            sample = {"rss_mb": rss_mb(pids), "processes": len(pids), "threads": threading.active_count()}
+            for key, value in sample.items():
+                self.peak[key] = max(self.peak[key], value)
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def run_level(base_url, route, concurrency, total, sampler):
+    import requests
+
+    def call(_):
+        started = time.perf_counter()
+        try:
+            ok = requests.get(base_url + route, timeout=600).status_code == 200
+        except requests.RequestException:
+            ok = False
+        return time.perf_counter() - started, ok
+
+    sampler.reset()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(call, range(total)))
+    elapsed = time.perf_counter() - started
+    latencies = [latency for latency, _ in results]
+    return {
+        "route": route,
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": sum(1 for _, ok in results if not ok),
+        "throughput_rps": round(total / elapsed, 2),
+        "p50_ms": round(percentile(latencies, 0.5) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+        **sampler.peak,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", default="1,2,4,8")
+    parser.add_argument("--requests", type=int, default=0, help="per level; default 2x concurrency")
+    parser.add_argument("--routes", default="/scrape-month,/scrape-activityhero2")
+    parser.add_argument("--events-per-day", type=int, default=20)
+    parser.add_argument("--sleep-scale", type=float, default=0.05)
+    parser.add_argument("--browser-start", type=float, default=0.5)
+    parser.add_argument("--backend", default="memory", choices=["memory", "sqlite"])
+    parser.add_argument("--json", action="store_true")
+    parser.add_argument("--verbose", action="store_true", help="keep the scrapers' own output")
+    options = parser.parse_args()
+
+    site = ThreadingHTTPServer(("127.0.0.1", 0), stand_in_handler(options.events_per_day))
+    threading.Thread(target=site.serve_forever, daemon=True).start()
+    site_url = f"http://127.0.0.1:{site.server_address[1]}"
+
+    # Module-level settings are read at import, so configure them first
+    os.environ["SCRAPER_CACHE_DIR"] = tempfile.mkdtemp(prefix="load-test-")
+    os.environ["KIDSOUTANDABOUT_URL"] = site_url
+    os.environ["STORAGE_BACKEND"] = options.backend
+    sys.path.insert(0, ROOT)
+
+    import uvicorn
+    import browser
+    import main as app_module
+    from db import storage_backend
+
+    browser.get_selenium_driver = lambda performance_log=False: StandInDriver(options.browser_start)
+    app_module.sleep = lambda seconds: time.sleep(seconds * options.sleep_scale)
+    app_module.BASE_URL = site_url
+    app_module.ACTIVITYHERO_URL = site_url + "/activityhero"
+
+    server = uvicorn.Server(uvicorn.Config(app_module.app, host="127.0.0.1", port=0, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    app_url = f"http://127.0.0.1:{server.servers[0].sockets[0].getsockname()[1]}"
+
+    # The scrapers print every page; keep only the report unless asked
+    report = sys.stdout
+    if not options.verbose:
+        sys.stdout = open(os.devnull, "w")
+
+    sampler = ResourceSampler()
+    sampler.start()
+    rows = []
+    for route in options.routes.split(","):
+        for concurrency in (int(level) for level in options.concurrency.split(",")):
+            total = options.requests or 2 * concurrency
+            row = run_level(app_url, route, concurrency, total, sampler)
+            rows.append(row)
+            if not options.json:
+                print(
+                    f"{row['route']:<24} c={concurrency:<3} {row['throughput_rps']:>7} req/s"
+                    f"  p50 {row['p50_ms']:>8} ms  p99 {row['p99_ms']:>8} ms"
+                    f"  errors {row['errors']:<3} rss {row['rss_mb']:>7} MB"
+                    f"  procs {row['processes']:<3} threads {row['threads']}",
+                    file=report,
+                    flush=True,
+                )
+
+    sampler.stop_event.set()
+    server.should_exit = True
+    site.shutdown()
+    summary = {"levels": rows, "storage": storage_backend(options.backend).summary()}
+    if options.json:
+        print(json.dumps(summary, indent=2), file=report)
+    else:
+        print(f"storage: {summary['storage']}", file=report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+import os
+import atexit
+import random
+import signal
+import weakref
+from collections import defaultdict
+from contextlib import contextmanager
+
+from replay import REPLAY_MODE, ReplayDriver, wrap_driver
+
+USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/91.0.4472.124 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 Chrome/91.0.4472.124 Safari/537.36",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 Chrome/91.0.4472.114 Safari/537.36",
+]
+
+
+# ✅ **Initialize Selenium WebDriver**
+def get_selenium_driver(performance_log=False):
+    if REPLAY_MODE == "replay":
+        # Recorded pages stand in for Chrome (see replay.py)
+        return ReplayDriver()
+
+    # Selenium and webdriver_manager are only imported by paths that need Chrome
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless")  # Run in headless mode
+    options.add_argument(f"user-agent={random.choice(USER_AGENTS)}")
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    if performance_log:
+        # Exposes DevTools network events for network-idle detection
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    driver = webdriver.Chrome(
+        service=Service(ChromeDriverManager().install()), options=options
+    )
+    return wrap_driver(driver)
+
+
+# Recycle a browser once its process tree uses this much memory, or after this many pages
+MAX_BROWSER_RSS_MB = float(os.getenv("MAX_BROWSER_RSS_MB", "800"))
+MAX_PAGES_PER_BROWSER = int(os.getenv("MAX_PAGES_PER_BROWSER", "50"))
+
+# Every live worker, for browser_stats()
+_workers = weakref.WeakSet()
+_totals = {"started": 0, "recycled": 0, "killed": 0}
+
+
+def _proc_stat(pid):
+    """(state, ppid) of a process from /proc, or None when it's gone (or not Linux)."""
+    try:
+        with open(f"/proc/{pid}/stat") as file:
+            fields = file.read().rsplit(")", 1)[1].split()
+    except (OSError, IndexError):
+        return None
+    return fields[0], int(fields[1])
+
+
+def process_tree(pid):
+    """`pid` and all of its descendants that are still running."""
+    if _proc_stat(pid) is None:
+        return []
+    children = defaultdict(list)
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            stat = _proc_stat(int(entry))
+            if stat:
+                children[stat[1]].append(int(entry))
+    tree, stack = [], [pid]
+    while stack:
+        current = stack.pop()
+        tree.append(current)
+        stack.extend(children.get(current, []))
+    return tree
+
+
+def rss_mb(pids):
+    """Combined resident memory of `pids` in MB."""
+    total_kb = 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/status") as file:
+                for line in file:
+                    if line.startswith("VmRSS:"):
+                        total_kb += int(line.split()[1])
+                        break
+        except OSError:
+            continue
+    return round(total_kb / 1024, 1)
+
+
+def _kill(pids):
+    for pid in pids:
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except OSError:
+            pass
+
+
+class BrowserWorker:
+    """A Chrome instance reused across pages, recycled before it leaks.
+
+    Use `with worker.page() as driver:` for each page. The browser starts on
+    first use; after every page a watchdog checks the process tree and
+    kills and replaces the browser when it exceeds MAX_BROWSER_RSS_MB, has
+    served MAX_PAGES_PER_BROWSER pages, shows zombie processes, or the page
+    raised. `close()` (or leaving the `with` block) always quits Chrome and
+    kills anything left of its process tree.
+    """
+
+    def __init__(self, name="browser", performance_log=False, max_rss_mb=None, max_pages=None):
+        self.name = name
+        self.performance_log = performance_log
+        self.max_rss_mb = MAX_BROWSER_RSS_MB if max_rss_mb is None else max_rss_mb
+        self.max_pages = MAX_PAGES_PER_BROWSER if max_pages is None else max_pages
+        self.driver = None
+        self.pid = None
+        self.pages = 0
+        self.total_pages = 0
+        self.restarts = 0
+        self.peak_rss_mb = 0.0
+        _workers.add(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _start(self):
+        self.driver = get_selenium_driver(performance_log=self.performance_log)
+        service = getattr(getattr(self.driver, "service", None), "process", None)
+        self.pid = service.pid if service else None
+        self.pages = 0
+        _totals["started"] += 1
+
+    def processes(self):
+        return process_tree(self.pid) if self.pid else []
+
+    def rss_mb(self):
+        return rss_mb(self.processes())
+
+    def _unhealthy(self):
+        """Why the browser should be replaced, or None."""
+        pids = self.processes()
+        if self.pid and not pids:
+            return "exited"
+        if any((_proc_stat(pid) or ("Z",))[0] == "Z" for pid in pids):
+            return "zombie processes"
+        memory = rss_mb(pids)
+        self.peak_rss_mb = max(self.peak_rss_mb, memory)
+        if self.max_rss_mb and memory > self.max_rss_mb:
+            return f"RSS {memory} MB over {self.max_rss_mb} MB"
+        if self.max_pages and self.pages >= self.max_pages:
+            return f"served {self.pages} pages"
+        return None
+
+    @contextmanager
+    def page(self):
+        if self.driver is None:
+            self._start()
+        try:
+            yield self.driver
+        except Exception:
+            self.recycle("page raised")
+            raise
+        self.pages += 1
+        self.total_pages += 1
+        reason = self._unhealthy()
+        if reason:
+            self.recycle(reason)
+
+    def recycle(self, reason):
+        print(f"♻️ Replacing {self.name} browser: {reason}")
+        self.close()
+        self.restarts += 1
+        _totals["recycled"] += 1
+
+    def close(self):
+        if self.driver is None:
+            return
+        pids = self.processes()
+        try:
+            self.driver.quit()
+        except Exception as e:
+            print(f"❌ {self.name} browser did not quit cleanly: {str(e)}")
+        leftover = [pid for pid in pids if _proc_stat(pid) is not None]
+        if leftover:
+            _kill(leftover)
+            _totals["killed"] += len(leftover)
+        self.driver = None
+        self.pid = None
+
+    def stats(self):
+        return {
+            "name": self.name,
+            "running": self.driver is not None,
+            "pid": self.pid,
+            "processes": len(self.processes()),
+            "rss_mb": self.rss_mb(),
+            "peak_rss_mb": self.peak_rss_mb,
+            "pages": self.total_pages,
+            "restarts": self.restarts,
+        }
+
+
+@contextmanager
+def browser_session(performance_log=False, name="browser"):
+    """One browser for one job; always quit, even when the job raises."""
+    worker = BrowserWorker(name, performance_log=performance_log, max_pages=0)
+    try:
+        with worker.page() as driver:
+            yield driver
+    finally:
+        worker.close()
+
+
+@atexit.register
+def close_all():
+    """Quits every live browser, so an interrupted crawl leaves no Chrome behind."""
+    for worker in list(_workers):
+        worker.close()
+
+
+def browser_stats():
+    """Memory and lifetime stats of every live browser worker."""
+    return {"workers": [worker.stats() for worker in list(_workers)], **_totals}
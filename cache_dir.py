@@ -0,0 +1,106 @@
+"""Where the scrapers keep local state, defined once.
+
+SCRAPER_CACHE_DIR wins when set. Otherwise state goes to `.cache` in the
+working directory, or to a directory under the system temp dir when the
+working directory is read-only (on Vercel only /tmp is writable).
+
+A serverless /tmp does not outlive the function instance, so snapshots,
+fingerprints, the scrape log and the record cache would start empty on
+every cron run: every event looks new and every day of the horizon is
+due. Set CACHE_STATE_BUCKET to a Supabase Storage bucket and the cron
+job restores that state from it before the run (`restore_state`) and
+uploads it afterwards (`save_state`). Without a bucket the state only
+lasts as long as the instance, and `restore_state` says so.
+"""
+import io
+import os
+import tarfile
+import tempfile
+
+
+def _default_cache_dir():
+    # Vercel sets VERCEL; checking it too covers processes that may write anywhere
+    if not os.getenv("VERCEL") and os.access(os.getcwd(), os.W_OK):
+        return ".cache"
+    return os.path.join(tempfile.gettempdir(), "scraper-cache")
+
+
+CACHE_DIR = os.getenv("SCRAPER_CACHE_DIR") or _default_cache_dir()
+
+CACHE_STATE_BUCKET = os.getenv("CACHE_STATE_BUCKET")
+CACHE_STATE_OBJECT = os.getenv("CACHE_STATE_OBJECT", "scraper-state.tar.gz")
+# What a run needs from the previous one; images, profiles and replays can be rebuilt
+STATE_ENTRIES = (
+    "fingerprints.sqlite3",
+    "scrape_log.sqlite3",
+    "records.sqlite3",
+    "activities.sqlite3",
+    "discovery.sqlite3",
+    "snapshots",
+)
+
+# save_state only overwrites the bucket after a successful restore (or an empty one)
+_restored = False
+
+
+def cache_path(*parts):
+    """A path under CACHE_DIR."""
+    return os.path.join(CACHE_DIR, *parts)
+
+
+def _bucket():
+    from db import get_supabase
+
+    return get_supabase().storage.from_(CACHE_STATE_BUCKET)
+
+
+def restore_state():
+    """Unpacks the state saved by the previous run into CACHE_DIR; returns whether it did."""
+    global _restored
+    if not CACHE_STATE_BUCKET:
+        if not os.getenv("SCRAPER_CACHE_DIR") and CACHE_DIR != ".cache":
+            print(f"⚠️ No CACHE_STATE_BUCKET: state in {CACHE_DIR} is lost when this instance ends")
+        return False
+    if any(os.path.exists(cache_path(name)) for name in STATE_ENTRIES):
+        # A warm instance: its own state is at least as new as the saved one
+        _restored = True
+        return False
+    try:
+        body = _bucket().download(CACHE_STATE_OBJECT)
+    except Exception as e:
+        if "not found" in str(e).lower():
+            _restored = True  # first run: nothing to lose by saving
+        print(f"❌ Could not restore state from {CACHE_STATE_BUCKET}/{CACHE_STATE_OBJECT}: {str(e)}")
+        return False
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with tarfile.open(fileobj=io.BytesIO(body), mode="r:gz") as archive:
+        if hasattr(tarfile, "data_filter"):
+            archive.extractall(CACHE_DIR, filter="data")
+        else:
+            archive.extractall(CACHE_DIR)
+    _restored = True
+    print(f"📦 Restored {len(body)} bytes of state from {CACHE_STATE_BUCKET}/{CACHE_STATE_OBJECT}")
+    return True
+
+
+def save_state():
+    """Uploads STATE_ENTRIES (with SQLite -wal/-shm files) for the next run; returns whether it did."""
+    if not CACHE_STATE_BUCKET or not _restored:
+        return False
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+        for name in os.listdir(CACHE_DIR) if os.path.isdir(CACHE_DIR) else []:
+            if name.split("-", 1)[0] in STATE_ENTRIES or name in STATE_ENTRIES:
+                archive.add(os.path.join(CACHE_DIR, name), arcname=name)
+    body = buffer.getvalue()
+    try:
+        _bucket().upload(
+            CACHE_STATE_OBJECT,
+            body,
+            file_options={"content-type": "application/gzip", "upsert": "true"},
+        )
+    except Exception as e:
+        print(f"❌ Could not save state to {CACHE_STATE_BUCKET}/{CACHE_STATE_OBJECT}: {str(e)}")
+        return False
+    print(f"📦 Saved {len(body)} bytes of state to {CACHE_STATE_BUCKET}/{CACHE_STATE_OBJECT}")
+    return True
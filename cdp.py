@@ -0,0 +1,192 @@
+import re
+import json
+import time
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+from browser import BrowserWorker
+from extraction import crawl_pages
+from normalize import convert_date_format, extract_start_end_time
+
+NETWORK_IDLE_SECONDS = 0.5
+# Like Puppeteer's networkidle2: analytics beacons and long polls never settle
+NETWORK_IDLE_MAX_INFLIGHT = 2
+# Streams stay open for the life of the page, so they never count as in flight
+STREAMING_REQUEST_TYPES = ("WebSocket", "EventSource")
+NAVIGATION_TIMEOUT = 15
+MODAL_TIMEOUT_MS = 5000
+
+# Reads the event page and the sessions modal in one round trip. Mirrors the
+# selectors used by scrape_activityhero_event_details2.
+ACTIVITYHERO_EXTRACT_JS = """
+(async () => {
+  const text = (selector, root = document) => {
+    const el = root.querySelector(selector);
+    return el ? el.textContent.trim() : null;
+  };
+  const location = document.querySelector('.schedule-location-container');
+  const locationLink = location ? location.querySelector('a') : null;
+  const image = document.querySelector('.carousel-image-wrapper img');
+  const data = {
+    title: text('.header-title'),
+    location_name: location && location.firstChild ? location.firstChild.textContent.trim() : null,
+    address: locationLink ? locationLink.textContent : null,
+    phone: text('span.phone-number'),
+    image_url: image ? image.getAttribute('src') : null,
+    description: text('.overview p'),
+  };
+  const button = document.getElementById('check-sessions');
+  if (!button) return data;
+  button.click();
+  const deadline = Date.now() + %(modal_timeout)d;
+  let modal = null;
+  while (Date.now() < deadline) {
+    modal = document.querySelector('.modal-content');
+    if (modal && modal.querySelector('.time-str, .age-str, .alt-price-wrapper')) break;
+    await new Promise((resolve) => setTimeout(resolve, 100));
+  }
+  if (!modal) return data;
+  const time = modal.querySelector('.time-str');
+  data.price_text = text('.alt-price-wrapper', modal);
+  data.date_text = text('.popover-container-class .section strong', modal);
+  data.time_text = time && time.firstChild ? time.firstChild.textContent.trim() : null;
+  data.age_text = text('.age-str', modal);
+  return data;
+})()
+""" % {"modal_timeout": MODAL_TIMEOUT_MS}
+
+
+class CdpTab:
+    """One long-lived Chrome tab driven through the DevTools protocol.
+
+    The browser comes from a BrowserWorker started with performance logging,
+    so network activity can be observed and the worker's watchdog can
+    replace a browser that leaks. Use `with tab.page():` for each page.
+    """
+
+    def __init__(self, worker):
+        self.worker = worker
+        self.driver = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @contextmanager
+    def page(self):
+        with self.worker.page() as driver:
+            if driver is not self.driver:
+                # First page, or the watchdog replaced the browser
+                driver.execute_cdp_cmd("Network.enable", {})
+                driver.execute_cdp_cmd("Page.enable", {})
+                self.driver = driver
+            yield self
+
+    def _drain_log(self, inflight):
+        loaded = False
+        for entry in self.driver.get_log("performance"):
+            message = json.loads(entry["message"])["message"]
+            method = message.get("method")
+            params = message.get("params", {})
+            if method == "Network.requestWillBeSent":
+                if params.get("type") not in STREAMING_REQUEST_TYPES:
+                    inflight.add(params.get("requestId"))
+            elif method in ("Network.loadingFinished", "Network.loadingFailed"):
+                inflight.discard(params.get("requestId"))
+            elif method == "Page.loadEventFired":
+                loaded = True
+        return loaded
+
+    def navigate(
+        self, url, idle_seconds=NETWORK_IDLE_SECONDS, timeout=NAVIGATION_TIMEOUT, max_inflight=NETWORK_IDLE_MAX_INFLIGHT
+    ):
+        """Navigates and returns once the page loaded and the network went quiet.
+
+        Quiet means at most `max_inflight` requests open for `idle_seconds`.
+        """
+        self._drain_log(set())  # Discard events from the previous page
+        self.driver.execute_cdp_cmd("Page.navigate", {"url": url})
+
+        inflight = set()
+        loaded = False
+        idle_since = None
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            loaded = self._drain_log(inflight) or loaded
+            if loaded and len(inflight) <= max_inflight:
+                idle_since = idle_since or time.monotonic()
+                if time.monotonic() - idle_since >= idle_seconds:
+                    return True
+            else:
+                idle_since = None
+            time.sleep(0.05)
+        print(f"⚠️ Network never went idle for {url}, extracting anyway")
+        return False
+
+    def evaluate(self, expression):
+        """Runs `expression` in the page, awaiting promises, and returns its value."""
+        result = self.driver.execute_cdp_cmd(
+            "Runtime.evaluate",
+            {"expression": expression, "awaitPromise": True, "returnByValue": True},
+        )
+        if "exceptionDetails" in result:
+            raise RuntimeError(result["exceptionDetails"].get("text", "script failed"))
+        return result.get("result", {}).get("value")
+
+    def close(self):
+        self.worker.close()
+        self.driver = None
+
+
+def activityhero_record(event_url, data):
+    """Builds the same record shape as scrape_activityhero_event_details2."""
+    data = data or {}
+    extracted_prices = re.findall(r"\d+\.\d+", data.get("price_text") or "")
+    date_text = data.get("date_text")
+    date = [convert_date_format(date_text)] if date_text else "No Date"
+    start_time, end_time = extract_start_end_time(data.get("time_text") or "No Time")
+    ages = [data["age_text"]] if data.get("age_text") else ["No Age Info"]
+
+    return {
+        "name": data.get("title") or "No Title",
+        "organization": "Activityhero",
+        "location": {"street": data.get("address") or "No Address"},
+        "dates": [date],
+        "start_time": start_time,
+        "end_time": end_time,
+        "phone": data.get("phone") or "No Phone",
+        "image_url": data.get("image_url") or "No Image",
+        "description": data.get("description") or "No Description",
+        "event_url": event_url,
+        "email": "No Email",
+        "price": float(extracted_prices[0]) if extracted_prices else 0.0,
+        "ages": [ages],
+        "tags": ["No Tags"],
+    }
+
+
+def scrape_activityhero_details_cdp(event_urls, report, workers=2):
+    """Scrapes ActivityHero event pages with one reused tab per worker thread.
+
+    Each worker crawls its share of the pages through crawl_pages, so a page
+    that raises is logged in `report` instead of failing the batch.
+    """
+
+    def crawl(urls, index):
+        with CdpTab(BrowserWorker(f"activityhero-cdp-{index}", performance_log=True)) as tab:
+            return crawl_pages(report, urls, lambda event_url: scrape(tab, event_url))
+
+    def scrape(tab, event_url):
+        started = time.monotonic()
+        with tab.page():
+            tab.navigate(event_url)
+            record = activityhero_record(event_url, tab.evaluate(ACTIVITYHERO_EXTRACT_JS))
+        print(f"⚡ CDP scraped {event_url} in {time.monotonic() - started:.1f}s")
+        return record
+
+    workers = max(1, min(workers, len(event_urls)))
+    shares = [event_urls[index::workers] for index in range(workers)]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return [record for records in pool.map(crawl, shares, range(workers)) for record in records]
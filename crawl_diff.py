@@ -0,0 +1,69 @@
+import os
+import requests
+
+from activity_store import activity_key
+from db import backend_path
+from snapshots import SNAPSHOT_DIR, read_snapshot, record_hash
+
+CHANGELOG_WEBHOOKS = [url.strip() for url in os.getenv("CHANGELOG_WEBHOOKS", "").split(",") if url.strip()]
+
+
+def load_previous_state(source):
+    """`{key: (record_hash, event_url)}` from the source's latest snapshot.
+
+    Returns None when there is no snapshot (first run, or pyarrow missing),
+    so callers can tell "nothing to compare with" from "empty crawl".
+    """
+    try:
+        table = read_snapshot(source, root=backend_path(SNAPSHOT_DIR))
+    except Exception as e:
+        print(f"❌ Could not read previous {source} snapshot: {str(e)}")
+        return None
+    if table is None:
+        return None
+    columns = table.select(["key", "record_hash", "event_url"]).to_pydict()
+    return {
+        key: (digest, url)
+        for key, digest, url in zip(columns["key"], columns["record_hash"], columns["event_url"])
+    }
+
+
+def diff_crawl(previous, events):
+    """Compares a crawl with the previous state by natural key and record hash.
+
+    Runs in time linear in the size of both crawls. Returns a changelog
+    dict: `added` and `modified` hold current records, `removed` holds
+    `{"key", "event_url"}` entries for events that disappeared.
+    """
+    added, modified = [], []
+    seen = set()
+    for event in events:
+        key = activity_key(event)
+        if key in seen:
+            continue
+        seen.add(key)
+        old = previous.get(key)
+        if old is None:
+            added.append(event)
+        elif old[0] != record_hash(event):
+            modified.append(event)
+    removed = [
+        {"key": key, "event_url": url} for key, (_, url) in previous.items() if key not in seen
+    ]
+    return {"added": added, "modified": modified, "removed": removed}
+
+
+def changelog_summary(changelog):
+    return {kind: len(entries) for kind, entries in changelog.items()}
+
+
+def publish_changelog(source, changelog, webhooks=CHANGELOG_WEBHOOKS):
+    """POSTs a non-empty changelog to every subscriber webhook."""
+    if not webhooks or not any(changelog.values()):
+        return
+    payload = {"source": source, **changelog}
+    for url in webhooks:
+        try:
+            requests.post(url, json=payload, timeout=10).raise_for_status()
+        except Exception as e:
+            print(f"❌ Changelog webhook {url} failed: {str(e)}")
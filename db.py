@@ -0,0 +1,229 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+
+from cache_dir import cache_path
+
+# "supabase" (default), "sqlite" for a local file, or "memory" for dry runs
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "supabase")
+STORAGE_SQLITE_PATH = os.getenv("STORAGE_SQLITE_PATH", cache_path("storage.sqlite3"))
+
+
+@lru_cache(maxsize=None)
+def get_supabase():
+    """Creates the Supabase client on first use instead of at import time."""
+    from dotenv import load_dotenv
+    from supabase import create_client
+
+    load_dotenv()
+    return create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY"))
+
+
+class UnknownStorageBackend(ValueError):
+    """A backend name that is not in BACKENDS."""
+
+
+def _count(stats, operation, rows, elapsed):
+    entry = stats.setdefault(operation, {"calls": 0, "rows": 0, "seconds": 0.0})
+    entry["calls"] += 1
+    entry["rows"] += rows
+    entry["seconds"] += elapsed
+
+
+def _summary(name, stats):
+    return {
+        "backend": name,
+        **{operation: {**entry, "seconds": round(entry["seconds"], 4)} for operation, entry in stats.items()},
+    }
+
+
+# Stats dicts of the `using_storage` runs the current context is inside
+_runs = ContextVar("storage_runs", default=())
+
+
+class StorageBackend:
+    """Where scraped rows are written: `insert` rows and `delete_in` by column value.
+
+    Every call is timed, so `stats` shows what the write path costs on its
+    own: calls, rows and seconds per operation, since the process started.
+    The run `using_storage` yields counts the same for that run alone.
+    """
+
+    name = None
+
+    def __init__(self):
+        self.stats_lock = threading.Lock()
+        self.stats = {}
+
+    @contextmanager
+    def _timed(self, operation, rows):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self.stats_lock:
+                _count(self.stats, operation, rows, elapsed)
+                for run in _runs.get():
+                    _count(run, operation, rows, elapsed)
+
+    def insert(self, table, rows):
+        with self._timed("insert", len(rows)):
+            self._insert(table, rows)
+
+    def delete_in(self, table, column, values):
+        values = list(values)
+        with self._timed("delete", len(values)):
+            self._delete_in(table, column, values)
+
+    def summary(self):
+        with self.stats_lock:
+            return _summary(self.name, self.stats)
+
+
+class SupabaseBackend(StorageBackend):
+    name = "supabase"
+
+    def _insert(self, table, rows):
+        get_supabase().table(table).insert(rows).execute()
+
+    def _delete_in(self, table, column, values):
+        get_supabase().table(table).delete().in_(column, values).execute()
+
+
+class SQLiteBackend(StorageBackend):
+    """Rows stored as JSON in a local SQLite file, one table per Supabase table."""
+
+    name = "sqlite"
+
+    def __init__(self, path=STORAGE_SQLITE_PATH):
+        super().__init__()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.tables = set()
+
+    def _table(self, table):
+        if table not in self.tables:
+            self.conn.execute(
+                f'CREATE TABLE IF NOT EXISTS "{table}" (id INTEGER PRIMARY KEY, event_url TEXT, record TEXT NOT NULL)'
+            )
+            self.conn.execute(f'CREATE INDEX IF NOT EXISTS "{table}_event_url" ON "{table}" (event_url)')
+            self.tables.add(table)
+        return f'"{table}"'
+
+    def _insert(self, table, rows):
+        with self.lock, self.conn:
+            self.conn.executemany(
+                f"INSERT INTO {self._table(table)} (event_url, record) VALUES (?, ?)",
+                [(row.get("event_url"), json.dumps(row, default=str)) for row in rows],
+            )
+
+    def _delete_in(self, table, column, values):
+        target = "event_url" if column == "event_url" else f"json_extract(record, '$.{column}')"
+        with self.lock, self.conn:
+            name = self._table(table)
+            for start in range(0, len(values), 500):
+                chunk = values[start : start + 500]
+                self.conn.execute(
+                    f"DELETE FROM {name} WHERE {target} IN ({', '.join('?' * len(chunk))})", chunk
+                )
+
+    def rows(self, table):
+        with self.lock:
+            return [json.loads(row[0]) for row in self.conn.execute(f"SELECT record FROM {self._table(table)}")]
+
+
+class MemoryBackend(StorageBackend):
+    """Keeps rows in process memory; for dry runs and measuring everything but the database."""
+
+    name = "memory"
+
+    def __init__(self):
+        super().__init__()
+        self.lock = threading.Lock()
+        self.tables = {}
+
+    def _insert(self, table, rows):
+        with self.lock:
+            self.tables.setdefault(table, []).extend(dict(row) for row in rows)
+
+    def _delete_in(self, table, column, values):
+        drop = set(values)
+        with self.lock:
+            self.tables[table] = [row for row in self.tables.get(table, []) if row.get(column) not in drop]
+
+    def rows(self, table):
+        with self.lock:
+            return list(self.tables.get(table, []))
+
+
+BACKENDS = {"supabase": SupabaseBackend, "sqlite": SQLiteBackend, "memory": MemoryBackend}
+
+_selected = ContextVar("storage_backend", default=None)
+
+
+@lru_cache(maxsize=None)
+def storage_backend(name):
+    """The shared instance of a named backend."""
+    if name not in BACKENDS:
+        raise UnknownStorageBackend(f"Unknown storage backend {name!r}; expected one of {', '.join(BACKENDS)}")
+    return BACKENDS[name]()
+
+
+def get_storage():
+    """The backend for the current run: the one selected by `using_storage`, else STORAGE_BACKEND."""
+    return storage_backend(_selected.get() or STORAGE_BACKEND)
+
+
+def backend_path(path):
+    """Where local state that tracks written rows lives for the selected backend.
+
+    Snapshots, fingerprints, the scrape log and the activity store record
+    what a run wrote. Supabase runs keep them at `path`; other backends get
+    `<dir>/<backend>/<name>`, so a dry run never makes the next real run
+    believe its rows were already written.
+    """
+    name = _selected.get() or STORAGE_BACKEND
+    if name == SupabaseBackend.name:
+        return path
+    directory, filename = os.path.split(path)
+    return os.path.join(directory, name, filename)
+
+
+class StorageRun:
+    """One run on a shared backend; `summary()` covers only this run's writes."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.stats = {}
+
+    def summary(self):
+        with self.backend.stats_lock:
+            return _summary(self.backend.name, self.stats)
+
+    def __getattr__(self, name):
+        return getattr(self.backend, name)
+
+
+@contextmanager
+def using_storage(name):
+    """Sends this run's writes to backend `name` (None keeps the enclosing choice or the default).
+
+    Yields a StorageRun. The choice is per context, so concurrent requests
+    can use different backends. Raises UnknownStorageBackend for a name
+    not in BACKENDS.
+    """
+    run = StorageRun(storage_backend(name or _selected.get() or STORAGE_BACKEND))
+    selected = _selected.set(name or _selected.get())
+    runs = _runs.set(_runs.get() + (run.stats,))
+    try:
+        yield run
+    finally:
+        _runs.reset(runs)
+        _selected.reset(selected)
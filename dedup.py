@@ -0,0 +1,299 @@
+import re
+import zlib
+import random
+
+from geo import encode_geohash, extract_coordinates
+
+# MinHash / LSH settings: 64 hash functions split into 16 bands of 4 rows.
+# Two names whose shingle sets have Jaccard similarity around 0.6 or higher
+# almost always share at least one band bucket.
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+# Name similarity at which two events at the same place are merged, and the
+# lower bound of the borderline band that is only flagged for review
+SIMILARITY_THRESHOLD = 0.8
+REVIEW_THRESHOLD = 0.6
+# Events with coordinates but no street are blocked by geohash cell (~150m at 7)
+BLOCK_GEOHASH_PRECISION = 7
+# Each new name is compared with at most this many earlier names per LSH bucket,
+# so a block full of look-alike names ("Art Camp Week 3") stays linear
+MAX_BUCKET_COMPARISONS = 32
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(2025)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERM)
+]
+
+_NON_ALNUM = re.compile(r"[^a-z0-9 ]+")
+_NUMBERS = re.compile(r"\d+")
+_SPACES = re.compile(r"\s+")
+_STOPWORDS = {"the", "a", "an", "and", "of", "at", "in", "camp", "camps", "summer"}
+_PLACEHOLDERS = {
+    "no title",
+    "no organization",
+    "no organizer",
+    "no street address",
+    "no address",
+    "no location",
+}
+_STREET_ABBREVIATIONS = {
+    "street": "st",
+    "avenue": "ave",
+    "road": "rd",
+    "boulevard": "blvd",
+    "drive": "dr",
+    "lane": "ln",
+    "suite": "ste",
+}
+
+
+def normalize_text(value):
+    """Lowercases, strips punctuation and placeholders, and collapses spaces."""
+    if not value or not isinstance(value, str):
+        return ""
+    value = value.lower().strip()
+    if value in _PLACEHOLDERS:
+        return ""
+    value = _NON_ALNUM.sub(" ", value)
+    words = [
+        _STREET_ABBREVIATIONS.get(word, word)
+        for word in value.split()
+        if word not in _STOPWORDS
+    ]
+    return _SPACES.sub(" ", " ".join(words)).strip()
+
+
+def location_text(location):
+    """Flattens the different location shapes the scrapers emit into one string."""
+    if isinstance(location, dict):
+        parts = [location.get("street"), location.get("city"), location.get("postal_code")]
+        return " ".join(p for p in parts if isinstance(p, str))
+    if isinstance(location, str):
+        return location
+    return ""
+
+
+def normalized_key(event):
+    """Exact-match key for an event: normalized name, organization and street."""
+    return (
+        normalize_text(event.get("name") or event.get("title")),
+        normalize_text(event.get("organization")),
+        normalize_text(location_text(event.get("location"))),
+    )
+
+
+def _street_line(location):
+    if isinstance(location, dict):
+        location = location.get("street")
+    if not isinstance(location, str):
+        return ""
+    # "1 Congress Ave, Austin, TX" and street="1 Congress Ave" share the first line
+    return normalize_text(location.split(",")[0])
+
+
+def block_key(event):
+    """Where an event takes place, as far as duplicates are concerned.
+
+    The first words of the street line when there is one (sources format
+    the rest of the address differently), else a coarse geohash of its
+    coordinates, else the organization. Only events in the same block are
+    compared; events with none of these get None and are never merged.
+    """
+    street = _street_line(event.get("location"))
+    if street:
+        return "at:" + " ".join(street.split()[:3])
+    coordinates = extract_coordinates(event)
+    if coordinates:
+        return "near:" + encode_geohash(*coordinates, precision=BLOCK_GEOHASH_PRECISION)
+    organization = normalize_text(event.get("organization"))
+    return "by:" + organization if organization else None
+
+
+def _shingles(text):
+    if len(text) <= SHINGLE_SIZE:
+        return {text} if text else set()
+    return {text[i : i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def minhash_signature(text):
+    """Returns the MinHash signature of the character shingles of `text`."""
+    hashes = [zlib.crc32(s.encode("utf-8")) for s in _shingles(text)]
+    if not hashes:
+        return None
+    return tuple(
+        min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in _PERMUTATIONS
+    )
+
+
+def estimated_similarity(sig_a, sig_b):
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / NUM_PERM
+
+
+class _DisjointSet:
+    def __init__(self, size):
+        self.parent = list(range(size))
+
+    def find(self, i):
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i, j):
+        root_i, root_j = self.find(i), self.find(j)
+        if root_i != root_j:
+            # Keep the earliest record as the cluster representative
+            self.parent[max(root_i, root_j)] = min(root_i, root_j)
+
+
+def find_duplicates(events, threshold=SIMILARITY_THRESHOLD, review_threshold=REVIEW_THRESHOLD):
+    """Groups near-duplicate events and lists the borderline pairs.
+
+    Events are only compared within their block (see block_key). Equal
+    normalized names merge; otherwise MinHash/LSH over the name alone
+    proposes candidates. Candidates at `threshold` or above merge unless
+    their names carry different numbers ("Session 1" / "Session 2").
+    Candidates from `review_threshold` up that don't merge are returned as
+    `(i, j, similarity)` borderline pairs. Each name is checked against at
+    most MAX_BUCKET_COMPARISONS earlier names per bucket, so this runs in
+    roughly linear time.
+    Returns `(groups, borderline)`; groups are index lists sorted ascending.
+    """
+    groups = _DisjointSet(len(events))
+    exact = {}
+    blocks, names, signatures = [], [], []
+
+    for i, event in enumerate(events):
+        block = block_key(event)
+        name = normalize_text(event.get("name") or event.get("title"))
+        blocks.append(block)
+        names.append(name)
+        signatures.append(minhash_signature(name) if block else None)
+        if block and name:
+            if (block, name) in exact:
+                groups.union(exact[(block, name)], i)
+            else:
+                exact[(block, name)] = i
+
+    borderline = {}
+    buckets = {}
+    for i, signature in enumerate(signatures):
+        if signature is None:
+            continue
+        for band in range(BANDS):
+            band_key = (blocks[i], band, signature[band * ROWS : (band + 1) * ROWS])
+            for j in buckets.setdefault(band_key, [])[-MAX_BUCKET_COMPARISONS:]:
+                if groups.find(i) == groups.find(j) or (j, i) in borderline:
+                    continue
+                similarity = estimated_similarity(signatures[i], signatures[j])
+                same_numbers = set(_NUMBERS.findall(names[i])) == set(_NUMBERS.findall(names[j]))
+                if similarity >= threshold and same_numbers:
+                    groups.union(i, j)
+                elif similarity >= review_threshold:
+                    borderline[(j, i)] = similarity
+            buckets[band_key].append(i)
+
+    clusters = {}
+    for i in range(len(events)):
+        clusters.setdefault(groups.find(i), []).append(i)
+    pairs = [
+        (j, i, similarity) for (j, i), similarity in borderline.items() if groups.find(i) != groups.find(j)
+    ]
+    return list(clusters.values()), pairs
+
+
+def find_duplicate_groups(events, threshold=SIMILARITY_THRESHOLD):
+    """Groups near-duplicate events; see find_duplicates."""
+    return find_duplicates(events, threshold)[0]
+
+
+def _is_placeholder(value):
+    return isinstance(value, str) and value.startswith("No ")
+
+
+def _merge_list(target, extra):
+    for item in extra:
+        if item not in target and not _is_placeholder(item):
+            target.append(item)
+    if len(target) > 1:
+        target[:] = [item for item in target if not _is_placeholder(item)]
+
+
+def merge_events(events):
+    """Merges a group of duplicates into the first event of the group."""
+    merged = dict(events[0])
+    for event in events[1:]:
+        for field in ("dates", "ages", "tags"):
+            if isinstance(merged.get(field), list) and isinstance(event.get(field), list):
+                merged[field] = list(merged[field])
+                _merge_list(merged[field], event[field])
+        for field, value in event.items():
+            current = merged.get(field)
+            if (not current or _is_placeholder(current)) and value:
+                merged[field] = value
+    return merged
+
+
+def _review_entry(events, i, j, similarity):
+    return {
+        "event_url": events[i].get("event_url"),
+        "name": events[i].get("name"),
+        "possible_duplicate_of": events[j].get("event_url"),
+        "similarity": round(similarity, 2),
+    }
+
+
+def dedupe_events(events, threshold=SIMILARITY_THRESHOLD, merge=True, review=None):
+    """Removes near-duplicate events before they are written.
+
+    With `merge=True` every duplicate group collapses into a single record.
+    With `merge=False` all records are kept and duplicates are flagged with
+    `duplicate_of` pointing at the representative's event URL. Borderline
+    pairs are never merged; they are appended to `review` when given.
+    """
+    groups, borderline = find_duplicates(events, threshold)
+    if review is not None:
+        review.extend(_review_entry(events, i, j, similarity) for j, i, similarity in borderline)
+    if merge:
+        result = []
+        for group in sorted(groups, key=lambda g: g[0]):
+            if len(group) == 1:
+                result.append(events[group[0]])
+            else:
+                result.append(merge_events([events[i] for i in group]))
+        return result
+
+    result = [dict(event) for event in events]
+    for group in groups:
+        representative = events[group[0]].get("event_url")
+        for i in group[1:]:
+            result[i]["duplicate_of"] = representative
+    return result
+
+
+def stored_duplicates(events, stored):
+    """Indexes of `events` that duplicate one of the `stored` records (another source's).
+
+    Returns `(duplicates, borderline)`: `duplicates` maps an event's index
+    to the stored event URL it repeats; borderline pairs against stored
+    records come back as review entries.
+    """
+    combined = list(stored) + list(events)
+    groups, pairs = find_duplicates(combined)
+    offset = len(stored)
+    duplicates = {}
+    for group in groups:
+        if group[0] < offset:
+            for i in group:
+                if i >= offset:
+                    duplicates[i - offset] = combined[group[0]].get("event_url")
+    borderline = [
+        _review_entry(combined, max(i, j), min(i, j), similarity)
+        for j, i, similarity in pairs
+        if min(i, j) < offset <= max(i, j)
+    ]
+    return duplicates, borderline
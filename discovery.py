@@ -0,0 +1,325 @@
+"""URL discovery from sitemaps and feeds instead of a browser.
+
+Sites that publish sitemap.xml (or a sitemap index), RSS/Atom or iCal
+feeds list their pages in a form that needs neither Chrome nor a JS wait.
+Every document is fetched with a conditional GET (ETag / Last-Modified),
+so an unchanged sitemap costs one 304, and parsed incrementally, so large
+sitemaps never sit in memory as a tree.
+
+The browser path stays the source of truth for which pages are links and
+what they are called: `discover_links` remembers its answer, and later
+runs only start Chrome when a sitemap lists a page it has not seen that
+sits where the listing's links do (a new blog post is not a new camp).
+"""
+import io
+import os
+import gzip
+import json
+import time
+import sqlite3
+import threading
+from urllib.parse import urljoin, urlparse
+from xml.etree.ElementTree import ParseError, iterparse
+
+from cache_dir import cache_path
+from replay import http_get
+
+DISCOVERY_DB = cache_path("discovery.sqlite3")
+# Labels learned from the browser are trusted for this long before it runs again
+DISCOVERY_MAX_AGE_HOURS = float(os.getenv("DISCOVERY_MAX_AGE_HOURS", "168"))
+# Tried in order when robots.txt names no sitemap
+SITEMAP_PATHS = ("/sitemap_index.xml", "/sitemap.xml", "/wp-sitemap.xml")
+MAX_SITEMAP_DEPTH = 3
+
+
+class DiscoveryCache:
+    """Conditional-GET cache of discovery documents and the links learned for each source."""
+
+    def __init__(self, path=DISCOVERY_DB):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS documents ("
+            "url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, body BLOB NOT NULL, fetched_at REAL NOT NULL)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS links ("
+            "source TEXT NOT NULL, url TEXT NOT NULL, label TEXT, seen_at REAL NOT NULL,"
+            " PRIMARY KEY (source, url))"
+        )
+        self.conn.commit()
+        self.stats = {"fetched": 0, "not_modified": 0, "missing": 0, "bytes": 0}
+
+    def fetch(self, url, headers=None):
+        """The body at `url`, revalidated against the cached copy; None if it does not exist."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT etag, last_modified, body FROM documents WHERE url = ?", (url,)
+            ).fetchone()
+        request_headers = dict(headers or {})
+        if row and row[0]:
+            request_headers["If-None-Match"] = row[0]
+        if row and row[1]:
+            request_headers["If-Modified-Since"] = row[1]
+
+        try:
+            response = http_get(url, headers=request_headers, timeout=20)
+        except Exception as e:
+            print(f"❌ Discovery fetch failed {url}: {str(e)}")
+            return row[2] if row else None
+        if response.status_code == 304 and row:
+            self.stats["not_modified"] += 1
+            return row[2]
+        if response.status_code != 200:
+            self.stats["missing"] += 1
+            return None
+
+        body = response.content
+        self.stats["fetched"] += 1
+        self.stats["bytes"] += len(body)
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO documents (url, etag, last_modified, body, fetched_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (url, response.headers.get("ETag"), response.headers.get("Last-Modified"), body, time.time()),
+            )
+            self.conn.commit()
+        return body
+
+    def labels(self, source, max_age_hours=DISCOVERY_MAX_AGE_HOURS):
+        """`{url: label}` learned for `source`; None labels are pages known not to be links."""
+        cutoff = time.time() - max_age_hours * 3600 if max_age_hours else 0
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT url, label FROM links WHERE source = ? AND seen_at >= ? ORDER BY rowid", (source, cutoff)
+            ).fetchall()
+        return {url: None if label is None else json.loads(label) for url, label in rows}
+
+    def remember_labels(self, source, labels):
+        seen_at = time.time()
+        with self.lock:
+            self.conn.execute("DELETE FROM links WHERE source = ?", (source,))
+            self.conn.executemany(
+                "INSERT INTO links (source, url, label, seen_at) VALUES (?, ?, ?, ?)",
+                [
+                    (source, url, None if label is None else json.dumps(label), seen_at)
+                    for url, label in labels.items()
+                ],
+            )
+            self.conn.commit()
+
+
+def _stream(body):
+    """A file object over `body`, decompressed when it is gzipped (sitemap.xml.gz)."""
+    stream = io.BytesIO(body)
+    if body[:2] == b"\x1f\x8b":
+        return gzip.GzipFile(fileobj=stream)
+    return stream
+
+
+def _local(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def iter_sitemap(body):
+    """Yields `(kind, loc, lastmod)` for each entry of a sitemap or sitemap index.
+
+    `kind` is "sitemap" for a child sitemap of an index and "url" for a
+    page. Elements are cleared as soon as they are read.
+    """
+    loc = lastmod = None
+    for event, element in iterparse(_stream(body), events=("end",)):
+        tag = _local(element.tag)
+        if tag == "loc":
+            loc = (element.text or "").strip()
+        elif tag == "lastmod":
+            lastmod = (element.text or "").strip()
+        elif tag in ("url", "sitemap"):
+            if loc:
+                yield ("sitemap" if tag == "sitemap" else "url"), loc, lastmod
+            loc = lastmod = None
+            element.clear()
+
+
+def iter_feed(body):
+    """Yields the link of each RSS item or Atom entry."""
+    link = None
+    for event, element in iterparse(_stream(body), events=("end",)):
+        tag = _local(element.tag)
+        if tag == "link":
+            # RSS puts the URL in the text, Atom in href (prefer rel="alternate")
+            href = element.get("href")
+            if href and element.get("rel", "alternate") == "alternate":
+                link = href.strip()
+            elif element.text and element.text.strip():
+                link = element.text.strip()
+        elif tag in ("item", "entry"):
+            if link:
+                yield link
+            link = None
+            element.clear()
+
+
+def _unfold(lines):
+    """iCal lines with continuation lines (leading space or tab) joined back on."""
+    current = None
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield current
+        current = line
+    if current:
+        yield current
+
+
+def _unescape(value):
+    return (
+        value.replace("\\n", "\n").replace("\\N", "\n").replace("\\,", ",").replace("\\;", ";").replace("\\\\", "\\")
+    )
+
+
+def iter_ical_events(body):
+    """Yields one dict per VEVENT, mapping property names to unescaped values.
+
+    Property parameters (e.g. TZID) are kept under `"<NAME>;params"`.
+    """
+    text = io.TextIOWrapper(_stream(body), encoding="utf-8", errors="replace")
+    event = None
+    for line in _unfold(text):
+        if line == "BEGIN:VEVENT":
+            event = {}
+        elif line == "END:VEVENT":
+            if event is not None:
+                yield event
+            event = None
+        elif event is not None and ":" in line:
+            name, _, value = line.partition(":")
+            name, _, params = name.partition(";")
+            event[name.upper()] = _unescape(value)
+            if params:
+                event[f"{name.upper()};params"] = params
+
+
+def sitemap_locations(site, cache):
+    """Sitemaps named in robots.txt, else the conventional paths that exist."""
+    robots = cache.fetch(urljoin(site, "/robots.txt"))
+    if robots:
+        named = [
+            line.split(":", 1)[1].strip()
+            for line in robots.decode("utf-8", errors="replace").splitlines()
+            if line.lower().startswith("sitemap:")
+        ]
+        if named:
+            return named
+    return [urljoin(site, path) for path in SITEMAP_PATHS]
+
+
+def _sitemap_pages(url, cache, depth=0):
+    body = cache.fetch(url)
+    if not body:
+        return None
+    pages = []
+    try:
+        for kind, loc, _ in iter_sitemap(body):
+            if kind == "url":
+                pages.append(loc)
+            elif depth < MAX_SITEMAP_DEPTH:
+                pages.extend(_sitemap_pages(loc, cache, depth + 1) or [])
+    except ParseError:
+        # Sites without a sitemap often answer with an HTML page instead of a 404
+        return None
+    return pages
+
+
+def discover(site, match, cache, feeds=()):
+    """URLs of `site` accepted by `match(url)`, from its sitemaps and the given feeds.
+
+    Returns None when the site publishes no machine-readable listing, so
+    the caller knows to fall back to the browser.
+    """
+    found, readable = [], False
+    for location in sitemap_locations(site, cache):
+        pages = _sitemap_pages(location, cache)
+        if pages is None:
+            continue
+        readable = True
+        found.extend(pages)
+        if urlparse(location).path in SITEMAP_PATHS:
+            break  # the conventional paths usually mirror each other
+    for feed in feeds:
+        body = cache.fetch(feed)
+        if not body:
+            continue
+        try:
+            if body.lstrip()[:15].upper().startswith(b"BEGIN:VCALENDAR"):
+                found.extend(event["URL"] for event in iter_ical_events(body) if event.get("URL"))
+            else:
+                found.extend(iter_feed(body))
+            readable = True
+        except ParseError:
+            continue
+    if not readable:
+        return None
+    return list(dict.fromkeys(url for url in found if match(url)))
+
+
+def same_site(site):
+    """A `match` accepting any URL on the host of `site`, with or without www."""
+    host = urlparse(site).netloc.removeprefix("www.")
+    return lambda url: urlparse(url).netloc.removeprefix("www.") == host
+
+
+def _same_page(url):
+    return url.split("#", 1)[0].rstrip("/")
+
+
+def listing_shape(url):
+    """Host and parent path of `url`; the links of one listing share it.
+
+    "https://example.com/camps/mar-vista/" has the shape
+    ("example.com", ("camps",)), like every other camp under /camps/.
+    """
+    parsed = urlparse(url)
+    parts = [part for part in parsed.path.split("/") if part]
+    return parsed.netloc.removeprefix("www."), tuple(parts[:-1]) if parts else None
+
+
+def discover_links(source, site, match, browse, cache, feeds=()):
+    """`{url: label}` of a listing, from sitemaps and feeds when they are enough.
+
+    `browse()` is the browser path and returns `{url: label}`. Its answer is
+    remembered together with the discovered URLs it did not return (known
+    non-links). Once links are known, only discovered URLs with the
+    `listing_shape` of one of them are considered, so pages elsewhere on the
+    site never wake the browser. It runs again only when the site lists
+    such a page it has never seen, drops one the browser found, the learned
+    labels expire, or there is nothing machine-readable to check against.
+    """
+    urls = discover(site, match, cache, feeds)
+    known = {_same_page(url): (url, label) for url, label in cache.labels(source).items()}
+    shapes = {listing_shape(url) for url, label in known.values() if label is not None}
+    if urls and shapes:
+        urls = [url for url in urls if listing_shape(url) in shapes]
+    if urls:
+        listed = {_same_page(url) for url in urls}
+        unseen = listed - set(known)
+        dropped = {page for page, (_, label) in known.items() if label is not None} - listed
+        if not unseen and not dropped:
+            links = {url: label for page, (url, label) in known.items() if label is not None}
+            print(f"🗺️ {source}: {len(links)} links from sitemap/feeds, browser skipped")
+            return links
+        print(f"🔍 {source}: {len(unseen)} new and {len(dropped)} dropped sitemap URLs, discovering with the browser")
+    else:
+        print(f"🔍 {source}: no sitemap or feed, discovering with the browser")
+
+    links = browse()
+    if links:
+        found = {_same_page(url) for url in links}
+        learned = dict.fromkeys(url for url in urls or () if _same_page(url) not in found)
+        learned.update(links)
+        cache.remember_labels(source, learned)
+    return links
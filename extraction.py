@@ -0,0 +1,142 @@
+import os
+import threading
+from collections import Counter
+from datetime import datetime
+
+# Share of failed pages a crawl tolerates before it stops, once it has seen
+# MIN_PAGES_FOR_BUDGET pages. Per-source overrides: ERROR_BUDGETS="galileo=0.1,activityhero=0.3"
+ERROR_BUDGET = float(os.getenv("ERROR_BUDGET", "0.25"))
+ERROR_BUDGETS = {
+    source.strip(): float(budget)
+    for source, _, budget in (
+        entry.partition("=") for entry in os.getenv("ERROR_BUDGETS", "").split(",") if "=" in entry
+    )
+}
+MIN_PAGES_FOR_BUDGET = 5
+MAX_REPORTED_ERRORS = 50
+
+
+def error_budget(source):
+    return ERROR_BUDGETS.get(source, ERROR_BUDGET)
+
+
+class ExtractionReport:
+    """Per-run record of field and page failures for one source.
+
+    Safe to share between the threads of one crawl.
+    """
+
+    def __init__(self, source, budget=None):
+        self.source = source
+        self.budget = error_budget(source) if budget is None else budget
+        self.pages = 0
+        self.failed_pages = 0
+        self.failed_urls = set()
+        self.carried_forward = 0
+        self.field_errors = Counter()
+        self.errors = []
+        self.stopped = False
+        self.lock = threading.Lock()
+
+    def _log(self, url, field, error):
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(
+                {
+                    "url": url,
+                    "field": field,
+                    "error": f"{type(error).__name__}: {error}",
+                    "at": datetime.utcnow().isoformat(),
+                }
+            )
+
+    def field_error(self, url, field, error):
+        with self.lock:
+            self.field_errors[field] += 1
+            self._log(url, field, error)
+
+    def page_failed(self, url, error):
+        with self.lock:
+            self.pages += 1
+            self.failed_pages += 1
+            self.failed_urls.add(url)
+            self._log(url, None, error)
+        print(f"❌ {self.source} page failed {url}: {str(error)}")
+
+    def page_done(self):
+        with self.lock:
+            self.pages += 1
+
+    @property
+    def failure_rate(self):
+        return self.failed_pages / self.pages if self.pages else 0.0
+
+    def exhausted(self):
+        return self.pages >= MIN_PAGES_FOR_BUDGET and self.failure_rate > self.budget
+
+    def summary(self):
+        return {
+            "source": self.source,
+            "pages": self.pages,
+            "failed_pages": self.failed_pages,
+            "carried_forward": self.carried_forward,
+            "failure_rate": round(self.failure_rate, 3),
+            "budget": self.budget,
+            "stopped": self.stopped,
+            "field_errors": dict(self.field_errors),
+            "errors": self.errors,
+        }
+
+
+def extract_fields(document, fields, report=None, url=None):
+    """Runs each field extractor in isolation.
+
+    `fields` maps a field name to `(extract, default)`. An extractor that
+    raises (a missing node, a short split) or returns None/"" yields the
+    default; raised errors are added to `report`. Returns the values and
+    the names of the fields that failed.
+    """
+    values, failed = {}, []
+    for name, (extract, default) in fields.items():
+        try:
+            value = extract(document)
+        except Exception as e:
+            if report is not None:
+                report.field_error(url, name, e)
+            failed.append(name)
+            value = None
+        values[name] = default if value is None or value == "" else value
+    return values, failed
+
+
+def crawl_pages(report, items, scrape, url_of=lambda item: item, fallback=None):
+    """Calls `scrape(item)` for each item, isolating failures from the rest of the crawl.
+
+    A page that raises is logged in `report`; when `fallback(url)` returns
+    its last good record, that record is kept so the page does not look
+    removed. The crawl stops early once the source's error budget is spent,
+    setting `report.stopped`. Returns the records collected so far.
+    """
+    records = []
+    for item in items:
+        if report.stopped:
+            break  # another thread sharing the report spent the budget
+        url = url_of(item)
+        try:
+            record = scrape(item)
+        except Exception as e:
+            report.page_failed(url, e)
+            record = fallback(url) if fallback else None
+            if record is not None:
+                report.carried_forward += 1
+        else:
+            report.page_done()
+        if record is not None:
+            records.append(record)
+        if report.exhausted():
+            report.stopped = True
+            print(
+                f"❌ {report.source} error budget spent: {report.failed_pages}/{report.pages} pages failed"
+                f" (budget {report.budget:.0%}), stopping"
+            )
+            break
+    return records
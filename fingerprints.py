@@ -0,0 +1,102 @@
+import os
+import re
+import json
+import sqlite3
+import hashlib
+import threading
+from datetime import datetime
+
+from cache_dir import cache_path
+
+FINGERPRINT_DB = cache_path("fingerprints.sqlite3")
+
+# Markup that changes on every request without changing the content
+_VOLATILE = re.compile(
+    r"<script\b.*?</script>|<style\b.*?</style>|<!--.*?-->|<noscript\b.*?</noscript>"
+    r"|<input[^>]+type=[\"']hidden[\"'][^>]*>|<meta[^>]*>|<link[^>]*>",
+    re.S | re.I,
+)
+_BODY = re.compile(r"<body\b[^>]*>(.*)</body>", re.S | re.I)
+_SPACES = re.compile(r"\s+")
+
+
+def fingerprint(markup, version=None):
+    """Hashes the normalized page body (or fragment) so unchanged pages compare equal.
+
+    Pass the extractor's `version` (record_cache.extractor_version): a
+    record remembered under another version then no longer matches, so an
+    unchanged page is parsed again after the extractor changes.
+    """
+    if not markup:
+        return None
+    body = _BODY.search(markup)
+    text = body.group(1) if body else markup
+    text = _SPACES.sub(" ", _VOLATILE.sub("", text)).strip()
+    if version:
+        text = f"{version}\n{text}"
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class FingerprintStore:
+    """Remembers the last fingerprint and extracted record of every scraped URL."""
+
+    def __init__(self, path=FINGERPRINT_DB):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS fingerprints ("
+            "url TEXT PRIMARY KEY, digest TEXT NOT NULL, record TEXT NOT NULL, updated_at TEXT)"
+        )
+        self.conn.commit()
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Starts a new run: clears counters and the set of unchanged URLs."""
+        self.unchanged_urls = set()
+        self.stats = {"hits": 0, "misses": 0, "skipped_parses": 0, "skipped_writes": 0}
+
+    def lookup(self, url, digest):
+        """Returns the previously extracted record when `digest` still matches."""
+        if not url or not digest:
+            return None
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT digest, record FROM fingerprints WHERE url = ?", (url,)
+            ).fetchone()
+            if row and row[0] == digest:
+                self.stats["hits"] += 1
+                self.stats["skipped_parses"] += 1
+                self.unchanged_urls.add(url)
+                return json.loads(row[1])
+            self.stats["misses"] += 1
+        return None
+
+    def last_record(self, url):
+        """The last record extracted from `url`, whatever its fingerprint."""
+        with self.lock:
+            row = self.conn.execute("SELECT record FROM fingerprints WHERE url = ?", (url,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def remember(self, url, digest, record):
+        if not url or not digest:
+            return
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO fingerprints (url, digest, record, updated_at) VALUES (?, ?, ?, ?)",
+                (url, digest, json.dumps(record, default=str), datetime.utcnow().isoformat()),
+            )
+            self.conn.commit()
+
+    def mark_unchanged(self, url):
+        """Counts `url` as unchanged without checking it (e.g. served from the record cache)."""
+        with self.lock:
+            self.unchanged_urls.add(url)
+
+    def is_unchanged(self, *urls):
+        """True when every URL matched its stored fingerprint during this run."""
+        return all(url in self.unchanged_urls for url in urls)
+
+    def skip_write(self, count=1):
+        with self.lock:
+            self.stats["skipped_writes"] += count
@@ -0,0 +1,264 @@
+import os
+import re
+import math
+import time
+import bisect
+import threading
+from functools import lru_cache
+from urllib.parse import unquote_plus
+
+from replay import http_get, sleep
+
+EARTH_RADIUS_KM = 6371.0088
+INDEX_PRECISION = 8  # ~38m x 19m cells
+MAX_QUERY_CELLS = 64
+
+NOMINATIM_URL = "https://nominatim.openstreetmap.org/search"
+# Nominatim's usage policy: an identifying User-Agent and at most one request per second
+NOMINATIM_USER_AGENT = os.getenv("NOMINATIM_USER_AGENT", "kidsoutandabout-scraper/1.0")
+NOMINATIM_INTERVAL = 1.0
+_nominatim_lock = threading.Lock()
+_nominatim_last = 0.0
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+# Coordinates embedded in Google Maps / OpenStreetMap links
+_MAP_COORDINATES = re.compile(
+    r"(?:mlat=|[?&](?:q|ll|daddr|query)=|@)(-?\d{1,2}(?:\.\d+)?)(?:&mlon=|,|%2C)\s*(-?\d{1,3}(?:\.\d+)?)",
+    re.I,
+)
+_MAP_ADDRESS = re.compile(r"[?&](?:q|daddr|query)=([^&]+)", re.I)
+
+
+def encode_geohash(lat, lon, precision=INDEX_PRECISION):
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        rng, coord = (lon_range, lon) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        if coord >= mid:
+            value = (value << 1) | 1
+            rng[0] = mid
+        else:
+            value <<= 1
+            rng[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits, value = 0, 0
+    return "".join(chars)
+
+
+def cell_size(precision):
+    """Returns the `(lat_degrees, lon_degrees)` size of a geohash cell."""
+    lon_bits = math.ceil(precision * 5 / 2)
+    lat_bits = precision * 5 // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lon_bits)
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    dlat = math.radians(lat2 - lat1)
+    dlon = math.radians(lon2 - lon1)
+    a = (
+        math.sin(dlat / 2) ** 2
+        + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlon / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def radius_bbox(lat, lon, radius_km):
+    """Bounding box `(min_lat, min_lon, max_lat, max_lon)` enclosing a circle."""
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    cos_lat = max(math.cos(math.radians(lat)), 1e-6)
+    dlon = min(180.0, math.degrees(radius_km / (EARTH_RADIUS_KM * cos_lat)))
+    return max(-90.0, lat - dlat), max(-180.0, lon - dlon), min(90.0, lat + dlat), min(180.0, lon + dlon)
+
+
+def covering_cells(min_lat, min_lon, max_lat, max_lon):
+    """Geohash prefixes covering a bounding box, using the finest precision
+    that needs at most MAX_QUERY_CELLS cells."""
+    for precision in range(INDEX_PRECISION, 0, -1):
+        height, width = cell_size(precision)
+        rows = int((max_lat - min_lat) / height) + 2
+        cols = int((max_lon - min_lon) / width) + 2
+        if rows * cols <= MAX_QUERY_CELLS or precision == 1:
+            break
+    cells = set()
+    for r in range(rows):
+        lat = min(min_lat + r * height, max_lat)
+        for c in range(cols):
+            lon = min(min_lon + c * width, max_lon)
+            cells.add(encode_geohash(lat, lon, precision))
+    return sorted(cells)
+
+
+def coordinates_from_link(link):
+    if not link or not isinstance(link, str):
+        return None
+    match = _MAP_COORDINATES.search(link)
+    if not match:
+        return None
+    lat, lon = float(match.group(1)), float(match.group(2))
+    if -90 <= lat <= 90 and -180 <= lon <= 180:
+        return lat, lon
+    return None
+
+
+def address_from_record(record):
+    """Best address string for geocoding: the map link's query or the street fields."""
+    location = record.get("location")
+    if isinstance(location, str):
+        return location
+    if not isinstance(location, dict):
+        return None
+    match = _MAP_ADDRESS.search(location.get("google_maps") or "")
+    if match:
+        return unquote_plus(match.group(1))
+    parts = [
+        location.get(field)
+        for field in ("street", "city", "state", "postal_code")
+        if isinstance(location.get(field), str) and not location[field].startswith("No ")
+    ]
+    return ", ".join(parts) or None
+
+
+def _nominatim_turn():
+    """Waits until the next Nominatim request is allowed; callers queue up one at a time."""
+    global _nominatim_last
+    with _nominatim_lock:
+        wait = _nominatim_last + NOMINATIM_INTERVAL - time.monotonic()
+        if wait > 0:
+            sleep(wait)
+        _nominatim_last = time.monotonic()
+
+
+def get_address_details(address):
+    # Use Nominatim API for reverse geocoding
+    _nominatim_turn()
+    response = http_get(
+        NOMINATIM_URL,
+        params={"q": address, "format": "json", "addressdetails": 1},
+        headers={"User-Agent": NOMINATIM_USER_AGENT},
+        timeout=20,
+    )
+    data = response.json()
+    
+    if data:
+        # Extract the first result
+        result = data[0]
+        
+        # Get the necessary address components
+        street = result.get("address", {}).get("road", "")
+        city = result.get("address", {}).get("city", "")
+        state = result.get("address", {}).get("state", "")
+        postal_code = result.get("address", {}).get("postcode", "")
+        country = result.get("address", {}).get("country", "")
+        
+        # Construct the final dictionary with Google Maps URL
+        address_dict = {
+            "street": street,
+            "city": city,
+            "state": state,
+            "postal_code": postal_code,
+            "country": country,
+            "google_maps": f"https://www.openstreetmap.org/?mlat={result['lat']}&mlon={result['lon']}"
+        }
+        
+        return address_dict
+
+
+@lru_cache(maxsize=4096)
+def _geocode(geocoder, address):
+    details = geocoder(address)
+    return coordinates_from_link(details.get("google_maps")) if details else None
+
+
+def extract_coordinates(record, geocoder=None):
+    """Returns `(lat, lon)` for a scraped record, or None.
+
+    Uses explicit lat/lon fields (Campity), then coordinates in map links
+    (kidsoutandabout, get_address_details), then `geocoder` if one is given.
+    `geocoder` takes an address and returns a get_address_details-style dict.
+    """
+    location = record.get("location")
+    if isinstance(location, dict):
+        try:
+            if location.get("lat") is not None and location.get("lon") is not None:
+                return float(location["lat"]), float(location["lon"])
+        except (TypeError, ValueError):
+            pass
+        coordinates = coordinates_from_link(location.get("google_maps"))
+        if coordinates:
+            return coordinates
+    if geocoder:
+        address = address_from_record(record)
+        if address:
+            try:
+                return _geocode(geocoder, address)
+            except Exception as e:
+                print(f"❌ Geocoding failed for {address}: {str(e)}")
+    return None
+
+
+class GeoIndex:
+    """In-memory geohash index: a sorted list of `(geohash, id)` pairs.
+
+    Any geohash prefix maps to one contiguous slice of the list, so radius
+    and bounding-box queries only touch the cells that cover the query.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = []
+        self.points = {}
+
+    def add(self, item_id, lat, lon):
+        with self.lock:
+            self._remove(item_id)
+            geohash = encode_geohash(lat, lon)
+            bisect.insort(self.entries, (geohash, item_id))
+            self.points[item_id] = (lat, lon, geohash)
+
+    def remove(self, item_id):
+        with self.lock:
+            self._remove(item_id)
+
+    def _remove(self, item_id):
+        point = self.points.pop(item_id, None)
+        if point:
+            i = bisect.bisect_left(self.entries, (point[2], item_id))
+            if i < len(self.entries) and self.entries[i] == (point[2], item_id):
+                del self.entries[i]
+
+    def __len__(self):
+        return len(self.points)
+
+    def _candidates(self, min_lat, min_lon, max_lat, max_lon):
+        candidates = []
+        with self.lock:
+            for cell in covering_cells(min_lat, min_lon, max_lat, max_lon):
+                start = bisect.bisect_left(self.entries, (cell,))
+                end = bisect.bisect_left(self.entries, (cell + "~",))
+                for _, item_id in self.entries[start:end]:
+                    lat, lon, _ = self.points[item_id]
+                    candidates.append((item_id, lat, lon))
+        return candidates
+
+    def within_bbox(self, min_lat, min_lon, max_lat, max_lon):
+        """Ids of every point inside the bounding box."""
+        return [
+            item_id
+            for item_id, lat, lon in self._candidates(min_lat, min_lon, max_lat, max_lon)
+            if min_lat <= lat <= max_lat and min_lon <= lon <= max_lon
+        ]
+
+    def within_radius(self, lat, lon, radius_km, limit=None):
+        """`(id, distance_km)` pairs within `radius_km`, nearest first."""
+        hits = []
+        for item_id, item_lat, item_lon in self._candidates(*radius_bbox(lat, lon, radius_km)):
+            distance = haversine_km(lat, lon, item_lat, item_lon)
+            if distance <= radius_km:
+                hits.append((item_id, distance))
+        hits.sort(key=lambda hit: hit[1])
+        return hits[:limit] if limit else hits
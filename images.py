@@ -0,0 +1,201 @@
+import os
+import re
+import sqlite3
+import hashlib
+import tempfile
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from cache_dir import cache_path
+
+IMAGE_CACHE_DIR = cache_path("images")
+# Public prefix the cached thumbnails are served under (see /images/{name})
+IMAGE_CACHE_URL = os.getenv("IMAGE_CACHE_URL", "/images")
+
+IMAGE_WORKERS = 8
+MAX_IMAGE_BYTES = 10 * 1024 * 1024
+MAX_IMAGE_PIXELS = 40_000_000
+THUMBNAIL_SIZE = (320, 320)
+REQUEST_TIMEOUT = 15
+
+ASSET_NAME = re.compile(r"^[0-9a-f]{64}\.(webp|img)$")
+
+HEADERS = {"User-Agent": "Mozilla/5.0"}
+
+
+def _pillow():
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    Image.MAX_IMAGE_PIXELS = MAX_IMAGE_PIXELS
+    return Image
+
+
+class ImageCache:
+    """Content-addressed image cache with thumbnails.
+
+    Originals are stored as `originals/<sha256>.img` and thumbnails as
+    `<sha256>.webp`; a small SQLite table maps source URLs to digests so
+    already-cached URLs are not downloaded again. Images that download fine
+    but cannot be thumbnailed (SVG, some ICO files) map to their own URL
+    and keep being served from the source.
+    """
+
+    def __init__(self, root=IMAGE_CACHE_DIR):
+        self.root = root
+        self.originals = os.path.join(root, "originals")
+        os.makedirs(self.originals, exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(os.path.join(root, "index.sqlite3"), check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS images (url TEXT PRIMARY KEY, asset TEXT, checked_at TEXT)"
+        )
+        self.conn.commit()
+
+    def path(self, asset):
+        return os.path.join(self.root, asset)
+
+    def _known(self, url):
+        with self.lock:
+            row = self.conn.execute("SELECT asset FROM images WHERE url = ?", (url,)).fetchone()
+        if row and row[0] == url:
+            return url
+        if row and row[0] and os.path.exists(self.path(row[0])):
+            return row[0]
+        return None
+
+    def _remember(self, url, asset):
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO images (url, asset, checked_at) VALUES (?, ?, ?)",
+                (url, asset, datetime.utcnow().isoformat()),
+            )
+            self.conn.commit()
+
+    def check(self, url):
+        """HEAD-checks an image URL; falls back to GET for servers that reject HEAD."""
+        try:
+            response = requests.head(url, headers=HEADERS, allow_redirects=True, timeout=REQUEST_TIMEOUT)
+            if response.status_code in (403, 405, 501):
+                response = requests.get(url, headers=HEADERS, stream=True, timeout=REQUEST_TIMEOUT)
+                response.close()
+        except requests.RequestException:
+            return False
+        content_type = response.headers.get("Content-Type", "image/")
+        length = int(response.headers.get("Content-Length") or 0)
+        return response.status_code < 400 and content_type.startswith("image/") and length <= MAX_IMAGE_BYTES
+
+    def _download(self, url):
+        """Streams an image to disk while hashing it; returns its digest or None."""
+        digest = hashlib.sha256()
+        size = 0
+        with requests.get(url, headers=HEADERS, stream=True, timeout=REQUEST_TIMEOUT) as response:
+            if response.status_code >= 400:
+                return None
+            handle, tmp_path = tempfile.mkstemp(dir=self.originals)
+            try:
+                with os.fdopen(handle, "wb") as file:
+                    for chunk in response.iter_content(64 * 1024):
+                        size += len(chunk)
+                        if size > MAX_IMAGE_BYTES:
+                            return None
+                        digest.update(chunk)
+                        file.write(chunk)
+                original = os.path.join(self.originals, digest.hexdigest() + ".img")
+                if os.path.exists(original):
+                    os.remove(tmp_path)
+                else:
+                    os.replace(tmp_path, original)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+        return digest.hexdigest()
+
+    def _thumbnail(self, digest):
+        """Writes `<digest>.webp`; returns the asset name, or the original without Pillow."""
+        original = os.path.join(self.originals, digest + ".img")
+        Image = _pillow()
+        if Image is None:
+            os.makedirs(self.root, exist_ok=True)
+            asset = digest + ".img"
+            if not os.path.exists(self.path(asset)):
+                os.link(original, self.path(asset))
+            return asset
+
+        asset = digest + ".webp"
+        if os.path.exists(self.path(asset)):
+            return asset
+        with Image.open(original) as image:
+            # JPEG decoders can downscale while decoding, which keeps memory small
+            image.draft("RGB", THUMBNAIL_SIZE)
+            image = image.convert("RGB")
+            image.thumbnail(THUMBNAIL_SIZE)
+            tmp_path = self.path(asset + ".tmp")
+            image.save(tmp_path, "WEBP", quality=80)
+            os.replace(tmp_path, self.path(asset))
+        return asset
+
+    def cache(self, url):
+        """Returns the cached asset name for `url`, or None when the image is broken.
+
+        An image that downloads but can't be thumbnailed returns `url` itself.
+        """
+        asset = self._known(url)
+        if asset:
+            return asset
+        try:
+            if not self.check(url):
+                return None
+            digest = self._download(url)
+        except Exception as e:
+            print(f"❌ Image cache failed for {url}: {str(e)}")
+            return None
+        if not digest:
+            return None
+        try:
+            asset = self._thumbnail(digest)
+        except Exception as e:
+            # The image is fine, Pillow just can't read it (SVG, ICO, ...)
+            print(f"⚠️ No thumbnail for {url}, keeping the original: {str(e)}")
+            asset = url
+        if asset:
+            self._remember(url, asset)
+        return asset
+
+
+def process_images(records, cache=None, workers=IMAGE_WORKERS):
+    """Validates and caches every record's image, pointing records at the cached asset.
+
+    Runs at most `workers` downloads at a time. Broken images become
+    "No Image"; images that can't be thumbnailed and URLs that aren't
+    absolute http(s) links are left alone.
+    Returns the updated records and a stats dict.
+    """
+    cache = cache or ImageCache()
+    urls = {
+        record.get("image_url")
+        for record in records
+        if isinstance(record.get("image_url"), str) and record["image_url"].startswith("http")
+    }
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        assets = dict(zip(urls, pool.map(cache.cache, urls)))
+
+    updated = []
+    for record in records:
+        url = record.get("image_url")
+        if url in assets and assets[url] != url:
+            record = dict(record)
+            record["image_url"] = f"{IMAGE_CACHE_URL}/{assets[url]}" if assets[url] else "No Image"
+        updated.append(record)
+
+    stats = {
+        "checked": len(urls),
+        "cached": sum(1 for url, asset in assets.items() if asset and asset != url),
+        "original": sum(1 for url, asset in assets.items() if asset == url),
+        "broken": sum(1 for asset in assets.values() if not asset),
+    }
+    return updated, stats
@@ -0,0 +1,545 @@
+import os
+import re
+import json
+from datetime import date, datetime, timedelta, timezone
+from urllib.parse import urljoin
+from zoneinfo import ZoneInfo
+
+from bs4 import BeautifulSoup
+
+from db import using_storage
+from discovery import iter_ical_events
+from fingerprints import fingerprint
+from normalize import extract_start_end_time
+from pipeline import (
+    get_discovery_cache,
+    get_fingerprints,
+    get_record_cache,
+    get_scrape_log,
+    publish_crawl,
+)
+from record_cache import extractor_version
+from replay import http_get
+from scheduler import run_prioritized, select_tasks
+
+HEADERS = {"User-Agent": "Mozilla/5.0"}
+
+TEST_MODE = True
+
+KIDSOUTANDABOUT_URL = os.getenv("KIDSOUTANDABOUT_URL", "https://austin.kidsoutandabout.com")
+
+# Days ahead covered by each crawl, and how many already-scraped days to re-check per run
+HORIZON_DAYS = int(os.getenv("HORIZON_DAYS", "90"))
+REFRESH_SAMPLE = int(os.getenv("REFRESH_SAMPLE", "7"))
+
+# "pages" scrapes the daily event lists; "ics" reads the monthly calendar feed
+KIDSOUTANDABOUT_MODE = os.getenv("KIDSOUTANDABOUT_MODE", "pages")
+# Drupal calendar feed of one month; {month} is YYYY-MM
+KIDSOUTANDABOUT_ICS_URL = os.getenv(
+    "KIDSOUTANDABOUT_ICS_URL", KIDSOUTANDABOUT_URL + "/calendar/ical/{month}"
+)
+KIDSOUTANDABOUT_TZ = ZoneInfo(os.getenv("KIDSOUTANDABOUT_TZ", "America/Chicago"))
+
+DETAIL_FIELDS = ("email", "price", "ages", "tags")
+
+
+def _merge_details(event, extra_details, fields=DETAIL_FIELDS):
+    """Copies the detail page's `fields` onto a listing event; returns whether any changed."""
+    changed = False
+    for field in fields:
+        if field in extra_details and event.get(field) != extra_details[field]:
+            event[field] = extra_details[field]
+            changed = True
+    return changed
+
+
+def get_dates_for_current_month():
+    today = datetime.today()
+    start_of_month = datetime(today.year, today.month, 1)
+    next_month = (start_of_month + timedelta(days=32)).replace(day=1)
+    num_days = (next_month - start_of_month).days
+    limit_days = 2 if TEST_MODE else num_days
+    return [
+        (start_of_month + timedelta(days=i)).strftime("%Y-%m-%d")
+        for i in range(limit_days)
+    ]
+
+
+def get_horizon_dates(days=HORIZON_DAYS, today=None):
+    """Dates from today through the rolling horizon (2 days in TEST_MODE)."""
+    today = today or date.today()
+    limit_days = 2 if TEST_MODE else days
+    return [(today + timedelta(days=i)).isoformat() for i in range(limit_days)]
+
+
+# Scrape event details page
+def scrape_event_details(event_url):
+    if not event_url:
+        return {"email": "No Email", "price": 0.0}
+
+    # Recently extracted by this version of the extractor: skip the request entirely
+    cached = get_record_cache().get(event_url, EVENT_DETAILS_VERSION)
+    if cached is not None:
+        get_fingerprints().mark_unchanged(event_url)
+        return cached
+
+    response = http_get(event_url, headers=HEADERS)
+
+    if response.status_code != 200:
+        return {"email": "No Email", "price": 0.0}
+
+    # Reuse the last extraction if the page body hasn't changed
+    digest = fingerprint(response.text, EVENT_DETAILS_VERSION)
+    cached = get_fingerprints().lookup(event_url, digest)
+    if cached is not None:
+        get_record_cache().put(event_url, EVENT_DETAILS_VERSION, cached)
+        return cached
+
+    soup = BeautifulSoup(response.text, "html.parser")
+
+    # Extract email
+    email_element = soup.select_one(".field-name-field-email-address a[href^='mailto']")
+    email = email_element.text.strip() if email_element else "No Email"
+
+    # Extract Price
+    price_element = soup.select_one(".field-name-field-price .field-item")
+    price = 0.0
+    if price_element:
+        extracted_price = re.findall(r"\d+\.\d+|\d+", price_element.text.strip())
+        price = float(extracted_price[0]) if extracted_price else 0.0
+
+    # Extract Age Groups
+    age_elements = soup.select(
+        ".field-name-field-ages.field-type-entityreference.field-label-above"
+    )
+    ages = (
+        [age.text.strip() for age in age_elements]
+        if age_elements
+        else ["Unknown Age Group"]
+    )
+
+    # Extract Tags
+    tag_elements = soup.select(
+        ".field-name-field-activity-type.field-type-entityreference.field-label-hidden a"
+    )
+    tags = [tag.text.strip() for tag in tag_elements] if tag_elements else ["No Tags"]
+
+    details = {"email": email, "price": price, "ages": ages, "tags": tags}
+    get_fingerprints().remember(event_url, digest, details)
+    get_record_cache().put(event_url, EVENT_DETAILS_VERSION, details)
+    return details
+
+
+EVENT_DETAILS_VERSION = extractor_version(scrape_event_details)
+
+
+def scrape_event_list(event_date):
+    """Scrapes one day's event list; returns all its events and the changed ones."""
+    all_events = []
+    changed_events = []
+    url = f"{KIDSOUTANDABOUT_URL}/event-list/{event_date}"
+    print(f"Scraping events from: {url}")  # ✅ Debugging Line
+
+    response = http_get(url, headers=HEADERS)
+
+    if response.status_code == 200:
+        soup = BeautifulSoup(response.text, "html.parser")
+        event_items = soup.select("div.node-activity")
+
+        for event in event_items:
+            title_element = event.select_one("h2 a")
+            event_url = (
+                f"{KIDSOUTANDABOUT_URL}{title_element['href']}"
+                if title_element
+                else None
+            )
+
+            # Skip re-parsing listing markup that hasn't changed since last run
+            list_key = f"list:{event_url or event_date}"
+            list_digest = fingerprint(str(event), EVENT_LIST_VERSION)
+            cached_event = get_fingerprints().lookup(list_key, list_digest)
+            if cached_event is not None:
+                extra_details = scrape_event_details(event_url) if event_url else {}
+                if _merge_details(cached_event, extra_details):
+                    # Carry-forward reads this record on days the refresh sample skips
+                    get_fingerprints().remember(list_key, list_digest, cached_event)
+                all_events.append(cached_event)
+                if get_fingerprints().is_unchanged(list_key, *filter(None, [event_url])):
+                    get_fingerprints().skip_write()
+                else:
+                    changed_events.append(cached_event)
+                continue
+
+            # Extract Event Title
+            print("DEBUG: FULL EVENT HTML")
+            print(event.prettify())  # Shows properly formatted HTML
+            # If `<h2><a></a></h2>` is empty, check inside `.group-activity-details`
+            if title_element and title_element.text.strip():
+                title = title_element.text.strip()
+            else:
+                # Search for the title inside `group-activity-details` as a backup
+                backup_title_element = event.select_one(
+                    ".group-activity-details h2 a"
+                )
+                title = (
+                    backup_title_element.text.strip()
+                    if backup_title_element
+                    else "No Title"
+                )
+
+            # Extract Organization
+            org_element = event.find("div", class_="address-org-name")
+            organization = (
+                org_element.find("span", class_="fn").text.strip()
+                if org_element
+                else "No Organization"
+            )
+
+            # Extract Location
+            location_element = event.find("div", class_="adr")
+            location = {
+                "street": (
+                    location_element.find(
+                        "div", class_="street-address"
+                    ).text.strip()
+                    if location_element
+                    and location_element.find("div", class_="street-address")
+                    else "No Street Address"
+                ),
+                "city": (
+                    location_element.find("span", class_="locality").text.strip()
+                    if location_element
+                    and location_element.find("span", class_="locality")
+                    else "No City"
+                ),
+                "state": (
+                    location_element.find("span", class_="region").text.strip()
+                    if location_element
+                    and location_element.find("span", class_="region")
+                    else "No State"
+                ),
+                "postal_code": (
+                    location_element.find("span", class_="postal-code").text.strip()
+                    if location_element
+                    and location_element.find("span", class_="postal-code")
+                    else "No Postal Code"
+                ),
+                "country": (
+                    location_element.find("div", class_="country-name").text.strip()
+                    if location_element
+                    and location_element.find("div", class_="country-name")
+                    else "No Country"
+                ),
+                "google_maps": (
+                    location_element.find("a")["href"]
+                    if location_element and location_element.find("a")
+                    else "No Map Link"
+                ),
+            }
+
+            # Extract Dates
+            date_elements = event.select(
+                "div.field-type-datetime span.date-display-single"
+            )
+            dates = (
+                [d.text.strip() for d in date_elements]
+                if date_elements
+                else ["No Date"]
+            )
+
+            # Extract Time
+            time_element = event.find("div", class_="field-name-field-time")
+            raw_time = (
+                time_element.text.replace("Time:", "").strip()
+                if time_element
+                else "No Time"
+            )
+            start_time, end_time = extract_start_end_time(raw_time)
+
+            # Extract Phone
+            phone_element = event.select_one(".tel .value")
+            phone = phone_element.text.strip() if phone_element else "No Phone"
+
+            # Extract Image URL
+            image_element = event.select_one(
+                "div.field-name-field-enhanced-activity-image img"
+            )
+            image_url = image_element["src"] if image_element else "No Image"
+
+            # Extract Description
+            desc_element = event.select_one(
+                "div.field-name-field-short-description div.field-items"
+            )
+            description = (
+                desc_element.text.strip() if desc_element else "No Description"
+            )
+
+            # Fetch email and price from the event's detail page
+            extra_details = scrape_event_details(event_url) if event_url else {}
+            ages = extra_details.get("ages", ["Unknown Age Group"])
+            tags = extra_details.get("tags", ["No Tags"])
+
+            # Store event data
+            event_data = {
+                "name": title,
+                "organization": organization,
+                "location": location,
+                "dates": dates,
+                "start_time": start_time,
+                "end_time": end_time,
+                "phone": phone,
+                "image_url": image_url,
+                "description": description,
+                "event_url": event_url,
+                "email": extra_details.get("email", "No Email"),
+                "price": extra_details.get("price", "No Price"),
+                "ages": ages,
+                "tags": tags,
+            }
+            get_fingerprints().remember(list_key, list_digest, event_data)
+            all_events.append(event_data)
+            changed_events.append(event_data)
+
+    return all_events, changed_events
+
+
+EVENT_LIST_VERSION = extractor_version(scrape_event_list, extract_start_end_time)
+
+
+def _ical_moment(value):
+    """`(date, time or None)` of an iCal DATE or DATE-TIME, in the site's timezone."""
+    if "T" not in value:
+        return datetime.strptime(value[:8], "%Y%m%d").date(), None
+    moment = datetime.strptime(value[:15], "%Y%m%dT%H%M%S")
+    if value.endswith("Z"):
+        moment = moment.replace(tzinfo=timezone.utc).astimezone(KIDSOUTANDABOUT_TZ)
+    return moment.date(), moment.time()
+
+
+def _clock(moment):
+    return moment.strftime("%I:%M%p").lstrip("0").lower()
+
+
+def _display_date(day):
+    # The shape of the list pages' date-display-single, e.g. "Tue, Oct 20, 2026"
+    return day.strftime("%a, %b %d, %Y").replace(" 0", " ")
+
+
+def _feed_url(vevent):
+    # Feeds may give the event path only, like the list pages' links
+    return urljoin(KIDSOUTANDABOUT_URL + "/", vevent["URL"]) if vevent.get("URL") else None
+
+
+def _param(params, name):
+    for param in params.split(";"):
+        key, _, value = param.partition("=")
+        if key.upper() == name:
+            return value.strip('"')
+    return None
+
+
+def ical_event(vevent):
+    """Maps one VEVENT to `(first_day, last_day, event)` in the event list's record shape.
+
+    Fields the feed does not carry get the list page's placeholders; email,
+    price, ages and tags come from the event page (see scrape_ics_day).
+    """
+    first_day, start = _ical_moment(vevent["DTSTART"])
+    last_day, end = _ical_moment(vevent.get("DTEND", vevent["DTSTART"]))
+    if end is None and last_day > first_day:
+        last_day -= timedelta(days=1)  # an all-day DTEND is exclusive
+
+    if start and end:
+        raw_time = f"{_clock(start)} - {_clock(end)}"
+    else:
+        raw_time = _clock(start) if start else "All Day"
+    start_time, end_time = extract_start_end_time(raw_time)
+
+    dates = _display_date(first_day)
+    if last_day != first_day:
+        # "Oct 19 - Oct 21, 2026", a range normalize.parse_date_range understands
+        dates = f"{first_day:%b} {first_day.day} - {last_day:%b} {last_day.day}, {last_day.year}"
+
+    google_maps = "No Map Link"
+    if ";" in vevent.get("GEO", ""):
+        latitude, longitude = vevent["GEO"].split(";", 1)
+        google_maps = f"https://maps.google.com/?q={latitude},{longitude}"
+
+    organizer = vevent.get("ORGANIZER", "")
+    event = {
+        "name": vevent.get("SUMMARY", "No Title"),
+        "organization": _param(vevent.get("ORGANIZER;params", ""), "CN") or "No Organization",
+        "location": {
+            "street": vevent.get("LOCATION", "No Street Address"),
+            "city": "No City",
+            "state": "No State",
+            "postal_code": "No Postal Code",
+            "country": "No Country",
+            "google_maps": google_maps,
+        },
+        "dates": [dates],
+        "start_time": start_time,
+        "end_time": end_time,
+        "phone": "No Phone",
+        "image_url": vevent.get("IMAGE", "No Image"),
+        "description": vevent.get("DESCRIPTION", "No Description"),
+        "event_url": _feed_url(vevent),
+        "email": organizer[7:] if organizer.lower().startswith("mailto:") else "No Email",
+        "price": "No Price",
+        "ages": ["Unknown Age Group"],
+        "tags": ["No Tags"],
+    }
+    return first_day, last_day, event
+
+
+ICS_EVENT_VERSION = extractor_version(
+    ical_event, _ical_moment, _clock, _display_date, _feed_url, _param, extract_start_end_time
+)
+
+
+def fetch_ics_month(month):
+    """The month's VEVENTs from its calendar feed (one conditional download), or None."""
+    url = KIDSOUTANDABOUT_ICS_URL.format(month=month)
+    print(f"Reading calendar feed: {url}")
+    body = get_discovery_cache().fetch(url, headers=HEADERS)
+    if not body or not body.lstrip()[:15].upper().startswith(b"BEGIN:VCALENDAR"):
+        print(f"❌ No calendar feed for {month}, falling back to the event lists")
+        return None
+    return list(iter_ical_events(body))
+
+
+def ics_events_by_day(event_dates):
+    """`{day: [vevent, ...]}` for every day in `event_dates` whose month has a feed.
+
+    Days of a month without a feed are left out, so they are scraped from
+    the event list pages instead. A multi-day event is listed on each day,
+    as on the list pages.
+    """
+    by_day = {}
+    for month in sorted({event_date[:7] for event_date in event_dates}):
+        vevents = fetch_ics_month(month)
+        if vevents is None:
+            continue
+        days = [event_date for event_date in event_dates if event_date.startswith(month)]
+        by_day.update((event_date, []) for event_date in days)
+        for vevent in vevents:
+            if "DTSTART" not in vevent:
+                continue
+            first_day, last_day, _ = ical_event(vevent)
+            for event_date in days:
+                if first_day.isoformat() <= event_date <= last_day.isoformat():
+                    by_day[event_date].append(vevent)
+    return by_day
+
+
+def scrape_ics_day(event_date, vevents):
+    """One day's events from the calendar feed; returns all its events and the changed ones.
+
+    Event pages are only fetched to add what the feed lacks (price, ages,
+    tags and a missing email), through scrape_event_details and its caches.
+    """
+    all_events = []
+    changed_events = []
+    for vevent in vevents:
+        event_url = _feed_url(vevent)
+        # Same key as the list pages, so both modes share records and carry-forward
+        list_key = f"list:{event_url or vevent.get('UID') or event_date}"
+        list_digest = fingerprint(json.dumps(vevent, sort_keys=True), ICS_EVENT_VERSION)
+        event = get_fingerprints().lookup(list_key, list_digest)
+        from_feed = event is None
+        if from_feed:
+            event = ical_event(vevent)[2]
+
+        extra_details = scrape_event_details(event_url) if event_url else {}
+        # An organizer address in the feed beats the page's
+        feed_email = vevent.get("ORGANIZER", "").lower().startswith("mailto:")
+        details_changed = _merge_details(event, extra_details, DETAIL_FIELDS[1:] if feed_email else DETAIL_FIELDS)
+        all_events.append(event)
+
+        if from_feed or details_changed:
+            get_fingerprints().remember(list_key, list_digest, event)
+            changed_events.append(event)
+        elif get_fingerprints().is_unchanged(list_key, *filter(None, [event_url])):
+            get_fingerprints().skip_write()
+        else:
+            changed_events.append(event)
+    return all_events, changed_events
+
+
+def scrape_full_month(time_budget: float = None, backend: str = None, mode: str = None):
+    """Scrapes the rolling horizon of upcoming days (the first 2 if TEST_MODE is enabled).
+
+    Only days that newly entered the horizon are scraped, plus a refresh
+    sample of REFRESH_SAMPLE known days chosen upcoming- and stalest-first
+    (see scheduler.py), so the daily cost doesn't grow with the horizon.
+    With `time_budget` seconds (default CRAWL_TIME_BUDGET) days that no
+    longer fit are deferred. Days not scraped this run keep their last
+    known events; days that fell out of the horizon drop theirs. `backend`
+    picks the storage backend for this run (see db.py).
+
+    With `mode="ics"` (default KIDSOUTANDABOUT_MODE) each month of the
+    horizon is read from its calendar feed in one download, so every day
+    in it is refreshed; event pages are then only fetched for the fields
+    the feed lacks. Months without a feed use the event lists as above.
+    """
+    # The whole run, not just publishing: the scrape log and fingerprints follow the backend
+    with using_storage(backend) as storage:
+        return {**_scrape_horizon(time_budget, mode), "storage": storage.summary()}
+
+
+def _scrape_horizon(time_budget, mode):
+    changed_events = []
+    get_fingerprints().reset_stats()
+    mode = mode or KIDSOUTANDABOUT_MODE
+
+    dates = {
+        event_date: date.fromisoformat(event_date) for event_date in get_horizon_dates()
+    }
+    feed_days = ics_events_by_day(list(dates)) if mode == "ics" else {}
+
+    def scrape_day(event_date):
+        if event_date in feed_days:
+            day_events, day_changed = scrape_ics_day(event_date, feed_days[event_date])
+        else:
+            day_events, day_changed = scrape_event_list(event_date)
+        changed_events.extend(day_changed)
+        return day_events
+
+    history = get_scrape_log().entries("kidsoutandabout")
+    # Feed days cost nothing to list, so all of them are refreshed
+    selected, kept = select_tasks(
+        {event_date: day for event_date, day in dates.items() if event_date not in feed_days},
+        history,
+        REFRESH_SAMPLE,
+    )
+    selected.update((event_date, dates[event_date]) for event_date in feed_days)
+    scraped, schedule = run_prioritized(
+        "kidsoutandabout", selected, scrape_day, time_budget=time_budget, log=get_scrape_log()
+    )
+    schedule["new"] = sum(1 for event_date in selected if event_date not in history)
+    schedule["kept"] = len(kept)
+    schedule["from_feed"] = len(feed_days)
+    all_events = [event for event_date in dates for event in scraped.get(event_date, [])]
+
+    # Days not scraped this run weren't looked at, so carry their events over rather than remove them
+    for event_date in dates:
+        if event_date in scraped:
+            continue
+        for event_url in history.get(event_date, {}).get("urls", []):
+            event = get_fingerprints().last_record(f"list:{event_url}")
+            if event is not None:
+                all_events.append(event)
+
+    # Store only new, changed or removed events
+    all_events, changes = publish_crawl("kidsoutandabout", all_events, changed_events)
+
+    return {
+        "message": "Scraping completed!",
+        "test_mode": TEST_MODE,
+        "mode": mode,
+        "events": all_events,
+        "changes": changes,
+        "fingerprints": get_fingerprints().stats,
+        "record_cache": get_record_cache().summary(),
+        "schedule": schedule,
+    }
@@ -1,34 +1,40 @@
-import requests
 from bs4 import BeautifulSoup
 import os
-import random
-import time
 import re
-import json
-from fastapi import FastAPI
-from supabase import create_client
-from dotenv import load_dotenv
-from datetime import datetime, timedelta
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-from dateutil import parser
-
-load_dotenv()
-
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+from fastapi import FastAPI, Query, Request, Response
+from fastapi.responses import FileResponse, JSONResponse
+from browser import BrowserWorker, browser_session, browser_stats, get_selenium_driver
+from cdp import scrape_activityhero_details_cdp
+from db import UnknownStorageBackend, get_storage, using_storage
+from discovery import discover_links, same_site
+from extraction import ExtractionReport, crawl_pages, extract_fields
+from fingerprints import fingerprint
+from images import ASSET_NAME
+from kidsoutandabout import scrape_full_month
+from normalize import convert_date_format, convert_date_range, extract_start_end_time
+from pipeline import (
+    get_activity_store,
+    get_api_cache,
+    get_discovery_cache,
+    get_fingerprints,
+    get_image_cache,
+    get_record_cache,
+    publish_crawl,
+    store_activities,
+)
+from profiling import profiled
+from record_cache import extractor_version
+from replay import sleep
+from snapshots import snapshot_crawl
+from stream_json import batched, iter_json_array
 
 app = FastAPI()
 
-HEADERS = {"User-Agent": "Mozilla/5.0"}
 
-TEST_MODE = True
+@app.exception_handler(UnknownStorageBackend)
+def unknown_storage_backend(request: Request, exc: UnknownStorageBackend):
+    # A bad ?backend= is the caller's mistake, not a server error
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
 
 scraping_urls = [
     "https://austin.kidsoutandabout.com",
@@ -41,265 +47,104 @@ ACTIVITYHERO_URL = (
     + "/search?view=activity&q=&location=Palo+Alto%2C+CA&radius=50&activity_types=event"
 )
 
-USER_AGENTS = [
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/91.0.4472.124 Safari/537.36",
-    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 Chrome/91.0.4472.124 Safari/537.36",
-    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 Chrome/91.0.4472.114 Safari/537.36",
-]
+CAMPITY_BATCH_SIZE = 500
 
 GALILEO_BASE_URL = "https://galileo-camps.com"
 CAMPS_FINDER_URL = f"{GALILEO_BASE_URL}/camp-finder/"
 
+STEVEKATE_URL = "https://steveandkatescamp.com"
 
-def get_dates_for_current_month():
-    today = datetime.today()
-    start_of_month = datetime(today.year, today.month, 1)
-    next_month = start_of_month.replace(month=(today.month % 12) + 1, day=1)
-    num_days = (next_month - start_of_month).days
-    limit_days = 2 if TEST_MODE else num_days
-    return [
-        (start_of_month + timedelta(days=i)).strftime("%Y-%m-%d")
-        for i in range(limit_days)
-    ]
-
-
-def extract_start_end_time(time_text):
-    if not time_text or time_text.lower() in ["varies", "see website", "all day"]:
-        return time_text, time_text
-    time_text = time_text.lower().strip()
-    time_pattern = re.search(
-        r"(\d{1,2}:\d{2}\s*[apmAPM]*)\s*-\s*(\d{1,2}:\d{2}\s*[apmAPM]*)", time_text
-    )
-    if time_pattern:
-        return time_pattern.group(1).strip(), time_pattern.group(2).strip()
-    single_time_pattern = re.search(r"(\d{1,2}:\d{2}\s*[apmAPM]*)", time_text)
-    if single_time_pattern:
-        return single_time_pattern.group(1), "No End Time"
-    return "Unparsed Time", "Unparsed Time"
-
-
-# Scrape event details page
-def scrape_event_details(event_url):
-    if not event_url:
-        return {"email": "No Email", "price": 0.0}
-
-    response = requests.get(event_url, headers=HEADERS)
-
-    if response.status_code != 200:
-        return {"email": "No Email", "price": 0.0}
 
-    soup = BeautifulSoup(response.text, "html.parser")
-
-    # Extract email
-    email_element = soup.select_one(".field-name-field-email-address a[href^='mailto']")
-    email = email_element.text.strip() if email_element else "No Email"
-
-    # Extract Price
-    price_element = soup.select_one(".field-name-field-price .field-item")
-    price = 0.0
-    if price_element:
-        extracted_price = re.findall(r"\d+\.\d+|\d+", price_element.text.strip())
-        price = float(extracted_price[0]) if extracted_price else 0.0
-
-    # Extract Age Groups
-    age_elements = soup.select(
-        ".field-name-field-ages.field-type-entityreference.field-label-above"
-    )
-    ages = (
-        [age.text.strip() for age in age_elements]
-        if age_elements
-        else ["Unknown Age Group"]
+@app.get("/images/{name}")
+def cached_image(name: str):
+    """Serves thumbnails produced by the image pipeline."""
+    if not ASSET_NAME.match(name) or not os.path.exists(get_image_cache().path(name)):
+        return Response(status_code=404)
+    return FileResponse(
+        get_image_cache().path(name),
+        media_type="image/webp" if name.endswith(".webp") else None,
+        headers={"Cache-Control": "public, max-age=31536000, immutable"},
     )
 
-    # Extract Tags
-    tag_elements = soup.select(
-        ".field-name-field-activity-type.field-type-entityreference.field-label-hidden a"
-    )
-    tags = [tag.text.strip() for tag in tag_elements] if tag_elements else ["No Tags"]
 
-    return {"email": email, "price": price, "ages": ages, "tags": tags}
+@app.get("/activities")
+def list_activities(
+    request: Request,
+    response: Response,
+    date_from: str = None,
+    date_to: str = None,
+    age: float = None,
+    min_price: float = None,
+    max_price: float = None,
+    tags: list[str] = Query(None),
+    min_lat: float = None,
+    min_lon: float = None,
+    max_lat: float = None,
+    max_lon: float = None,
+    limit: int = 50,
+    offset: int = 0,
+):
+    """Lists scraped activities from the local store without running any scraper."""
+    bbox = None
+    if None not in (min_lat, min_lon, max_lat, max_lon):
+        bbox = (min_lat, min_lon, max_lat, max_lon)
+    filters = (date_from, date_to, age, min_price, max_price, tags, bbox, limit, offset)
+
+    etag = get_activity_store().etag(*filters)
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return get_activity_store().query(*filters)
+
+
+@app.get("/activities/near")
+def activities_near(
+    lat: float, lon: float, radius_km: float, request: Request, response: Response, limit: int = 50
+):
+    """Lists activities within `radius_km` of a point, nearest first."""
+    etag = get_activity_store().etag("near", lat, lon, radius_km, limit)
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return get_activity_store().near(lat, lon, radius_km, limit)
+
+
+@app.get("/activities/{activity_id}")
+def get_activity(activity_id: int, request: Request, response: Response):
+    etag = get_activity_store().etag(activity_id)
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    # The ETag changes with every store write, so it doubles as the cache version
+    activity = get_api_cache().get(f"activity:{activity_id}", etag)
+    if activity is None:
+        activity = get_activity_store().get(activity_id)
+        if activity is None:
+            return Response(status_code=404)
+        get_api_cache().put(f"activity:{activity_id}", etag, activity)
+    return activity
+
+
+@app.get("/browser-stats")
+def get_browser_stats():
+    """RSS, page counts and restarts of the live browser workers."""
+    return browser_stats()
 
 
 @app.get("/scrape-month")
-def scrape_full_month():
-    """Scrapes events for the current month or the first 5 days if TEST_MODE is enabled."""
-    all_events = []
-
-    for event_date in get_dates_for_current_month():
-        url = f"https://austin.kidsoutandabout.com/event-list/{event_date}"
-        print(f"Scraping events from: {url}")  # ✅ Debugging Line
-
-        response = requests.get(url, headers=HEADERS)
-
-        if response.status_code == 200:
-            soup = BeautifulSoup(response.text, "html.parser")
-            event_items = soup.select("div.node-activity")
-
-            for event in event_items:
-                # Extract Event Title
-
-                print("DEBUG: FULL EVENT HTML")
-                print(event.prettify())  # Shows properly formatted HTML
-                title_element = event.select_one("h2 a")
-                event_url = (
-                    f"https://austin.kidsoutandabout.com{title_element['href']}"
-                    if title_element
-                    else None
-                )
-                # If `<h2><a></a></h2>` is empty, check inside `.group-activity-details`
-                if title_element and title_element.text.strip():
-                    title = title_element.text.strip()
-                else:
-                    # Search for the title inside `group-activity-details` as a backup
-                    backup_title_element = event.select_one(
-                        ".group-activity-details h2 a"
-                    )
-                    title = (
-                        backup_title_element.text.strip()
-                        if backup_title_element
-                        else "No Title"
-                    )
-
-                # Extract Organization
-                org_element = event.find("div", class_="address-org-name")
-                organization = (
-                    org_element.find("span", class_="fn").text.strip()
-                    if org_element
-                    else "No Organization"
-                )
-
-                # Extract Location
-                location_element = event.find("div", class_="adr")
-                location = {
-                    "street": (
-                        location_element.find(
-                            "div", class_="street-address"
-                        ).text.strip()
-                        if location_element
-                        and location_element.find("div", class_="street-address")
-                        else "No Street Address"
-                    ),
-                    "city": (
-                        location_element.find("span", class_="locality").text.strip()
-                        if location_element
-                        and location_element.find("span", class_="locality")
-                        else "No City"
-                    ),
-                    "state": (
-                        location_element.find("span", class_="region").text.strip()
-                        if location_element
-                        and location_element.find("span", class_="region")
-                        else "No State"
-                    ),
-                    "postal_code": (
-                        location_element.find("span", class_="postal-code").text.strip()
-                        if location_element
-                        and location_element.find("span", class_="postal-code")
-                        else "No Postal Code"
-                    ),
-                    "country": (
-                        location_element.find("div", class_="country-name").text.strip()
-                        if location_element
-                        and location_element.find("div", class_="country-name")
-                        else "No Country"
-                    ),
-                    "google_maps": (
-                        location_element.find("a")["href"]
-                        if location_element and location_element.find("a")
-                        else "No Map Link"
-                    ),
-                }
-
-                # Extract Dates
-                date_elements = event.select(
-                    "div.field-type-datetime span.date-display-single"
-                )
-                dates = (
-                    [d.text.strip() for d in date_elements]
-                    if date_elements
-                    else ["No Date"]
-                )
-
-                # Extract Time
-                time_element = event.find("div", class_="field-name-field-time")
-                raw_time = (
-                    time_element.text.replace("Time:", "").strip()
-                    if time_element
-                    else "No Time"
-                )
-                start_time, end_time = extract_start_end_time(raw_time)
-
-                # Extract Phone
-                phone_element = event.select_one(".tel .value")
-                phone = phone_element.text.strip() if phone_element else "No Phone"
-
-                # Extract Image URL
-                image_element = event.select_one(
-                    "div.field-name-field-enhanced-activity-image img"
-                )
-                image_url = image_element["src"] if image_element else "No Image"
-
-                # Extract Description
-                desc_element = event.select_one(
-                    "div.field-name-field-short-description div.field-items"
-                )
-                description = (
-                    desc_element.text.strip() if desc_element else "No Description"
-                )
-
-                # Fetch email and price from the event's detail page
-                extra_details = scrape_event_details(event_url) if event_url else {}
-                ages = extra_details.get("ages", ["Unknown Age Group"])
-                tags = extra_details.get("tags", ["No Tags"])
-
-                # Store event data
-                event_data = {
-                    "name": title,
-                    "organization": organization,
-                    "location": location,
-                    "dates": dates,
-                    "start_time": start_time,
-                    "end_time": end_time,
-                    "phone": phone,
-                    "image_url": image_url,
-                    "description": description,
-                    "event_url": event_url,
-                    "email": extra_details.get("email", "No Email"),
-                    "price": extra_details.get("price", "No Price"),
-                    "ages": ages,
-                    "tags": tags,
-                }
-                all_events.append(event_data)
-
-                # Store into Supabase
-                supabase.table("activities").insert([event_data]).execute()
-
-    return {
-        "message": "Scraping completed!",
-        "test_mode": TEST_MODE,
-        "events": all_events,
-    }
-
-
-# ✅ **Initialize Selenium WebDriver**
-def get_selenium_driver():
-    options = webdriver.ChromeOptions()
-    options.add_argument("--headless")  # Run in headless mode
-    options.add_argument(f"user-agent={random.choice(USER_AGENTS)}")
-    options.add_argument("--disable-blink-features=AutomationControlled")
-    return webdriver.Chrome(
-        service=Service(ChromeDriverManager().install()), options=options
-    )
+def scrape_month_route(time_budget: float = None, backend: str = None, mode: str = None, profile: bool = False):
+    with profiled("scrape-month", profile) as profile_report:
+        result = scrape_full_month(time_budget=time_budget, backend=backend, mode=mode)
+    return {**result, "profile": profile_report} if profile else result
 
 
 def scrape_activityhero_event_details(event_url):
     """Scrapes more details like full location, time, pricing from event page."""
     print(f"🔍 Scraping event details: {event_url}")
-    driver = get_selenium_driver()
-    driver.get(event_url)
-    time.sleep(3)  # Allow JavaScript to load
-
-    soup = BeautifulSoup(driver.page_source, "html.parser")
+    with browser_session() as driver:
+        driver.get(event_url)
+        sleep(3)  # Allow JavaScript to load
+        soup = BeautifulSoup(driver.page_source, "html.parser")
 
     # ✅ Extract Organizer
     organizer_element = soup.select_one("a.biz-title")
@@ -339,8 +184,6 @@ def scrape_activityhero_event_details(event_url):
         description_element.text.strip() if description_element else "No Description"
     )
 
-    driver.quit()
-
     return {
         "organizer": organizer,
         "location": location,
@@ -359,12 +202,10 @@ def scrape_activityhero():
     """Scrapes event listings from ActivityHero and limits to 5 items for testing."""
     print(f"🔍 Scraping ActivityHero events from: {ACTIVITYHERO_URL}")
 
-    driver = get_selenium_driver()
-    driver.get(ACTIVITYHERO_URL)
-    time.sleep(5)  # Wait for JavaScript to load
-
-    soup = BeautifulSoup(driver.page_source, "html.parser")
-    driver.quit()  # Close Selenium
+    with browser_session() as driver:
+        driver.get(ACTIVITYHERO_URL)
+        sleep(5)  # Wait for JavaScript to load
+        soup = BeautifulSoup(driver.page_source, "html.parser")
 
     event_items = soup.select("div.tile-title.new-version > a")
 
@@ -423,7 +264,7 @@ def scrape_activityhero():
         }
 
         all_events.append(event_data)
-        supabase.table("activities").insert([event_data]).execute()
+        get_storage().insert("activities", [event_data])
 
         scraped_count += 1  # ✅ Increment after scraping each event
 
@@ -432,21 +273,39 @@ def scrape_activityhero():
 
 # ✅ **FastAPI route for ActivityHero scraper**
 @app.get("/scrape-activityhero")
-def scrape_activityhero_route():
-    return scrape_activityhero()
+def scrape_activityhero_route(backend: str = None, profile: bool = False):
+    with profiled("scrape-activityhero", profile) as profile_report, using_storage(backend) as storage:
+        # scrape_activityhero stops after listing the tiles and returns None
+        result = {**(scrape_activityhero() or {}), "storage": storage.summary()}
+    return {**result, "profile": profile_report} if profile else result
 
 
 def get_region_links():
+    """Galileo camp links with their region, from the sitemap unless it lists something new."""
+    links = discover_links(
+        "galileo-regions",
+        GALILEO_BASE_URL,
+        same_site(GALILEO_BASE_URL),
+        lambda: {region["region_url"]: region["button_text"] for region in browse_region_links().values()},
+        get_discovery_cache(),
+    )
+    return {
+        index: {"button_text": button_text, "region_url": region_url}
+        for index, (region_url, button_text) in enumerate(links.items())
+    }
+
+
+def browse_region_links():
     """Fetches all Galileo camp region links dynamically with improved handling."""
     print(f"🔍 Fetching region links from {GALILEO_BASE_URL}")
 
     driver = get_selenium_driver()
-    driver.get(GALILEO_BASE_URL)
 
     try:
+        driver.get(GALILEO_BASE_URL)
         # ✅ Scroll down to trigger JS-based content loading
         driver.execute_script("window.scrollBy(0, 800);")
-        time.sleep(3)
+        sleep(3)
         # ✅ Wait for the first region link to appear (Max wait: 10s)
         # WebDriverWait(driver, 10).until(
         #     EC.presence_of_element_located((By.CSS_SELECTOR, "footer-camps__location.ul.li"))
@@ -516,15 +375,26 @@ def get_region_links():
 
 # ✅ **Step 2: Extract All Camp Information Links**
 def get_all_camp_links(region_url):
+    """Camps listed under a region, from the sitemap unless it lists something new."""
+    prefix = region_url.rstrip("/") + "/"
+    links = discover_links(
+        f"galileo-camps {region_url}",
+        GALILEO_BASE_URL,
+        lambda url: url.startswith(prefix),
+        lambda: dict.fromkeys(browse_camp_links(region_url), True),
+        get_discovery_cache(),
+    )
+    return list(links)
+
+
+def browse_camp_links(region_url):
     """Fetches all camps listed under a region."""
     print(f"🔍 Fetching camps from region: {region_url}")
 
-    driver = get_selenium_driver()
-    driver.get(region_url)
-    time.sleep(5)  # Wait for JS to load
-
-    soup = BeautifulSoup(driver.page_source, "html.parser")
-    driver.quit()
+    with browser_session() as driver:
+        driver.get(region_url)
+        sleep(5)  # Wait for JS to load
+        soup = BeautifulSoup(driver.page_source, "html.parser")
 
     camp_links = []
     for camp in soup.select("a.location-card_link"):
@@ -542,12 +412,10 @@ def scrape_galileo_camp_details(camp_url):
     """Scrapes details from individual camp pages."""
     print(f"🔍 Scraping camp details: {camp_url}")
 
-    driver = get_selenium_driver()
-    driver.get(camp_url)
-    time.sleep(3)  # Allow JavaScript to load
-
-    soup = BeautifulSoup(driver.page_source, "html.parser")
-    driver.quit()
+    with browser_session() as driver:
+        driver.get(camp_url)
+        sleep(3)  # Allow JavaScript to load
+        soup = BeautifulSoup(driver.page_source, "html.parser")
 
     # Camp Name
     title_element = soup.select_one("h1.heading-1")
@@ -624,7 +492,7 @@ def scrape_galileo_camps():
             all_camps.append(camp_details)
 
             # Insert into Supabase
-            supabase.table("camps").insert([camp_details]).execute()
+            get_storage().insert("camps", [camp_details])
 
     return {"message": "Scraping completed for Galileo Camps!", "camps": all_camps}
 def grade_to_age_group(grade_range):
@@ -660,418 +528,346 @@ def grade_to_age_group(grade_range):
 
     return f"{start_age} - {end_age}"
 
-def get_address_details(address):
-    # Use Nominatim API for reverse geocoding
-    url = f"https://nominatim.openstreetmap.org/search?q={address}&format=json&addressdetails=1"
-    
-    # Send the request
-    response = requests.get(url)
-    data = response.json()
-    
-    if data:
-        # Extract the first result
-        result = data[0]
-        
-        # Get the necessary address components
-        street = result.get("address", {}).get("road", "")
-        city = result.get("address", {}).get("city", "")
-        state = result.get("address", {}).get("state", "")
-        postal_code = result.get("address", {}).get("postcode", "")
-        country = result.get("address", {}).get("country", "")
-        
-        # Construct the final dictionary with Google Maps URL
-        address_dict = {
-            "street": street,
-            "city": city,
-            "state": state,
-            "postal_code": postal_code,
-            "country": country,
-            "google_maps": f"https://www.openstreetmap.org/?mlat={result['lat']}&mlon={result['lon']}"
-        }
-        
-        return address_dict
-
-def scrape_galileo_camp_details2(camp_url,country):
-    """Scrapes details from individual camp pages."""
-    print(f"🔍 Scraping camp details: {camp_url}")
-    driver = get_selenium_driver()
-    driver.get(camp_url)
-    time.sleep(3)  # Allow JavaScript to load
-    soup = BeautifulSoup(driver.page_source, "html.parser")
-    driver.quit()
-    # Camp Name
-    title_element = soup.select_one("h1.heading-1")
-    camp_name = title_element.text.strip() if title_element else "No Title"
-
-    
-    # Location
-    location_element = soup.select_one("p.camp-main_school strong")
-    location = location_element.text.strip() if location_element else "No Location"
-    address = "No Address"
-    phone = "No Phone Number"
-    list_items = soup.select("ul.camp-main__meta li")
-    if len(list_items) > 0:
-        address_element = list_items[0].get_text(strip=True)
-        address = address_element if address_element else "No Address"
-
-    # Check if list_items has at least two elements (Phone Number)
-    if len(list_items) > 1:
-        phone_element = list_items[1].get_text(strip=True)
-        phone = phone_element if phone_element else "No Phone Number"
-
-    # In case the address is missing but phone is present, make sure to handle this properly
-    if len(list_items) == 1:
-        phone_element = list_items[0].get_text(strip=True)
-        phone = phone_element if phone_element else "No Phone Number"
-
-    content_div = soup.find('div', class_='camp-main__content')
-
-    # Extract the text content from <p> tags within the div
-    paragraph = content_div.find('p').get_text(separator=" ", strip=True)
-
-    # Split the extracted text into Grades and Running from
-    grades_element = paragraph.split("Running from:")[0].replace("Grades:", "").strip()
-    grades = grades_element if grades_element else "No Date Info"
+def _galileo_meta(soup):
+    return [item.get_text(strip=True) for item in soup.select("ul.camp-main__meta li")]
 
 
-    date_element = paragraph.split("Running from:")[1].strip()
-    date_range = date_element if date_element else "No Date Info"
+def _galileo_phone(soup):
+    # A single list item is the phone number; otherwise it's the second one
+    items = _galileo_meta(soup)
+    return items[1] if len(items) > 1 else items[0]
 
-    # Description
-    description_element = soup.find('p', class_='camp-main__school').find('strong')
-    description = (
-        description_element.text.strip() if description_element else "No Description"
-    )
 
-    # Image URL
-    image_element = soup.select_one("div.camp-main img")
-    image_url = image_element["src"] if image_element else "No Image"
+def _galileo_running(soup):
+    """"Grades: K - 5 Running from: ..." split into its two halves."""
+    paragraph = soup.find('div', class_='camp-main__content').find('p').get_text(separator=" ", strip=True)
+    grades, dates = paragraph.split("Running from:")
+    return grades.replace("Grades:", "").strip(), dates.strip()
 
-    year = 2025
-
-    # Map months from name to number
-    month_map = {
-        "January": "01",
-        "February": "02",
-        "March": "03",
-        "April": "04",
-        "May": "05",
-        "June": "06",
-        "July": "07",
-        "August": "08",
-        "September": "09",
-        "October": "10",
-        "November": "11",
-        "December": "12",
-    }
-
-    # Split the date range into start and end
-    start_date, end_date = date_range.split(" - ")
-
-    # Parse the start and end month-day strings
-    start_month, start_day = start_date.split(" ")
-    end_month, end_day = end_date.split(" ")
 
-    # Convert month names to numbers
-    start_month_num = month_map[start_month]
-    end_month_num = month_map[end_month]
+# Each field is extracted on its own, so one missing node only costs that field
+GALILEO_FIELDS = {
+    "name": (lambda soup: soup.select_one("h1.heading-1").text.strip(), "No Title"),
+    "address": (lambda soup: _galileo_meta(soup)[0], "No Address"),
+    "phone": (_galileo_phone, "No Phone Number"),
+    "dates": (lambda soup: convert_date_range(_galileo_running(soup)[1]), "No Date Info"),
+    "ages": (lambda soup: grade_to_age_group(_galileo_running(soup)[0]), "No Age Info"),
+    "description": (
+        lambda soup: soup.find('p', class_='camp-main__school').find('strong').text.strip(),
+        "No Description",
+    ),
+    "image_url": (lambda soup: soup.select_one("div.camp-main img")["src"], "No Image"),
+}
 
-    # Format the start date as MM/DD/YYYY
-    start_date_formatted = f"{int(start_day):02d}/{start_month_num}/{year}"
 
-    # Format the end date as MM/DD/YYYY
-    end_date_formatted = f"{int(end_day):02d}/{end_month_num}/{year}"
-
-    date_range_formatted = f"{start_date_formatted} - {end_date_formatted}"
-
-    print(
-        f"✅ Scraped {camp_name} {location} {address} {phone} {grades} {date_range} {description} {image_url} {camp_url}"
-    )
+def scrape_galileo_camp_details2(camp_url, country, report=None, worker=None):
+    """Scrapes details from individual camp pages.
 
-    return {
-            "name": camp_name,
+    Fields that can't be extracted fall back to their placeholders and are
+    logged in `report`; such records aren't fingerprinted, so the page is
+    parsed (and reported) again next run. Pass a BrowserWorker as `worker`
+    to reuse its browser instead of starting one for this page.
+    """
+    print(f"🔍 Scraping camp details: {camp_url}")
+    cache_key = f"{camp_url}|{country}"
+    cached = get_record_cache().get(cache_key, GALILEO_VERSION)
+    if cached is not None:
+        get_fingerprints().mark_unchanged(camp_url)
+        return cached
+
+    with worker.page() if worker else browser_session() as driver:
+        driver.get(camp_url)
+        sleep(3)  # Allow JavaScript to load
+        page_source = driver.page_source
+
+    digest = fingerprint(page_source, GALILEO_VERSION)
+    cached = get_fingerprints().lookup(camp_url, digest)
+    if cached is not None:
+        get_record_cache().put(cache_key, GALILEO_VERSION, cached)
+        return cached
+
+    soup = BeautifulSoup(page_source, "html.parser")
+    fields, failed = extract_fields(soup, GALILEO_FIELDS, report, camp_url)
+
+    print(f"✅ Scraped {fields['name']} {fields['address']} {fields['phone']} {fields['dates']} {camp_url}")
+
+    camp = {
+            "name": fields["name"],
             "organization": "No Organizer",
-            "location": {"street":address,"country":country},
-            "dates": [date_range_formatted],
+            "location": {"street": fields["address"], "country": country},
+            "dates": [fields["dates"]],
             "start_time": "Unknown",
             "end_time": "Unknown",
-            "phone": phone,
-            "image_url": image_url,
-            "description": description,
+            "phone": fields["phone"],
+            "image_url": fields["image_url"],
+            "description": fields["description"],
             "event_url": camp_url,
             "email": "No Email",
             "price":  0.0,
-            "ages": [grade_to_age_group(grades)],
+            "ages": [fields["ages"]],
             "tags":  ["No Tags"],
     }
-   
+    if not failed:
+        get_fingerprints().remember(camp_url, digest, camp)
+        get_record_cache().put(cache_key, GALILEO_VERSION, camp)
+    return camp
+
+
+GALILEO_VERSION = extractor_version(
+    scrape_galileo_camp_details2, GALILEO_FIELDS, _galileo_meta, _galileo_phone, _galileo_running,
+    grade_to_age_group, convert_date_range,
+)
+
 
 def scrape_galileo_camps2():
-    """Scrapes camps by region and stores them in Supabase."""
+    """Scrapes camps by region; one broken camp page no longer ends the crawl."""
     regions = get_region_links()
     print(regions)
-    all_camps = []
-
-    for index, region_data in regions.items():
-        camp_details = scrape_galileo_camp_details2(region_data['region_url'],region_data['button_text'])
-        all_camps.append(camp_details)
-            # Insert into Supabase
-        
+    get_fingerprints().reset_stats()
+    report = ExtractionReport("galileo")
+
+    with BrowserWorker("galileo") as worker:
+        all_camps = crawl_pages(
+            report,
+            regions.values(),
+            lambda region: scrape_galileo_camp_details2(
+                region["region_url"], region["button_text"], report, worker
+            ),
+            url_of=lambda region: region["region_url"],
+            fallback=get_fingerprints().last_record,
+        )
+    print(f"📋 galileo extraction: {report.failed_pages}/{report.pages} pages failed, fields {dict(report.field_errors)}")
+    if not report.stopped:
+        # A stopped crawl is incomplete, so it must not become the comparison baseline
+        snapshot_crawl(all_camps, "galileo")
 
-    return {"message": "Scraping completed for Galileo Camps!", "camps": all_camps}
+    return {
+        "message": "Scraping completed for Galileo Camps!",
+        "camps": all_camps,
+        "fingerprints": get_fingerprints().stats,
+        "record_cache": get_record_cache().summary(),
+        "errors": report.summary(),
+    }
 
 
 
 # ✅ **FastAPI Route**
 @app.get("/scrape-galileo-camps")
-def scrape_galileo_camps_route():
-    return scrape_galileo_camps()
-
-
-
-def scrape_Campity_camp():
-    with open('data.js', 'r') as file:
-        js_data = file.read()
-
-    # You would use js2py or another method to parse the JS to JSON, here assuming it is already JSON formatted
-    # For example, manually converting to a JSON array for simplicity:
-    events = json.loads(js_data)  # You can replace this with actual parsing logic if necessary
-
-    # Check structure of events (for debugging)
-    print(events)
-    ev = {}
-    index=0
-    # Insert data into Supabase
-    for event in events:
-        custom_event = {
-            "name": event["name"],
-            "organization": "Campitycamp",
-            "location": {"lat":event["lat"],"lon":event["lon"]},
-            "dates": event["availableWeeks"],
-            "start_time": event["dropoff"],
-            "end_time": event["pickup"],
-            "phone": "No Phone",
-            "image_url": f"https://www.campitycamp.com{event["img"]}",
-            "description": event["description"],
-            "event_url": event["booking_url"],
-            "email": "No Email",
-            "price":  event["cost"],
-            "ages": [f"{event['ageFrom']} - {event['ageTo']} years"],
-            "tags":  ["No Tags"],
-        }
-        supabase.table("activities").insert([custom_event]).execute()
-    print(index)
-    # print(ev)
-    # Assuming you have a 'events' table with columns matching event data structure
-    supabase.table('events').insert(event).execute()
-
-# result = scrape_galileo_camps2()
-# print(result)
-
-def convert_date_format(date_text):
-    # Handle range format: "Mar 22 - Apr 5, 2025 (Started Jan 18)"
-    range_match = re.search(r"([A-Za-z]+ \d{1,2}) - ([A-Za-z]+ \d{1,2}), (\d{4})", date_text)
-    if range_match:
-        start_date = parser.parse(f"{range_match.group(1)} {range_match.group(3)}").strftime("%d/%m/%Y")
-        end_date = parser.parse(f"{range_match.group(2)} {range_match.group(3)}").strftime("%d/%m/%Y")
-        return f"{start_date} - {end_date}"
-    
-    # Handle single date format: "Sat, Apr 5, 2025"
-    try:
-        single_date = parser.parse(date_text).strftime("%d/%m/%Y")
-        return single_date
-    except:
-        return "No Dates"
-
-def scrape_activityhero_event_details2(event_url):
-    """Scrapes more details like full location, time, pricing from event page."""
-    print(f"🔍 Scraping event details: {event_url}")
+def scrape_galileo_camps_route(backend: str = None, profile: bool = False):
+    with profiled("scrape-galileo-camps", profile) as profile_report, using_storage(backend) as storage:
+        result = {**scrape_galileo_camps(), "storage": storage.summary()}
+    return {**result, "profile": profile_report} if profile else result
 
-    driver = get_selenium_driver()
-    driver.get(event_url)
-    time.sleep(6)  # Allow JavaScript to load
-    soup = BeautifulSoup(driver.page_source, "html.parser")
-    button = driver.find_element(By.ID, "check-sessions")
-
-    button.click()
-
-    time.sleep(3)
-    modal = driver.find_element(By.CLASS_NAME, 'modal-content')  # Replace with the actual class name of your modal
-    modal_html = modal.get_attribute('outerHTML')
-    soup1 = BeautifulSoup(modal_html, "html.parser")
-    # print(soup1)
-    driver.quit()
 
-    
-    title_element = soup.select_one(".header-title")
-    title = title_element.text.strip() if title_element else "No Title"
-    # ✅ Extract Organizer
-    organizer_element = soup.select_one(".provider-review-name")
-    organizer = organizer_element.text.strip() if organizer_element else "No Organizer"
-
-    name_element =  soup.select_one('.schedule-location-container')
-
-    name = name_element.contents[0].strip()
-    address = name_element.find('a').get_text() 
-
-    #Phone element
-    phone_element = soup.find('span', class_='phone-number') 
-    phone = phone_element.text.strip() if phone_element else "No Phone"
-
-    # ✅ Extract Event Times
-    # time_element = soup.select_one("div.time-str.section")
-    # time_text = time_element.text.strip() if time_element else "No Time"
-    # start_time, end_time = extract_start_end_time(time_text)
-
-    # ✅ Extract Age Group
-
-
-    #img
-    first_image_url = soup.find('div', class_='carousel-image-wrapper').find('img')['src']
-
-    description_element = soup.find('div',class_='overview').find('p')
-    description = (
-        description_element.text.strip() if description_element else "No Description"
-    )
 
-    # ✅ Extract Prices (Both Adult and Child Prices)
+def campity_event(event):
+    """Maps one Campity camp from the vendor dump to an activity record."""
+    return {
+        "name": event["name"],
+        "organization": "Campitycamp",
+        "location": {"lat":event["lat"],"lon":event["lon"]},
+        "dates": event["availableWeeks"],
+        "start_time": event["dropoff"],
+        "end_time": event["pickup"],
+        "phone": "No Phone",
+        "image_url": f"https://www.campitycamp.com{event['img']}",
+        "description": event["description"],
+        "event_url": event["booking_url"],
+        "email": "No Email",
+        "price":  event["cost"],
+        "ages": [f"{event['ageFrom']} - {event['ageTo']} years"],
+        "tags":  ["No Tags"],
+    }
 
-    price_elements = soup1.find('div',class_='alt-price-wrapper')
-    extracted_prices = re.findall(r'\d+\.\d+', price_elements.get_text(strip=True)) if price_elements else 0
-    prices = (float(price) for price in extracted_prices) if extracted_prices else 0.0
 
+def scrape_Campity_camp(path="data.js", batch_size=CAMPITY_BATCH_SIZE, use_mmap=False):
+    """Streams camps out of the Campity dump and writes them in batches.
 
-    popover_div = soup1.select_one('.popover-container-class .section strong')
-    date = [convert_date_format(popover_div.text.strip())]if popover_div else "No Date"
+    Memory stays bounded by `batch_size` no matter how large the dump is.
+    """
+    index = 0
+    event = None
+    for part, batch in enumerate(batched(iter_json_array(path, use_mmap=use_mmap), batch_size)):
+        # Insert data into Supabase
+        camps = store_activities([campity_event(event) for event in batch], "campity")
+        snapshot_crawl(camps, "campity", part=part)
+        index += len(batch)
+        event = batch[-1]
+    print(index)
+    # Assuming you have a 'events' table with columns matching event data structure
+    if event is not None:
+        get_storage().insert("events", [event])
 
+# result = scrape_galileo_camps2()
+# print(result)
 
-    time_element = soup1.find('div',class_="time-str")
-    time_text = time_element.contents[0].strip()  if time_element else "No Time"
-    start_time, end_time = extract_start_end_time(time_text)
+def _activityhero_price(modal):
+    text = modal.find('div', class_='alt-price-wrapper').get_text(strip=True)
+    return float(re.findall(r'\d+\.\d+', text)[0])
+
+
+def _activityhero_times(modal):
+    return extract_start_end_time(modal.find('div', class_="time-str").contents[0].strip())
+
+
+ACTIVITYHERO_PAGE_FIELDS = {
+    "name": (lambda soup: soup.select_one(".header-title").text.strip(), "No Title"),
+    "address": (
+        lambda soup: soup.select_one('.schedule-location-container').find('a').get_text(),
+        "No Address",
+    ),
+    "phone": (lambda soup: soup.find('span', class_='phone-number').text.strip(), "No Phone"),
+    "image_url": (
+        lambda soup: soup.find('div', class_='carousel-image-wrapper').find('img')['src'],
+        "No Image",
+    ),
+    "description": (
+        lambda soup: soup.find('div', class_='overview').find('p').text.strip(),
+        "No Description",
+    ),
+}
+
+# Fields read from the sessions modal
+ACTIVITYHERO_MODAL_FIELDS = {
+    "price": (_activityhero_price, 0.0),
+    "date": (
+        lambda modal: [convert_date_format(
+            modal.select_one('.popover-container-class .section strong').text.strip()
+        )],
+        "No Date",
+    ),
+    "times": (_activityhero_times, ("Unparsed Time", "Unparsed Time")),
+    "ages": (lambda modal: [modal.find('div', class_="age-str").get_text(strip=True)], ["No Age Info"]),
+}
+
+
+def scrape_activityhero_event_details2(event_url, report=None, worker=None):
+    """Scrapes more details like full location, time, pricing from event page.
+
+    Missing nodes (or a missing sessions modal) only cost the affected
+    fields; failures are logged in `report`.
+    """
+    print(f"🔍 Scraping event details: {event_url}")
 
-    age_element = soup1.find('div',class_="age-str")
-    ages = [age_element.get_text(strip=True)] if age_element else ["No Age Info"]
+    from selenium.webdriver.common.by import By
 
-    # print(start_time)
-    # print(end_time)
+    with worker.page() if worker else browser_session() as driver:
+        driver.get(event_url)
+        sleep(6)  # Allow JavaScript to load
+        soup = BeautifulSoup(driver.page_source, "html.parser")
+        try:
+            driver.find_element(By.ID, "check-sessions").click()
+            sleep(3)
+            modal_html = driver.find_element(By.CLASS_NAME, 'modal-content').get_attribute('outerHTML')
+        except Exception as e:
+            if report is not None:
+                report.field_error(event_url, "sessions_modal", e)
+            modal_html = ""
+    soup1 = BeautifulSoup(modal_html, "html.parser")
 
+    fields, _ = extract_fields(soup, ACTIVITYHERO_PAGE_FIELDS, report, event_url)
+    modal_fields, _ = extract_fields(soup1, ACTIVITYHERO_MODAL_FIELDS, report, event_url)
+    start_time, end_time = modal_fields["times"]
 
     return {
-        "name": title,
+        "name": fields["name"],
         "organization": "Activityhero",
-        "location": {"street":address},
-        "dates": [date],
+        "location": {"street": fields["address"]},
+        "dates": [modal_fields["date"]],
         "start_time":start_time,
         "end_time": end_time,
-        "phone": phone,
-        "image_url": first_image_url,
-        "description": description,
+        "phone": fields["phone"],
+        "image_url": fields["image_url"],
+        "description": fields["description"],
         "event_url": event_url,
         "email": "No Email",
-        "price":  prices,
-        "ages": [ages],
+        "price": modal_fields["price"],
+        "ages": [modal_fields["ages"]],
         "tags":  ["No Tags"],
     }
 
-def scrape_activityhero2():
-    """Scrapes event listings from ActivityHero and limits to 5 items for testing."""
-    print(f"🔍 Scraping ActivityHero events from: {ACTIVITYHERO_URL}")
+def scrape_activityhero2(mode="selenium", workers=2):
+    """Scrapes event listings from ActivityHero and limits to 5 items for testing.
 
-    driver = get_selenium_driver()
-    driver.get(ACTIVITYHERO_URL)
-    time.sleep(5)  # Wait for JavaScript to load
+    `mode="cdp"` reuses one DevTools-driven tab per worker instead of starting
+    Chrome and sleeping for every event.
+    """
+    print(f"🔍 Scraping ActivityHero events from: {ACTIVITYHERO_URL}")
 
-    soup = BeautifulSoup(driver.page_source, "html.parser")
-    driver.quit()  # Close Selenium
+    with browser_session() as driver:
+        driver.get(ACTIVITYHERO_URL)
+        sleep(5)  # Wait for JavaScript to load
+        soup = BeautifulSoup(driver.page_source, "html.parser")
 
     event_items = soup.select("div.tile-title.new-version > a")
 
-    all_events = []
     max_events_to_scrape = 5  # ✅ Limit to 5 events
-    scraped_count = 0
 
     if not event_items:
         print(f"❌ No event listings found on ActivityHero.")
         return {"message": "No events found on ActivityHero!", "events": []}
     print(event_items)
-    for event in event_items:
-        if scraped_count >= max_events_to_scrape:  # ✅ Stop after 5 events
-            break
 
-        # Extract Event Title
-        title = event.text.strip()
-        event_url = BASE_URL + event["href"] if event else None
-
-        # Extract Image URL
-        image_element = event.find_previous("img")
-        image_url = image_element["src"] if image_element else "No Image"
-
-        # Extract Date
-        date_element = event.find_next("div", class_="date-item")
-        event_date = date_element.text.strip() if date_element else "No Date"
-
-        # Extract Location Summary
-        location_element = event.find_next("div", class_="location")
-        location_summary = (
-            location_element.text.strip() if location_element else "No Location Info"
-        )
-
-        # ✅ Fetch details for the first 5 events only
-        extra_details = (
-            scrape_activityhero_event_details2(event_url) if event_url else {}
-        )
-
-        # Store event data
-
-        all_events.append(extra_details)
-        supabase.table("activities").insert([extra_details]).execute()
-
-        scraped_count += 1  # ✅ Increment after scraping each event
-
-    return {"message": "Scraping completed for ActivityHero!", "events": all_events}
-
-def convert_date(date_str):
-    try:
-        date = datetime.strptime(f"{date_str} {2025}", "%b %d %Y")  
-        return date.strftime("%d/%m/%Y")  
-    except ValueError:
-        return None
-
-# Function to extract start and end times
-def extract_times(time_str):
-    # Updated regex pattern to account for optional spaces and AM/PM in any case
-    time_pattern = r"(\d{1,2}:\d{2}\s*[APap]{2})\s*-\s*(\d{1,2}:\d{2}\s*[APap]{2})"
-    times = re.findall(time_pattern, time_str.strip())
-    
-    if len(times) == 1:
-        # Return the start and end times from the match
-        return times[0][0].strip().lower(), times[0][1].strip().lower()
+    report = ExtractionReport("activityhero")
+    event_urls = [BASE_URL + event["href"] for event in event_items[:max_events_to_scrape]]
+    if mode == "cdp":
+        all_events = scrape_activityhero_details_cdp(event_urls, report, workers=workers)
     else:
-        # Return "Unparsed" if times are not properly parsed
-        return "Unparsed", "Unparsed"
-
-
+        with BrowserWorker("activityhero") as worker:
+            all_events = crawl_pages(
+                report,
+                event_urls,
+                lambda event_url: scrape_activityhero_event_details2(event_url, report, worker),
+            )
+    if report.stopped:
+        # Publishing a partial crawl would delete every event it didn't reach
+        return {
+            "message": "ActivityHero crawl stopped: error budget spent",
+            "events": all_events,
+            "errors": report.summary(),
+        }
 
+    all_events, changes = publish_crawl("activityhero", all_events, keep_urls=report.failed_urls)
 
+    return {
+        "message": "Scraping completed for ActivityHero!",
+        "events": all_events,
+        "changes": changes,
+        "errors": report.summary(),
+    }
 
 @app.get("/scrape-activityhero2")
-def scrape_activityhero_route2():
-    return scrape_activityhero2()
+def scrape_activityhero_route2(
+    mode: str = "selenium", workers: int = 2, backend: str = None, profile: bool = False
+):
+    with profiled("scrape-activityhero2", profile) as profile_report, using_storage(backend) as storage:
+        result = {**scrape_activityhero2(mode=mode, workers=workers), "storage": storage.summary()}
+    return {**result, "profile": profile_report} if profile else result
 
 # result = steveandkatescamp("https://steveandkatescamp.com/mar-vista/")
 # print(result)
 
 
 def get_all_camp_links_for_steve_kates():
+    """`[country, url, name]` of every camp, from the sitemap unless it lists something new."""
+    links = discover_links(
+        "stevekate",
+        STEVEKATE_URL,
+        same_site(STEVEKATE_URL),
+        lambda: {link_url: [country_name, link_text] for country_name, link_url, link_text in browse_steve_kates_links()},
+        get_discovery_cache(),
+    )
+    return [[country_name, link_url, link_text] for link_url, (country_name, link_text) in links.items()]
+
+
+def browse_steve_kates_links():
     """Fetches all camps listed under a region."""
     print(f"🔍 Fetching camps from region: {'https://steveandkatescamp.com/locations/'}")
 
-    driver = get_selenium_driver()
-    driver.get("https://steveandkatescamp.com/locations/")
-    time.sleep(5)  # Wait for JS to load
-
-    soup = BeautifulSoup(driver.page_source, "html.parser")
-    driver.quit()
+    with browser_session() as driver:
+        driver.get("https://steveandkatescamp.com/locations/")
+        sleep(5)  # Wait for JS to load
+        soup = BeautifulSoup(driver.page_source, "html.parser")
 
     camp_links = []
 
@@ -1092,14 +888,28 @@ def get_all_camp_links_for_steve_kates():
     print(f"✅ Found {len(camp_links)} camps in region!")
     return camp_links
 
-def steveandkatescamp(event_url,country_name, link_text):
+def steveandkatescamp(event_url,country_name, link_text, worker=None):
     """Scrapes more details like full location, time, pricing from event page."""
     print(f"🔍 Scraping event details: {event_url}")
 
-    driver = get_selenium_driver()
-    driver.get(event_url)
-    time.sleep(3)  # Allow JavaScript to load
-    soup = BeautifulSoup(driver.page_source, "html.parser")
+    cache_key = f"{event_url}|{country_name}|{link_text}"
+    cached = get_record_cache().get(cache_key, STEVEKATE_VERSION)
+    if cached is not None:
+        get_fingerprints().mark_unchanged(event_url)
+        return cached
+
+    with worker.page() if worker else browser_session() as driver:
+        driver.get(event_url)
+        sleep(3)  # Allow JavaScript to load
+        page_source = driver.page_source
+
+    digest = fingerprint(page_source, STEVEKATE_VERSION)
+    cached = get_fingerprints().lookup(event_url, digest)
+    if cached is not None:
+        get_record_cache().put(cache_key, STEVEKATE_VERSION, cached)
+        return cached
+
+    soup = BeautifulSoup(page_source, "html.parser")
     
     scraped_data = {}
     for box in soup.find_all('div', class_='camp-details-info-box'):
@@ -1110,14 +920,9 @@ def steveandkatescamp(event_url,country_name, link_text):
     
         if title == "DATES":
             # Convert dates to dd/mm/yyyy-dd/mm/yyyy format
-            date_range = content.split(" - ")
-            if len(date_range) == 2:
-                start_date = convert_date(date_range[0])
-                end_date = convert_date(date_range[1])
-                if start_date and end_date:
-                    scraped_data['DATES'] = f"{start_date}-{end_date}"
-                else:
-                     "No Date"
+            date_range = convert_date_range(content, separator="-")
+            if date_range:
+                scraped_data['DATES'] = date_range
     
         elif title == "HOURS":
             # Extract start and end times
@@ -1142,7 +947,7 @@ def steveandkatescamp(event_url,country_name, link_text):
             scraped_data['FOOD'] = content
 
 
-    return {
+    camp = {
         "name": link_text,
         "organization": "Steve and Kates",
         "location": {"street":scraped_data.get('ADDRESS', "No Address"),"country":country_name},
@@ -1157,22 +962,40 @@ def steveandkatescamp(event_url,country_name, link_text):
         "ages": [scraped_data.get('AGES', "No Age")],
         "tags":  ["No Tags"],
     }
+    get_fingerprints().remember(event_url, digest, camp)
+    get_record_cache().put(cache_key, STEVEKATE_VERSION, camp)
+    return camp
+
+
+STEVEKATE_VERSION = extractor_version(steveandkatescamp, convert_date_range, extract_start_end_time)
 
 def scrape_stevekate_camps():
     """Scrapes camps by region and stores them in Supabase."""
     regions = get_all_camp_links_for_steve_kates()
     all_camps = []
+    changed_camps = []
+    get_fingerprints().reset_stats()
     return
-    for country_name, link , link_text in regions[21:]:
-        camp_details = steveandkatescamp(link,country_name, link_text)
-        if not camp_details:
-            continue
-        print(camp_details)
-        all_camps.append(camp_details)
+    with BrowserWorker("stevekate") as worker:
+        for country_name, link , link_text in regions[21:]:
+            camp_details = steveandkatescamp(link,country_name, link_text, worker)
+            if not camp_details:
+                continue
+            print(camp_details)
+            all_camps.append(camp_details)
+            if get_fingerprints().is_unchanged(link):
+                get_fingerprints().skip_write()
+            else:
+                changed_camps.append(camp_details)
 
-        # Insert into Supabase
-        supabase.table("activities").insert([camp_details]).execute()
+    # Insert new or changed camps into Supabase
+    all_camps, changes = publish_crawl("stevekate", all_camps, changed_camps)
 
-    return {"message": "Scraping completed for stevekate Camps!", "camps": all_camps}
+    return {
+        "message": "Scraping completed for stevekate Camps!",
+        "camps": all_camps,
+        "changes": changes,
+        "fingerprints": get_fingerprints().stats,
+    }
 
 
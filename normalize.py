@@ -0,0 +1,310 @@
+import re
+from datetime import date
+from functools import lru_cache
+
+# Compiled once and shared by every scraper
+_MONTH_DAY = re.compile(
+    r"(?P<m1>[A-Za-z]{3,9})\.?\s+(?P<d1>\d{1,2})(?:st|nd|rd|th)?(?:,?\s*(?P<y1>\d{4}))?"
+    r"(?:\s*(?:-|–|to)\s*(?:[A-Za-z]{3,9}\.?,?\s+(?=[A-Za-z]))?"  # "- Fri, Mar 7": skip the weekday
+    r"(?:(?P<m2>[A-Za-z]{3,9})\.?\s+)?(?P<d2>\d{1,2})(?:st|nd|rd|th)?"
+    r"(?:,?\s*(?P<y2>\d{4}))?)?"
+)
+_NUMERIC_RANGE = re.compile(
+    r"(?P<d1>\d{1,2})/(?P<m1>\d{1,2})/(?P<y1>\d{4})"
+    r"(?:\s*-\s*(?P<d2>\d{1,2})/(?P<m2>\d{1,2})/(?P<y2>\d{4}))?"
+)
+# "Oct 27 - Oct 27, 2025" stays a range when formatted, even on a single day
+_WRITTEN_RANGE = re.compile(r"[A-Za-z]+ \d{1,2} - [A-Za-z]+ \d{1,2}, \d{4}")
+_ISO_DATE = re.compile(r"(?P<y>\d{4})-(?P<m>\d{2})-(?P<d>\d{2})")
+_TIME = re.compile(r"(\d{1,2})(?::(\d{2}))?\s*([ap])?\.?\s*m?\.?(?![a-z])", re.I)
+# "10 - 11am", "9:30-11", "1 - 3 p.m.": one side may be a bare hour
+_CLOCK_RANGE = re.compile(
+    r"(?<![\d:/])(\d{1,2})(?::(\d{2}))?\s*(?:([ap])\.?\s*m?\.?)?\s*(?:-|–|to)\s*"
+    r"(\d{1,2})(?::(\d{2}))?\s*(?:([ap])\.?\s*m?\.?)?(?![\d:/a-z])",
+    re.I,
+)
+_TIME_RANGE = re.compile(
+    r"(\d{1,2}:\d{2}\s*[apmAPM]*)\s*-\s*(\d{1,2}:\d{2}\s*[apmAPM]*)"
+)
+_SINGLE_TIME = re.compile(r"(\d{1,2}:\d{2}\s*[apmAPM]*)")
+_TIME_RANGE_MERIDIEM = re.compile(
+    r"(\d{1,2}:\d{2}\s*[APap]{2})\s*-\s*(\d{1,2}:\d{2}\s*[APap]{2})"
+)
+
+MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "sept": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+
+MONTH_NAMES = {
+    "january": 1, "february": 2, "march": 3, "april": 4, "june": 6, "july": 7,
+    "august": 8, "september": 9, "october": 10, "november": 11, "december": 12,
+}
+
+UNPARSED_TIMES = ["varies", "see website", "all day"]
+
+
+def _month_number(token):
+    # Only exact abbreviations or full names, so "Sat" or "Marathon" never match
+    if not token:
+        return None
+    token = token.lower()
+    return MONTHS.get(token) or MONTH_NAMES.get(token)
+
+
+def _iso(year, month, day):
+    try:
+        return date(int(year), int(month), int(day)).isoformat()
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=65536)
+def parse_date_range(text, default_year=None):
+    """Parses one raw date string into an ISO `(start, end)` pair.
+
+    Understands the shapes the scrapers see: "Mar 22 - Apr 5, 2025 (Started
+    Jan 18)", "Sat, Apr 5, 2025", "June 9 - June 13", "Jun 9", "09/06/2025 -
+    13/06/2025" and "2025-06-09". Single dates return the same value twice.
+    Returns `(None, None)` when nothing can be parsed.
+    """
+    if not text or not isinstance(text, str):
+        return None, None
+    year = default_year or date.today().year
+
+    match = _ISO_DATE.search(text)
+    if match:
+        iso = _iso(match["y"], match["m"], match["d"])
+        return iso, iso
+
+    match = _NUMERIC_RANGE.search(text)
+    if match:
+        start = _iso(match["y1"], match["m1"], match["d1"])
+        end = _iso(match["y2"], match["m2"], match["d2"]) if match["d2"] else start
+        return start, end
+
+    for match in _MONTH_DAY.finditer(text):
+        start_month = _month_number(match["m1"])
+        if not start_month:
+            continue
+        end_month = _month_number(match["m2"]) or start_month
+        end_year = int(match["y2"] or match["y1"] or year)
+        start_year = int(match["y1"] or end_year)
+        if not match["y1"] and start_month > end_month:
+            # "Dec 28 - Jan 3, 2026" starts in the previous year
+            start_year -= 1
+        start = _iso(start_year, start_month, match["d1"])
+        end = _iso(end_year, end_month, match["d2"]) if match["d2"] else start
+        return start, end
+
+    return None, None
+
+
+@lru_cache(maxsize=65536)
+def parse_time_range(text):
+    """Parses "9:00am - 3:30pm" style strings into minute-of-day ints.
+
+    A start time without am/pm borrows the end time's meridiem unless that
+    would put it after the end ("9:00 - 3:00pm" and "9 - 3pm" are 540 - 900);
+    an end without one borrows the start's unless that puts it first.
+    A bare hour counts as a time when the other side of the range is one.
+    Missing values are returned as None.
+    """
+    if not text or not isinstance(text, str):
+        return None, None
+    text = text.replace("noon", "12:00pm")
+
+    # A range is read as times when at least one side has minutes or am/pm
+    match = _CLOCK_RANGE.search(text)
+    if match and any(match.group(group) for group in (2, 3, 5, 6)):
+        start = [int(match.group(1)), int(match.group(2) or 0), (match.group(3) or "").lower()]
+        end = [int(match.group(4)), int(match.group(5) or 0), (match.group(6) or "").lower()]
+        if not start[2] and end[2]:
+            start[2] = end[2]
+            if (_to_minutes(*start) or 0) > (_to_minutes(*end) or 0):
+                start[2] = "a"
+        elif start[2] and not end[2]:
+            end[2] = start[2]
+            if (_to_minutes(*end) or 0) < (_to_minutes(*start) or 0):
+                end[2] = "p"
+        return _to_minutes(*start), _to_minutes(*end)
+
+    minutes = []
+    for hours, mins, meridiem in _TIME.findall(text):
+        # Bare numbers are only times when they carry minutes or am/pm
+        if not mins and not meridiem:
+            continue
+        minutes.append([int(hours), int(mins or 0), meridiem.lower()])
+        if len(minutes) == 2:
+            break
+    if not minutes:
+        return None, None
+
+    if len(minutes) == 2 and not minutes[0][2] and minutes[1][2]:
+        minutes[0][2] = minutes[1][2]
+        if _to_minutes(*minutes[0]) > _to_minutes(*minutes[1]):
+            minutes[0][2] = "a"
+
+    start = _to_minutes(*minutes[0])
+    end = _to_minutes(*minutes[1]) if len(minutes) == 2 else None
+    return start, end
+
+
+def _to_minutes(hours, mins, meridiem):
+    if hours > 23 or mins > 59:
+        return None
+    if meridiem == "p" and hours < 12:
+        hours += 12
+    elif meridiem == "a" and hours == 12:
+        hours = 0
+    return hours * 60 + mins
+
+
+def normalize_dates(texts, default_year=None):
+    """Normalizes a batch of raw date strings into ISO `(start, end)` pairs.
+
+    Repeated strings are parsed once per batch and once per process thanks to
+    the memo on `parse_date_range`.
+    """
+    seen = {}
+    return [
+        seen[text] if text in seen else seen.setdefault(text, parse_date_range(text, default_year))
+        for text in texts
+    ]
+
+
+def normalize_times(texts):
+    """Normalizes a batch of raw time strings into minute-of-day `(start, end)` pairs."""
+    seen = {}
+    return [
+        seen[text] if text in seen else seen.setdefault(text, parse_time_range(text))
+        for text in texts
+    ]
+
+
+def normalize_records(records, default_year=None):
+    """Adds ISO dates and minute-of-day times to a batch of scraped records.
+
+    The scrapers' own fields are left untouched; `start_date`, `end_date`,
+    `start_minute` and `end_minute` are added on copies of the records.
+    """
+    raw_dates = []
+    for record in records:
+        dates = record.get("dates")
+        first = dates[0] if isinstance(dates, list) and dates else dates
+        # ActivityHero nests its converted date one level deeper
+        if isinstance(first, list):
+            first = first[0] if first else None
+        raw_dates.append(first if isinstance(first, str) else None)
+
+    raw_times = [
+        f"{record.get('start_time') or ''} - {record.get('end_time') or ''}"
+        for record in records
+    ]
+
+    normalized = []
+    for record, (start_date, end_date), (start_minute, end_minute) in zip(
+        records, normalize_dates(raw_dates, default_year), normalize_times(raw_times)
+    ):
+        record = dict(record)
+        record.update(
+            start_date=start_date,
+            end_date=end_date,
+            start_minute=start_minute,
+            end_minute=end_minute,
+        )
+        normalized.append(record)
+    return normalized
+
+
+def _ddmmyyyy(iso):
+    return f"{iso[8:10]}/{iso[5:7]}/{iso[0:4]}"
+
+
+@lru_cache(maxsize=4096)
+def extract_start_end_time(time_text):
+    if not time_text or time_text.lower() in UNPARSED_TIMES:
+        return time_text, time_text
+    time_text = time_text.lower().strip()
+    time_pattern = _TIME_RANGE.search(time_text)
+    if time_pattern:
+        return time_pattern.group(1).strip(), time_pattern.group(2).strip()
+    single_time_pattern = _SINGLE_TIME.search(time_text)
+    if single_time_pattern:
+        return single_time_pattern.group(1), "No End Time"
+    return "Unparsed Time", "Unparsed Time"
+
+
+@lru_cache(maxsize=4096)
+def extract_times(time_str):
+    times = _TIME_RANGE_MERIDIEM.findall(time_str.strip())
+
+    if len(times) == 1:
+        # Return the start and end times from the match
+        return times[0][0].strip().lower(), times[0][1].strip().lower()
+    else:
+        # Return "Unparsed" if times are not properly parsed
+        return "Unparsed", "Unparsed"
+
+
+def convert_date_format(date_text):
+    """Formats a date or date range as "dd/mm/yyyy" or "dd/mm/yyyy - dd/mm/yyyy"."""
+    start, end = parse_date_range(date_text)
+    if not start:
+        return "No Dates"
+    if end and (end != start or _WRITTEN_RANGE.search(date_text)):
+        return f"{_ddmmyyyy(start)} - {_ddmmyyyy(end)}"
+    return _ddmmyyyy(start)
+
+
+def convert_date(date_str, year=None):
+    """Formats a "Jun 9" style date as "dd/mm/yyyy", defaulting to the current year."""
+    start, _ = parse_date_range(date_str, year)
+    return _ddmmyyyy(start) if start else None
+
+
+def convert_date_range(date_range, year=None, separator=" - "):
+    """Formats a "June 9 - June 13" style range as "dd/mm/yyyy - dd/mm/yyyy"."""
+    start, end = parse_date_range(date_range, year)
+    if not start:
+        return None
+    return f"{_ddmmyyyy(start)}{separator}{_ddmmyyyy(end)}"
+
+
+_AGE_RANGE = re.compile(r"(\d{1,2})\s*(?:-|–|to)\s*(\d{1,2})")
+_AGE_SINGLE = re.compile(r"(\d{1,2})\s*(\+|and up|& up)?", re.I)
+
+
+@lru_cache(maxsize=4096)
+def parse_age_range(text):
+    """Parses "5 - 11 years", "Ages 6-12" or "8+" into an `(age_min, age_max)` pair."""
+    if not text or not isinstance(text, str):
+        return None, None
+    match = _AGE_RANGE.search(text)
+    if match:
+        return float(match.group(1)), float(match.group(2))
+    match = _AGE_SINGLE.search(text)
+    if match:
+        age = float(match.group(1))
+        return age, (None if match.group(2) else age)
+    return None, None
+
+
+def age_bounds(ages):
+    """Widest `(age_min, age_max)` over a record's age strings; open-ended ages cap at 99."""
+    lows, highs = [], []
+    for age in ages if isinstance(ages, list) else [ages]:
+        if isinstance(age, list):
+            age = age[0] if age else None
+        low, high = parse_age_range(age)
+        if low is not None:
+            lows.append(low)
+            highs.append(high if high is not None else 99.0)
+    return (min(lows), max(highs)) if lows else (None, None)
+
+
+def parse_price(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,145 @@
+import os
+from functools import lru_cache
+
+from activity_store import ACTIVITY_DB, ActivityStore
+from crawl_diff import changelog_summary, diff_crawl, load_previous_state, publish_changelog
+from db import backend_path, get_storage
+from dedup import block_key, dedupe_events, stored_duplicates
+from discovery import DiscoveryCache
+from fingerprints import FINGERPRINT_DB, FingerprintStore
+from geo import get_address_details
+from record_cache import RecordCache
+from scheduler import SCRAPE_LOG_DB, ScrapeLog
+from snapshots import snapshot_crawl
+
+# Look up coordinates through Nominatim for records without map coordinates
+GEOCODE_MISSING = os.getenv("GEOCODE_MISSING", "false").lower() == "true"
+
+# Validate, cache and thumbnail image URLs before records are written
+IMAGE_PIPELINE = os.getenv("IMAGE_PIPELINE", "false").lower() == "true"
+
+# Borderline duplicate pairs printed per batch; the rest are only counted
+REVIEW_PRINT_LIMIT = int(os.getenv("REVIEW_PRINT_LIMIT", "20"))
+
+
+# Local stores are opened on first use so importing a scraper stays cheap
+@lru_cache(maxsize=None)
+def _open(store, path):
+    return store(path)
+
+
+def get_fingerprints():
+    return _open(FingerprintStore, backend_path(FINGERPRINT_DB))
+
+
+@lru_cache(maxsize=None)
+def get_record_cache():
+    return RecordCache()
+
+
+@lru_cache(maxsize=None)
+def get_api_cache():
+    # Memory only: entries are keyed by the store's ETag, so writes invalidate them
+    return RecordCache(path=None)
+
+
+def get_scrape_log():
+    return _open(ScrapeLog, backend_path(SCRAPE_LOG_DB))
+
+
+def get_activity_store():
+    return _open(ActivityStore, backend_path(ACTIVITY_DB))
+
+
+@lru_cache(maxsize=None)
+def get_discovery_cache():
+    return DiscoveryCache()
+
+
+@lru_cache(maxsize=None)
+def get_image_cache():
+    from images import ImageCache
+
+    return ImageCache()
+
+
+def store_activities(events, source=None):
+    """Merges near-duplicate events and writes the rest to the storage backend in one batch.
+
+    With a `source`, events that repeat one another source already stored
+    (same place, near-identical name) are not written again. Borderline
+    pairs are kept; the first REVIEW_PRINT_LIMIT are printed for review.
+    """
+    review = []
+    unique_events = dedupe_events(events, review=review)
+    if len(unique_events) < len(events):
+        print(f"🧹 Merged {len(events) - len(unique_events)} duplicate events")
+    if source and unique_events:
+        stored = get_activity_store().in_blocks(map(block_key, unique_events), exclude_source=source)
+        duplicates, borderline = stored_duplicates(unique_events, stored)
+        review += borderline
+        if duplicates:
+            print(f"🧹 Skipped {len(duplicates)} events already stored by another source")
+            unique_events = [event for i, event in enumerate(unique_events) if i not in duplicates]
+    for entry in review[:REVIEW_PRINT_LIMIT]:
+        print(f"⚠️ Possible duplicate kept ({entry['similarity']}): {entry['event_url']} ~ {entry['possible_duplicate_of']}")
+    if len(review) > REVIEW_PRINT_LIMIT:
+        print(f"⚠️ ... and {len(review) - REVIEW_PRINT_LIMIT} more possible duplicates kept")
+    if unique_events:
+        get_storage().insert("activities", unique_events)
+        # Keep the local read copy in step with the written rows
+        get_activity_store().upsert(
+            unique_events, geocoder=get_address_details if GEOCODE_MISSING else None, source=source
+        )
+    return unique_events
+
+
+def publish_crawl(source, events, changed_events=None, images=None, keep_urls=None):
+    """Pushes only what changed since the previous crawl, then snapshots this one.
+
+    The crawl is diffed against the source's latest snapshot by natural key
+    and record hash: added and modified events are written, and removed or
+    modified rows are deleted first. Without a previous snapshot,
+    `changed_events` (or every event) is written instead.
+    With `images` (default IMAGE_PIPELINE) image URLs are first replaced by
+    cached thumbnails. Events at `keep_urls` (pages that failed this run)
+    are not treated as removed. Returns the deduplicated events and a
+    change summary.
+    """
+    events = dedupe_events(events)
+    if IMAGE_PIPELINE if images is None else images:
+        from images import process_images
+
+        events, image_stats = process_images(events, get_image_cache())
+        print(f"🖼️ {source} images: {image_stats}")
+        if changed_events is not None:
+            changed_events, _ = process_images(changed_events, get_image_cache())
+    previous = load_previous_state(source)
+
+    if previous is None:
+        store_activities(events if changed_events is None else changed_events, source)
+        summary = None
+    else:
+        changelog = diff_crawl(previous, events)
+        if keep_urls:
+            changelog["removed"] = [
+                entry for entry in changelog["removed"] if entry["event_url"] not in keep_urls
+            ]
+        stale_urls = [entry["event_url"] for entry in changelog["removed"] if entry["event_url"]]
+        # Added events too: one kept after a failed page comes back as "added"
+        # and must replace its old row rather than duplicate it
+        stale_urls += [
+            event["event_url"]
+            for event in changelog["modified"] + changelog["added"]
+            if event.get("event_url")
+        ]
+        if stale_urls:
+            get_storage().delete_in("activities", "event_url", stale_urls)
+        get_activity_store().delete(entry["key"] for entry in changelog["removed"])
+        store_activities(changelog["added"] + changelog["modified"], source)
+        publish_changelog(source, changelog)
+        summary = changelog_summary(changelog)
+        print(f"🔁 {source} changes: {summary}")
+
+    snapshot_crawl(events, source)
+    return events, summary
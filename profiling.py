@@ -0,0 +1,225 @@
+"""Wall-clock sampling profiler for a single scrape run.
+
+A background thread snapshots the Python stacks of the thread that runs
+the scrape, and of any thread started while it runs (browser workers,
+thread pools), every PROFILE_INTERVAL_MS. Nothing is installed in the
+profiled code, so the overhead is the same whether it parses HTML or
+sleeps. Blocking calls (sleeps, sockets, waits on a browser) count like
+any other time; in C functions the time lands on the Python function
+that called them.
+
+Each run writes to PROFILE_DIR:
+- `<name>-<stamp>.speedscope.json`, which opens in https://www.speedscope.app
+- `<name>-<stamp>.collapsed.txt`, collapsed stacks for flamegraph.pl or speedscope
+- `<name>-<stamp>.summary.json`, the top-N report returned to the caller
+"""
+import os
+import sys
+import json
+import time
+import sysconfig
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from functools import lru_cache
+
+from cache_dir import cache_path
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", cache_path("profiles"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_TOP = int(os.getenv("PROFILE_TOP", "20"))
+
+# Named buckets for the summary: a stack counts toward a bucket when any of
+# its frames is in a file ending with `path` (and named `function`, if given).
+# time.sleep runs in C, so sleeps show up as the scrapers' `sleep` wrapper.
+HOTSPOTS = {
+    "BeautifulSoup parse": ("bs4/__init__.py", "__init__"),
+    "BeautifulSoup select": ("bs4/css.py", None),
+    "BeautifulSoup find": ("bs4/element.py", "find_all"),
+    "requests.get": ("requests/api.py", None),
+    "sleep": ("", "sleep"),
+    "selenium": ("selenium/webdriver/remote/webdriver.py", None),
+    "storage writes": ("db.py", None),
+    "dedup": ("dedup.py", None),
+}
+
+
+STDLIB = sysconfig.get_paths()["stdlib"] + os.sep
+
+
+@lru_cache(maxsize=None)
+def _frame_name(code):
+    path = code.co_filename
+    # Shorten library and repo paths to the part people recognise
+    for marker in ("site-packages" + os.sep, "dist-packages" + os.sep, STDLIB):
+        if marker in path:
+            path = path.split(marker, 1)[1]
+            break
+    else:
+        if path.startswith(os.getcwd() + os.sep):
+            path = os.path.relpath(path)
+    return code.co_name, path, code.co_firstlineno
+
+
+class SamplingProfiler(threading.Thread):
+    """Counts the distinct stacks seen on the profiled threads."""
+
+    def __init__(self, interval_ms=None):
+        super().__init__(daemon=True, name="sampling-profiler")
+        self.interval = (PROFILE_INTERVAL_MS if interval_ms is None else interval_ms) / 1000
+        self.stop_event = threading.Event()
+        self.stacks = Counter()
+        self.samples = 0
+        self.started_at = None
+        self.elapsed = 0.0
+        self.caller = threading.get_ident()
+        # Threads already running belong to someone else (the server, other requests)
+        self.ignored = {thread.ident for thread in threading.enumerate()} - {self.caller}
+
+    def run(self):
+        self.ignored.add(threading.get_ident())
+        while not self.stop_event.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id in self.ignored:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_name(frame.f_code))
+                    frame = frame.f_back
+                stack.reverse()
+                self.stacks[tuple(stack)] += 1
+            self.samples += 1
+
+    def __enter__(self):
+        self.started_at = time.perf_counter()
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop_event.set()
+        self.join()
+        self.elapsed = time.perf_counter() - self.started_at
+
+    @property
+    def sample_ms(self):
+        # Spread the measured wall time over the ticks, so late ticks don't skew totals
+        return self.elapsed * 1000 / self.samples if self.samples else self.interval * 1000
+
+    def top(self, limit=PROFILE_TOP):
+        """The `limit` functions with the most self and total time.
+
+        Times are summed over the profiled threads, so with several threads
+        a share of the run can exceed 1.
+        """
+        own, total = Counter(), Counter()
+        for stack, count in self.stacks.items():
+            own[stack[-1]] += count
+            for frame in set(stack):
+                total[frame] += count
+
+        def rows(counter):
+            return [
+                {
+                    "function": name,
+                    "file": f"{path}:{line}",
+                    "ms": round(count * self.sample_ms, 1),
+                    "share": round(count / self.samples, 3) if self.samples else 0.0,
+                }
+                for (name, path, line), count in counter.most_common(limit)
+            ]
+
+        return {"self": rows(own), "total": rows(total)}
+
+    def hotspots(self):
+        """Milliseconds spent under each HOTSPOTS bucket (buckets may overlap)."""
+        spent = Counter()
+        for stack, count in self.stacks.items():
+            for bucket, (path, function) in HOTSPOTS.items():
+                if any(
+                    frame_path.endswith(path) and (function is None or name == function)
+                    for name, frame_path, _ in stack
+                ):
+                    spent[bucket] += count
+        return {bucket: round(spent[bucket] * self.sample_ms, 1) for bucket in HOTSPOTS if spent[bucket]}
+
+    def collapsed(self):
+        """Collapsed stacks, one `root;...;leaf count` line per distinct stack."""
+        return "".join(
+            ";".join(f"{name} ({path}:{line})" for name, path, line in stack) + f" {count}\n"
+            for stack, count in self.stacks.most_common()
+        )
+
+    def speedscope(self, name):
+        frames, index = [], {}
+        samples, weights = [], []
+        for stack, count in self.stacks.items():
+            indices = []
+            for frame in stack:
+                if frame not in index:
+                    index[frame] = len(frames)
+                    frames.append({"name": frame[0], "file": frame[1], "line": frame[2]})
+                indices.append(index[frame])
+            samples.append(indices)
+            weights.append(round(count * self.sample_ms, 3))
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "profiling.py",
+            "shared": {"frames": frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": name,
+                    "unit": "milliseconds",
+                    "startValue": 0,
+                    "endValue": round(sum(weights), 3),
+                    "samples": samples,
+                    "weights": weights,
+                }
+            ],
+        }
+
+    def write(self, name, directory=None):
+        """Writes the three artifacts and returns the summary (with their paths)."""
+        directory = directory or PROFILE_DIR
+        os.makedirs(directory, exist_ok=True)
+        stem = os.path.join(directory, f"{name}-{datetime.utcnow():%Y%m%dT%H%M%S%f}")
+        files = {
+            "speedscope": stem + ".speedscope.json",
+            "collapsed": stem + ".collapsed.txt",
+            "summary": stem + ".summary.json",
+        }
+        with open(files["speedscope"], "w") as f:
+            json.dump(self.speedscope(name), f)
+        with open(files["collapsed"], "w") as f:
+            f.write(self.collapsed())
+        summary = {
+            "name": name,
+            "seconds": round(self.elapsed, 2),
+            "samples": self.samples,
+            "interval_ms": self.interval * 1000,
+            "hotspots": self.hotspots(),
+            "top": self.top(),
+            "files": files,
+        }
+        with open(files["summary"], "w") as f:
+            json.dump(summary, f, indent=2)
+        return summary
+
+
+@contextmanager
+def profiled(name, enabled=True):
+    """Profiles the block when `enabled`; yields a dict filled with the summary on exit."""
+    report = {}
+    if not enabled:
+        yield report
+        return
+    profiler = SamplingProfiler()
+    try:
+        with profiler:
+            yield report
+    finally:
+        report.update(profiler.write(name))
+        hot = ", ".join(f"{bucket} {ms:.0f} ms" for bucket, ms in report["hotspots"].items())
+        print(f"🔥 Profile of {name}: {report['seconds']}s, {hot or 'no hotspots'} → {report['files']['speedscope']}")
@@ -0,0 +1,148 @@
+import os
+import json
+import time
+import types
+import sqlite3
+import hashlib
+import inspect
+import threading
+from collections import OrderedDict
+
+from cache_dir import cache_path
+
+RECORD_CACHE_DB = cache_path("records.sqlite3")
+# Memory budget of the in-process tier
+RECORD_CACHE_MB = float(os.getenv("RECORD_CACHE_MB", "64"))
+# Records older than this are fetched again; 0 keeps them until the extractor changes.
+# Above a day, so the daily cron run reuses what the previous one extracted.
+RECORD_CACHE_TTL_HOURS = float(os.getenv("RECORD_CACHE_TTL_HOURS", "36"))
+
+
+def _source(part):
+    if callable(part):
+        # lru_cache and other decorators: hash the function they wrap
+        part = inspect.unwrap(part)
+    if isinstance(part, (types.FunctionType, types.MethodType, type)):
+        try:
+            return inspect.getsource(part)
+        except (OSError, TypeError):
+            return part.__qualname__
+    if callable(part):
+        # Builtins and partials have no source, and their repr holds a memory address
+        return getattr(part, "__qualname__", type(part).__qualname__)
+    if isinstance(part, dict):
+        return "".join(f"{key}:{_source(value)}" for key, value in part.items())
+    if isinstance(part, (list, tuple)):
+        return "".join(_source(value) for value in part)
+    return repr(part)
+
+
+def extractor_version(*parts):
+    """Hash of the source code of an extractor and the helpers and field tables it uses.
+
+    Editing any of them changes the version, which invalidates every record
+    cached under the old one.
+    """
+    return hashlib.sha1("\n".join(_source(part) for part in parts).encode("utf-8")).hexdigest()[:16]
+
+
+class RecordCache:
+    """Two-tier cache of extracted records keyed by URL and extractor version.
+
+    The memory tier is an LRU bounded by `max_bytes` of JSON; the disk tier
+    is a SQLite table shared across runs. Records come back as fresh
+    copies, so callers may modify them.
+    """
+
+    def __init__(self, path=RECORD_CACHE_DB, max_bytes=None, ttl_hours=None):
+        self.max_bytes = int(RECORD_CACHE_MB * 2**20) if max_bytes is None else max_bytes
+        self.ttl = (RECORD_CACHE_TTL_HOURS if ttl_hours is None else ttl_hours) * 3600
+        self.memory = OrderedDict()
+        self.memory_bytes = 0
+        self.lock = threading.Lock()
+        self.conn = None
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self.conn = sqlite3.connect(path, check_same_thread=False)
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS records ("
+                "key TEXT PRIMARY KEY, version TEXT NOT NULL, record TEXT NOT NULL, stored_at REAL NOT NULL)"
+            )
+            self.conn.commit()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+    def _fresh(self, stored_at):
+        return not self.ttl or time.time() - stored_at < self.ttl
+
+    def _remember(self, key, version, payload, stored_at):
+        old = self.memory.pop(key, None)
+        if old:
+            self.memory_bytes -= len(old[1])
+        if len(payload) > self.max_bytes:
+            return
+        self.memory[key] = (version, payload, stored_at)
+        self.memory_bytes += len(payload)
+        while self.memory_bytes > self.max_bytes:
+            _, (_, evicted, _) = self.memory.popitem(last=False)
+            self.memory_bytes -= len(evicted)
+            self.stats["evictions"] += 1
+
+    def get(self, key, version):
+        """The cached record for `key` under `version`, or None."""
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry and entry[0] == version and self._fresh(entry[2]):
+                self.memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return json.loads(entry[1])
+            row = None
+            if self.conn is not None:
+                row = self.conn.execute(
+                    "SELECT record, stored_at FROM records WHERE key = ? AND version = ?", (key, version)
+                ).fetchone()
+            if row and self._fresh(row[1]):
+                self._remember(key, version, row[0], row[1])
+                self.stats["disk_hits"] += 1
+                return json.loads(row[0])
+            self.stats["misses"] += 1
+        return None
+
+    def put(self, key, version, record):
+        payload = json.dumps(record, default=str)
+        stored_at = time.time()
+        with self.lock:
+            self._remember(key, version, payload, stored_at)
+            if self.conn is not None:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO records (key, version, record, stored_at) VALUES (?, ?, ?, ?)",
+                    (key, version, payload, stored_at),
+                )
+                self.conn.commit()
+
+    def invalidate(self, key):
+        with self.lock:
+            old = self.memory.pop(key, None)
+            if old:
+                self.memory_bytes -= len(old[1])
+            if self.conn is not None:
+                self.conn.execute("DELETE FROM records WHERE key = ?", (key,))
+                self.conn.commit()
+
+    def prune(self):
+        """Drops expired rows from the disk tier; returns how many were removed."""
+        if self.conn is None or not self.ttl:
+            return 0
+        with self.lock:
+            removed = self.conn.execute(
+                "DELETE FROM records WHERE stored_at < ?", (time.time() - self.ttl,)
+            ).rowcount
+            self.conn.commit()
+        return removed
+
+    def summary(self):
+        return {
+            **self.stats,
+            "memory_records": len(self.memory),
+            "memory_mb": round(self.memory_bytes / 2**20, 2),
+            "memory_budget_mb": round(self.max_bytes / 2**20, 2),
+        }
@@ -0,0 +1,309 @@
+"""Record and replay of HTTP responses and browser pages.
+
+Set REPLAY_MODE=record to run a scraper against the live sites while every
+`http_get` response and every Selenium `page_source` / element read is
+saved to REPLAY_ARCHIVE (a zip file). With REPLAY_MODE=replay the same
+scraper runs offline: `http_get` answers from the archive and
+`get_selenium_driver()` returns a ReplayDriver instead of starting Chrome,
+and `sleep` returns immediately, so runs are fast and reproducible.
+
+The DevTools path (cdp.py) is covered too: `Runtime.evaluate` results are
+recorded per page and script, and in replay the page load is reported
+straight away in the performance log.
+
+Fingerprint and image caches still live under SCRAPER_CACHE_DIR; point it
+at an empty directory for a cold, comparable run.
+"""
+import os
+import json
+import time
+import atexit
+import hashlib
+import zipfile
+import threading
+from collections import defaultdict
+from urllib.parse import urlencode
+
+from cache_dir import cache_path
+
+REPLAY_MODE = os.getenv("REPLAY_MODE", "off")  # "off", "record" or "replay"
+REPLAY_ARCHIVE = os.getenv("REPLAY_ARCHIVE", cache_path("replay", "archive.zip"))
+
+
+class ReplayMiss(LookupError):
+    """A request or page that is not in the replay archive."""
+
+
+def request_key(url, params=None):
+    if params:
+        url += ("&" if "?" in url else "?") + urlencode(sorted(dict(params).items()))
+    return url
+
+
+class ReplayArchive:
+    """Zip archive of recorded responses.
+
+    `index.json` maps each request to its entries (status, headers, body
+    name); bodies are stored once per content hash, so pages that repeat
+    across requests cost nothing extra. Browser reads keep a sequence
+    number per URL, so a page read before and after a click replays in the
+    same order. Recording a key again replaces what an earlier session
+    recorded for it, so replay serves the fresh pages.
+    """
+
+    def __init__(self, path=REPLAY_ARCHIVE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.index = {}
+        self.bodies = {}
+        self.dirty = False
+        self.recorded = set()  # keys written by this session
+        if os.path.exists(path):
+            with zipfile.ZipFile(path) as archive:
+                self.index = json.loads(archive.read("index.json"))
+                self.bodies = {
+                    name: archive.read(name) for name in archive.namelist() if name.startswith("bodies/")
+                }
+
+    def _store_body(self, body):
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        name = "bodies/" + hashlib.sha1(body).hexdigest()
+        self.bodies[name] = body
+        return name
+
+    def record(self, kind, key, body, **meta):
+        with self.lock:
+            name = f"{kind} {key}"
+            if name not in self.recorded:
+                # Entries from an earlier session would be replayed first
+                self.index[name] = []
+                self.recorded.add(name)
+            self.index[name].append({"body": self._store_body(body), **meta})
+            self.dirty = True
+
+    def lookup(self, kind, key, sequence=0):
+        """The `sequence`-th recording of `key`; the last one once the sequence runs out."""
+        entries = self.index.get(f"{kind} {key}")
+        if not entries:
+            raise ReplayMiss(f"{kind} {key} is not in {self.path}")
+        entry = entries[min(sequence, len(entries) - 1)]
+        return entry, self.bodies[entry["body"]]
+
+    def save(self):
+        with self.lock:
+            if not self.dirty:
+                return
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            # Bodies only replaced recordings pointed at are dropped
+            used = {entry["body"] for entries in self.index.values() for entry in entries}
+            self.bodies = {name: body for name, body in self.bodies.items() if name in used}
+            with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+                archive.writestr("index.json", json.dumps(self.index, sort_keys=True))
+                for name, body in self.bodies.items():
+                    archive.writestr(name, body)
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+
+
+_archive = None
+_archive_lock = threading.Lock()
+
+
+def get_archive():
+    global _archive
+    with _archive_lock:
+        if _archive is None:
+            _archive = ReplayArchive()
+            if REPLAY_MODE == "record":
+                atexit.register(_archive.save)
+        return _archive
+
+
+def sleep(seconds):
+    """time.sleep, skipped in replay mode where there is nothing to wait for."""
+    if REPLAY_MODE != "replay":
+        time.sleep(seconds)
+
+
+class ReplayResponse:
+    """The parts of requests.Response the scrapers use."""
+
+    def __init__(self, url, status_code, headers, content):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.encoding = "utf-8"
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding, errors="replace")
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            import requests
+
+            raise requests.HTTPError(f"{self.status_code} for url: {self.url}", response=self)
+
+
+def http_get(url, params=None, **kwargs):
+    """requests.get that records to / replays from the archive depending on REPLAY_MODE."""
+    if REPLAY_MODE == "replay":
+        entry, body = get_archive().lookup("GET", request_key(url, params))
+        return ReplayResponse(url, entry["status"], entry["headers"], body)
+
+    import requests
+
+    response = requests.get(url, params=params, **kwargs)
+    if REPLAY_MODE == "record":
+        get_archive().record(
+            "GET",
+            request_key(url, params),
+            response.content,
+            status=response.status_code,
+            headers={"Content-Type": response.headers.get("Content-Type", "")},
+        )
+    return response
+
+
+def _script_key(url, expression):
+    return f"{url} {hashlib.sha1(expression.encode('utf-8')).hexdigest()[:12]}"
+
+
+class RecordingElement:
+    def __init__(self, element, recorder, key):
+        self._element = element
+        self._recorder = recorder
+        self._key = key
+
+    def get_attribute(self, name):
+        value = self._element.get_attribute(name)
+        self._recorder.archive.record("ATTR", f"{self._key} {name}", value or "")
+        return value
+
+    def __getattr__(self, name):
+        return getattr(self._element, name)
+
+
+class RecordingDriver:
+    """Wraps a Selenium driver and saves every page and element read."""
+
+    def __init__(self, driver, archive=None):
+        self._driver = driver
+        self.archive = archive or get_archive()
+        self._url = None
+
+    def get(self, url):
+        self._url = url
+        return self._driver.get(url)
+
+    @property
+    def page_source(self):
+        source = self._driver.page_source
+        self.archive.record("PAGE", self._url, source)
+        return source
+
+    def find_element(self, by, value):
+        element = self._driver.find_element(by, value)
+        return RecordingElement(element, self, f"{self._url} {by}={value}")
+
+    def execute_cdp_cmd(self, cmd, params):
+        result = self._driver.execute_cdp_cmd(cmd, params)
+        if cmd == "Page.navigate":
+            self._url = params["url"]
+        elif cmd == "Runtime.evaluate":
+            self.archive.record("SCRIPT", _script_key(self._url, params["expression"]), json.dumps(result))
+        return result
+
+    def __getattr__(self, name):
+        return getattr(self._driver, name)
+
+
+class ReplayElement:
+    def __init__(self, driver, key):
+        self._driver = driver
+        self._key = key
+
+    def click(self):
+        pass
+
+    def get_attribute(self, name):
+        return self._driver._read("ATTR", f"{self._key} {name}")
+
+
+class ReplayDriver:
+    """Stands in for a Selenium driver, serving recorded pages from the archive."""
+
+    def __init__(self, archive=None):
+        self.archive = archive or get_archive()
+        self.current_url = None
+        self._reads = defaultdict(int)
+        self._log = []
+
+    def _read(self, kind, key):
+        _, body = self.archive.lookup(kind, key, self._reads[(kind, key)])
+        self._reads[(kind, key)] += 1
+        return body.decode("utf-8")
+
+    def get(self, url):
+        self.current_url = url
+        self._reads.clear()
+
+    @property
+    def page_source(self):
+        return self._read("PAGE", self.current_url)
+
+    def find_element(self, by, value):
+        return ReplayElement(self, f"{self.current_url} {by}={value}")
+
+    def execute_script(self, script, *args):
+        return None
+
+    def execute_cdp_cmd(self, cmd, params):
+        if cmd == "Page.navigate":
+            self.get(params["url"])
+            # Nothing is loading, so the page is ready as soon as it is asked for
+            message = {"message": {"method": "Page.loadEventFired", "params": {}}}
+            self._log.append({"message": json.dumps(message)})
+        elif cmd == "Runtime.evaluate":
+            return json.loads(self._read("SCRIPT", _script_key(self.current_url, params["expression"])))
+        return {}
+
+    def get_log(self, log_type):
+        if log_type != "performance":
+            return []
+        entries, self._log = self._log, []
+        return entries
+
+    def quit(self):
+        pass
+
+
+def wrap_driver(driver):
+    """Wraps a live driver for recording when REPLAY_MODE=record."""
+    return RecordingDriver(driver) if REPLAY_MODE == "record" else driver
+
+
+def archive_summary(path=REPLAY_ARCHIVE):
+    """Entry counts and sizes of an archive, for a quick look at what was recorded."""
+    with zipfile.ZipFile(path) as archive:
+        index = json.loads(archive.read("index.json"))
+        infos = archive.infolist()
+    kinds = defaultdict(int)
+    for key, entries in index.items():
+        kinds[key.split(" ", 1)[0]] += len(entries)
+    return {
+        "entries": dict(kinds),
+        "bodies": sum(1 for info in infos if info.filename.startswith("bodies/")),
+        "raw_bytes": sum(info.file_size for info in infos),
+        "archive_bytes": sum(info.compress_size for info in infos),
+    }
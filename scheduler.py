@@ -0,0 +1,145 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from datetime import date, datetime
+
+from cache_dir import cache_path
+
+SCRAPE_LOG_DB = cache_path("scrape_log.sqlite3")
+
+# Staleness gained per this many hours since a task was last scraped
+STALE_AFTER_HOURS = float(os.getenv("STALE_AFTER_HOURS", "24"))
+# Seconds a scheduled run may take; 0 means no limit
+CRAWL_TIME_BUDGET = float(os.getenv("CRAWL_TIME_BUDGET", "0"))
+
+
+class ScrapeLog:
+    """When each task of a source was last scraped, how long it took and what it found."""
+
+    def __init__(self, path=SCRAPE_LOG_DB):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS scrape_log ("
+            "source TEXT NOT NULL, task TEXT NOT NULL, scraped_at TEXT NOT NULL,"
+            " duration REAL NOT NULL, urls TEXT NOT NULL, PRIMARY KEY (source, task))"
+        )
+        self.conn.commit()
+
+    def record(self, source, task, duration, urls):
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO scrape_log (source, task, scraped_at, duration, urls)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (source, task, datetime.utcnow().isoformat(), duration, json.dumps(sorted(urls))),
+            )
+            self.conn.commit()
+
+    def entries(self, source):
+        """`{task: {"scraped_at", "duration", "urls"}}` for every logged task of `source`."""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT task, scraped_at, duration, urls FROM scrape_log WHERE source = ?", (source,)
+            ).fetchall()
+        return {
+            task: {
+                "scraped_at": datetime.fromisoformat(scraped_at),
+                "duration": duration,
+                "urls": json.loads(urls),
+            }
+            for task, scraped_at, duration, urls in rows
+        }
+
+
+def task_priority(event_date, last_scraped=None, today=None, now=None):
+    """Higher is more urgent: upcoming days first, then the longest unrefreshed.
+
+    Urgency falls off with days ahead (today scores 1, a week out 0.125);
+    days already past score 0. Staleness grows by 1 every STALE_AFTER_HOURS
+    without a cap, so far-off days are eventually refreshed too; a task
+    never scraped counts as one period stale.
+    """
+    today = today or date.today()
+    now = now or datetime.utcnow()
+    days_ahead = (event_date - today).days
+    urgency = 1 / (1 + days_ahead) if days_ahead >= 0 else 0.0
+    if last_scraped is None:
+        staleness = 1.0
+    else:
+        staleness = (now - last_scraped).total_seconds() / 3600 / STALE_AFTER_HOURS
+    return round(urgency + staleness, 4)
+
+
+def select_tasks(tasks, history, refresh_sample, today=None):
+    """Picks the tasks worth running this time from a rolling window.
+
+    Every task never scraped before runs, plus the `refresh_sample` most
+    valuable of the rest (upcoming and stalest first), so repeated runs
+    rotate through the window instead of re-scraping all of it. Returns the
+    selected `{task: event_date}` and the tasks left as they are.
+    """
+    known = sorted(
+        (task for task in tasks if task in history),
+        key=lambda task: task_priority(tasks[task], history[task]["scraped_at"], today),
+        reverse=True,
+    )
+    selected = {task: event_date for task, event_date in tasks.items() if task not in history}
+    selected.update((task, tasks[task]) for task in known[:refresh_sample])
+    return selected, known[refresh_sample:]
+
+
+def run_prioritized(source, tasks, run, time_budget=None, log=None, url_of=lambda record: record.get("event_url")):
+    """Runs `run(task)` for `tasks` (`{task: event_date}`) most valuable first.
+
+    With a `time_budget` in seconds, a task is deferred when its expected
+    duration (its last logged duration, else this run's average) no longer
+    fits, so the highest-priority work finishes before the deadline.
+    `run` returns a list of records; their URLs are logged with the task.
+    Returns `(results, report)`: `results` maps each completed task to its
+    records, the report lists completed and deferred tasks.
+    """
+    log = log or ScrapeLog()
+    time_budget = CRAWL_TIME_BUDGET if time_budget is None else time_budget
+    history = log.entries(source)
+    queue = sorted(
+        tasks,
+        key=lambda task: task_priority(tasks[task], history.get(task, {}).get("scraped_at")),
+        reverse=True,
+    )
+
+    started = time.monotonic()
+    results, durations, deferred = {}, [], []
+    for task in queue:
+        elapsed = time.monotonic() - started
+        expected = history.get(task, {}).get("duration")
+        if expected is None:
+            expected = sum(durations) / len(durations) if durations else 0.0
+        if time_budget and elapsed + expected > time_budget:
+            deferred.append(
+                {
+                    "task": task,
+                    "priority": task_priority(tasks[task], history.get(task, {}).get("scraped_at")),
+                    "expected_seconds": round(expected, 2),
+                }
+            )
+            continue
+
+        task_started = time.monotonic()
+        records = run(task)
+        duration = time.monotonic() - task_started
+        durations.append(duration)
+        results[task] = records
+        log.record(source, task, duration, {url for url in map(url_of, records) if url})
+
+    report = {
+        "time_budget": time_budget or None,
+        "elapsed_seconds": round(time.monotonic() - started, 2),
+        "completed": list(results),
+        "deferred": deferred,
+    }
+    if deferred:
+        print(f"⏳ {source}: deferred {len(deferred)} of {len(queue)} tasks to stay within {time_budget}s")
+    return results, report
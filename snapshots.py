@@ -0,0 +1,220 @@
+import os
+import json
+import glob
+import hashlib
+from datetime import date, datetime
+
+from activity_store import activity_key
+from cache_dir import cache_path
+from db import backend_path
+from geo import extract_coordinates
+from normalize import age_bounds, normalize_records, parse_price
+
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", cache_path("snapshots"))
+SNAPSHOT_FORMAT = os.getenv("SNAPSHOT_FORMAT", "parquet")  # or "arrow" for Arrow IPC
+
+_EXTENSIONS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+# Field order of every snapshot; `record_hash` covers the whole original record
+COLUMNS = [
+    "source", "crawl_date", "key", "record_hash", "name", "organization",
+    "street", "city", "state", "postal_code", "country", "lat", "lon",
+    "start_date", "end_date", "start_minute", "end_minute", "price",
+    "age_min", "age_max", "tags", "dates", "phone", "email", "image_url",
+    "description", "event_url",
+]
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.parquet
+    except ImportError:
+        raise RuntimeError("Crawl snapshots need pyarrow: pip install pyarrow")
+    return pyarrow
+
+
+def record_hash(record):
+    """Stable hash of a scraped record, used to spot changed events."""
+    canonical = json.dumps(record, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+
+def _text(value):
+    if value is None or isinstance(value, str):
+        return value
+    return json.dumps(value, default=str)
+
+
+def _text_list(values):
+    if not isinstance(values, list):
+        values = [values] if values is not None else []
+    flat = []
+    for value in values:
+        flat.extend(value if isinstance(value, list) else [value])
+    return [_text(value) for value in flat if value is not None]
+
+
+def flatten_records(records, source, crawl_date):
+    """Column dict for a batch of records, one list per entry in COLUMNS."""
+    columns = {name: [] for name in COLUMNS}
+    for original, record in zip(records, normalize_records(records)):
+        location = record.get("location")
+        if not isinstance(location, dict):
+            location = {"street": location}
+        lat, lon = extract_coordinates(record) or (None, None)
+        age_min, age_max = age_bounds(record.get("ages"))
+        row = {
+            "source": source,
+            "crawl_date": crawl_date,
+            "key": activity_key(record),
+            "record_hash": record_hash(original),
+            "name": _text(record.get("name") or record.get("title")),
+            "organization": _text(record.get("organization")),
+            "street": _text(location.get("street")),
+            "city": _text(location.get("city")),
+            "state": _text(location.get("state")),
+            "postal_code": _text(location.get("postal_code")),
+            "country": _text(location.get("country")),
+            "lat": lat,
+            "lon": lon,
+            "start_date": record.get("start_date"),
+            "end_date": record.get("end_date"),
+            "start_minute": record.get("start_minute"),
+            "end_minute": record.get("end_minute"),
+            "price": parse_price(record.get("price")),
+            "age_min": age_min,
+            "age_max": age_max,
+            "tags": _text_list(record.get("tags")),
+            "dates": _text_list(record.get("dates")),
+            "phone": _text(record.get("phone")),
+            "email": _text(record.get("email")),
+            "image_url": _text(record.get("image_url")),
+            "description": _text(record.get("description")),
+            "event_url": _text(record.get("event_url")),
+        }
+        for name in COLUMNS:
+            columns[name].append(row[name])
+    return columns
+
+
+def _schema(pa):
+    text = pa.string()
+    return pa.schema(
+        [
+            (name, pa.list_(text) if name in ("tags", "dates")
+             else pa.float64() if name in ("lat", "lon", "price", "age_min", "age_max")
+             else pa.int32() if name in ("start_minute", "end_minute")
+             else text)
+            for name in COLUMNS
+        ]
+    )
+
+
+def write_snapshot(records, source, crawl_date=None, part=None, fmt=SNAPSHOT_FORMAT, root=SNAPSHOT_DIR):
+    """Writes a crawl's records as one columnar file partitioned by source and date.
+
+    Files land in `root/source=<source>/crawl_date=<YYYY-MM-DD>/`. Pass `part`
+    to split one crawl across several files (e.g. one per written batch);
+    part 0 or None replaces the day's earlier files. Returns the file path.
+    """
+    pa = _pyarrow()
+    crawl_date = crawl_date or date.today().isoformat()
+    table = pa.Table.from_pydict(flatten_records(records, source, crawl_date), schema=_schema(pa))
+
+    directory = os.path.join(root, f"source={source}", f"crawl_date={crawl_date}")
+    os.makedirs(directory, exist_ok=True)
+    if not part:
+        # A new crawl replaces whatever an earlier run wrote for the same day
+        for old_path in glob.glob(os.path.join(directory, "part-*")):
+            os.remove(old_path)
+    name = f"part-{part if part is not None else datetime.utcnow().strftime('%H%M%S%f')}"
+    path = os.path.join(directory, name + _EXTENSIONS[fmt])
+    if fmt == "arrow":
+        with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    else:
+        pa.parquet.write_table(table, path, compression="zstd")
+    return path
+
+
+def list_snapshots(source=None, root=SNAPSHOT_DIR):
+    """Sorted `(source, crawl_date)` pairs that have at least one snapshot file."""
+    pattern = os.path.join(root, f"source={source or '*'}", "crawl_date=*")
+    found = set()
+    for directory in glob.glob(pattern):
+        if any(glob.glob(os.path.join(directory, "part-*"))):
+            source_dir, date_dir = os.path.split(directory)
+            found.add((os.path.basename(source_dir).split("=", 1)[1], date_dir.split("=", 1)[1]))
+    return sorted(found)
+
+
+def _read_files(paths):
+    pa = _pyarrow()
+    tables = []
+    for path in sorted(paths):
+        if path.endswith(".arrow"):
+            with pa.memory_map(path) as source:
+                tables.append(pa.ipc.open_file(source).read_all())
+        else:
+            tables.append(pa.parquet.read_table(path))
+    return pa.concat_tables(tables) if tables else pa.Table.from_pydict(
+        {name: [] for name in COLUMNS}, schema=_schema(pa)
+    )
+
+
+def read_snapshot(source, crawl_date=None, root=SNAPSHOT_DIR):
+    """Loads one crawl (the latest when `crawl_date` is None) as a pyarrow Table."""
+    if crawl_date is None:
+        dates = [d for s, d in list_snapshots(source, root)]
+        if not dates:
+            return None
+        crawl_date = dates[-1]
+    directory = os.path.join(root, f"source={source}", f"crawl_date={crawl_date}")
+    paths = glob.glob(os.path.join(directory, "part-*"))
+    return _read_files(paths) if paths else None
+
+
+def read_history(source=None, date_from=None, date_to=None, root=SNAPSHOT_DIR):
+    """Concatenates every snapshot in a date range into one Table for analysis."""
+    paths = []
+    for snapshot_source, crawl_date in list_snapshots(source, root):
+        if (date_from and crawl_date < date_from) or (date_to and crawl_date > date_to):
+            continue
+        directory = os.path.join(root, f"source={snapshot_source}", f"crawl_date={crawl_date}")
+        paths += glob.glob(os.path.join(directory, "part-*"))
+    return _read_files(paths)
+
+
+def compare_snapshots(old, new):
+    """Vectorized comparison of two snapshot Tables by natural key.
+
+    Returns a dict of Tables: `added` and `changed` rows come from `new`,
+    `removed` rows come from `old`.
+    """
+    pa = _pyarrow()
+    pc = pa.compute
+    old_keys, new_keys = old["key"], new["key"]
+    added = new.filter(pc.invert(pc.is_in(new_keys, value_set=old_keys)))
+    removed = old.filter(pc.invert(pc.is_in(old_keys, value_set=new_keys)))
+
+    # Joins can't carry list columns, so join the hashes and filter `new` by key
+    old_hashes = old.select(["key", "record_hash"]).rename_columns(["key", "old_hash"])
+    joined = new.select(["key", "record_hash"]).join(old_hashes, keys="key", join_type="inner")
+    changed_keys = joined.filter(pc.not_equal(joined["record_hash"], joined["old_hash"]))["key"]
+    changed = new.filter(pc.is_in(new_keys, value_set=changed_keys))
+    return {"added": added, "changed": changed, "removed": removed}
+
+
+def snapshot_crawl(records, source, part=None):
+    """Best-effort snapshot after a crawl; never fails the crawl itself."""
+    if not records:
+        return None
+    try:
+        path = write_snapshot(records, source, part=part, root=backend_path(SNAPSHOT_DIR))
+        print(f"🗂️ Wrote {len(records)} {source} records to {path}")
+        return path
+    except Exception as e:
+        print(f"❌ Snapshot failed for {source}: {str(e)}")
+        return None
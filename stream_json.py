@@ -0,0 +1,100 @@
+import json
+import mmap
+import codecs
+from itertools import islice
+
+CHUNK_SIZE = 1 << 20  # 1 MiB
+
+_WHITESPACE = " \t\r\n"
+_LOOKAHEAD = 64
+
+
+def _file_chunks(path, chunk_size):
+    with open(path, "r", encoding="utf-8") as file:
+        while True:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+def _mmap_chunks(path, chunk_size):
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    with open(path, "rb") as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for offset in range(0, len(mapped), chunk_size):
+                chunk = decoder.decode(mapped[offset : offset + chunk_size])
+                if chunk:
+                    yield chunk
+            tail = decoder.decode(b"", final=True)
+            if tail:
+                yield tail
+
+
+def iter_json_array(path, chunk_size=CHUNK_SIZE, use_mmap=False):
+    """Yields the items of a top-level JSON array one at a time.
+
+    Anything before the first "[" is skipped, so a `data.js` file of the
+    form `const camps = [...]` works as well as plain JSON. Only the current
+    chunk and the item being decoded are held in memory.
+    """
+    chunks = _mmap_chunks(path, chunk_size) if use_mmap else _file_chunks(path, chunk_size)
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+
+    def fill():
+        nonlocal buffer, pos, eof
+        chunk = next(chunks, None)
+        if chunk is None:
+            eof = True
+            return False
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        return True
+
+    # Find the opening bracket
+    while True:
+        start = buffer.find("[", pos)
+        if start >= 0:
+            pos = start + 1
+            break
+        pos = len(buffer)
+        if not fill():
+            raise ValueError(f"No JSON array found in {path}")
+
+    while True:
+        # Skip separators between items
+        while True:
+            while pos < len(buffer) and (buffer[pos] in _WHITESPACE or buffer[pos] == ","):
+                pos += 1
+            if pos < len(buffer) or not fill():
+                break
+        if pos >= len(buffer):
+            raise ValueError(f"Unterminated JSON array in {path}")
+        if buffer[pos] == "]":
+            return
+
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if fill():
+                continue
+            raise
+        # A number cut off near the end of the buffer ("1." of "1.5e3") would
+        # decode too early, so make sure some lookahead follows every item
+        if not eof and len(buffer) - end < _LOOKAHEAD and fill():
+            continue
+        pos = end
+        yield item
+
+
+def batched(iterable, size):
+    """Yields lists of up to `size` items from `iterable`."""
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch